@@ -9,12 +9,13 @@ WEIGHTS_DIR = HOME_DIR / "weights"
 
 # Store directories
 MEDIA_DIR = HOME_DIR / "media"
+CLIPS_DIR = MEDIA_DIR / "clips"
 DB_DIR = HOME_DIR / "db"
 SQL_DIR = DB_DIR / "sql"
 VECTOR_DIR = DB_DIR / "vector"
 
 
-ALL_DIRS = [HOME_DIR, MEDIA_DIR, DB_DIR, SQL_DIR, VECTOR_DIR, WEIGHTS_DIR]
+ALL_DIRS = [HOME_DIR, MEDIA_DIR, CLIPS_DIR, DB_DIR, SQL_DIR, VECTOR_DIR, WEIGHTS_DIR]
 
 
 for dir in ALL_DIRS:
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
 
+from eagle_eye.core.alert.dispatch import OverflowPolicy
+
 from .folder_manager import SQL_DIR
 
 
@@ -14,10 +16,79 @@ class Settings(BaseSettings):
     # Database Settings
     DB_URI: str = f"sqlite:///{SQL_DIR}/{APP_NAME.lower()}.db"
 
+    # Pipeline Settings
+    PIPELINE_PARALLEL: bool = True
+    PIPELINE_WORKERS: int = 0  # 0 = one pinned worker per use case
+
+    # Batched Inference Settings
+    BATCH_INFERENCE: bool = True
+    BATCH_MAX_SIZE: int = 8
+    BATCH_MAX_WAIT_MS: float = 15.0
+
+    # Inference Pool Settings (async handlers)
+    INFERENCE_WORKERS: int = 4
+    INFERENCE_MAX_PENDING: int = 8  # calls admitted at once, others wait
+
+    # Capture Settings
+    CAPTURE_QUEUE_SIZE: int = 2  # frames kept per source, oldest dropped first
+
+    # Model Registry Settings
+    MODEL_IDLE_TIMEOUT_SEC: float = 600.0  # 0 = never unload idle models
+
+    # Face Gallery Settings
+    FACE_INDEX_TYPE: str = "auto"  # "flat", "hnsw", "ivf", "ivfpq" or "auto" (by size)
+    FACE_INDEX_FLAT_MAX: int = 10_000  # "auto" upgrades past these vector counts
+    FACE_INDEX_HNSW_MAX: int = 100_000
+    FACE_INDEX_IVF_MAX: int = 1_000_000
+    FACE_METRIC: str = "l2"  # "l2" or "cosine" (normalized vectors, inner product)
+    FACE_INDEX_ENCODING: str = "float32"  # "float32", "fp16" or "sq8" (1 byte/dim)
+    FACE_INDEX_NPROBE: int = 16  # IVF lists scanned per search
+    FACE_INDEX_EF_SEARCH: int = 64  # HNSW candidates explored per search
+    FACE_INDEX_LOG_MAX_MB: int = 256  # changes logged before a new snapshot is written
+    FACE_INDEX_LOG_MAX_SEGMENTS: int = 1000
+    FACE_INDEX_FSYNC: bool = True  # flush index files to disk before committing them
+    FACE_SEARCH_MODE: str = "vectors"  # "vectors" (all images) or "prototypes"
+    FACE_PROTOTYPES_PER_PERSON: int = 3  # centroids searched first in "prototypes" mode
+    FACE_PROTOTYPE_CANDIDATES: int = 10  # persons re-ranked on their own vectors
+    FACE_ENROLL_WORKERS: int = 2  # enrollment embedding processes (0 = in-process)
+    FACE_NAMES_CHECK_SEC: float = 5.0  # how often cached names are checked for changes
+
+    # Face Tracking Settings (recognized faces are not embedded again every frame)
+    FACE_TRACKING: bool = True
+    FACE_TRACK_IDENTITY_TTL_SEC: float = 5.0  # cached identity refreshed after this
+    FACE_TRACK_REEMBED_IOU: float = 0.5  # re-embed when the box moved more than this
+
+    # Clip Recorder Settings (every frame of every stream, at the buffer fps)
+    RECORDER_STORAGE: str = "encoded"  # "encoded" (JPEG) or "raw"
+    RECORDER_MAX_WIDTH: int = 640  # wider frames are downscaled
+    RECORDER_JPEG_QUALITY: int = 60
+    RECORDER_MEMORY_MB: float = 8.0  # budget per stream, oldest frames dropped
+    RECORDER_SEGMENT_SECONDS: float = 0.0  # >0 pre-encodes clips in segments
+
+    # Alert Engine Settings
+    ALERT_QUEUE_SIZE: int = 32  # alerts waiting per use case
+    ALERT_OVERFLOW_POLICY: OverflowPolicy = (
+        "coalesce"  # or "drop_oldest", "drop_newest"
+    )
+    ALERT_CLIP_WORKERS: int = 2  # threads building alert clips
+    ALERT_DELIVERY_ATTEMPTS: int = 3
+    ALERT_DELIVERY_BACKOFF_SEC: float = 2.0  # doubled after each failed attempt
+    ALERT_CLIP_PROFILE: str = "email"  # see core/alert/video/profile.py
+    PUBLIC_BASE_URL: str = ""  # external URL of the API, used in clip links
+    CLIPS_MAX_AGE_HOURS: float = (
+        72.0  # stored over-size clips older than this are deleted
+    )
+    CLIPS_MAX_MB: float = 2048.0  # oldest stored clips deleted beyond this total
+
     # Notifications Settings
     GMAIL_USER: str = ""
     GMAIL_PASSWORD: str = ""
     TO_EMAILS: list[str] = []
+    EMAIL_DIGEST_WINDOW_SEC: float = 30.0  # alerts within the window share one email
+    EMAIL_DIGEST_MAX_ALERTS: int = 5
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BACKOFF_SEC: float = 30.0  # doubled after each failed attempt
+    EMAIL_OUTBOX_RETENTION_DAYS: float = 7.0  # sent and failed emails kept this long
 
     @property
     def notification_enabled(self) -> bool:
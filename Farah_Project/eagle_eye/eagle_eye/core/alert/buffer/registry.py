@@ -1,15 +1,93 @@
-from .ring_buffer import VideoRingBuffer
+import threading
+import time
+from typing import Any, Dict, List, Literal, Optional
+
+from eagle_eye.config.settings import settings
+
+from .ring_buffer import Frame, VideoRingBuffer
+
+#: Buffers of streams that stopped recording are dropped after this many seconds
+STREAM_IDLE_TTL_SEC = 120.0
 
 
 class VideoBufferRegistry:
-    def __init__(self, seconds: int, fps: int):
+    def __init__(
+        self,
+        seconds: int,
+        fps: int,
+        storage: Literal["raw", "encoded"] = "raw",
+        max_width: Optional[int] = None,
+        jpeg_quality: int = 95,
+        max_bytes: Optional[int] = None,
+        segment_seconds: float = 0.0,
+    ):
         self.seconds = seconds
         self.fps = fps
+        self.storage = storage
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = max_bytes
+        self.segment_seconds = segment_seconds
         self._buffers: dict[str, VideoRingBuffer] = {}
+        self._lock = threading.Lock()
 
     def get(self, stream_id: str) -> VideoRingBuffer:
-        if stream_id not in self._buffers:
-            self._buffers[stream_id] = VideoRingBuffer(
-                seconds=self.seconds, fps=self.fps
-            )
-        return self._buffers[stream_id]
+        buffer = self._buffers.get(stream_id)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.get(stream_id)
+                if buffer is None:
+                    self._prune(time.time())
+                    buffer = self._buffers[stream_id] = VideoRingBuffer(
+                        seconds=self.seconds,
+                        fps=self.fps,
+                        storage=self.storage,
+                        max_width=self.max_width,
+                        jpeg_quality=self.jpeg_quality,
+                        max_bytes=self.max_bytes,
+                        segment_seconds=self.segment_seconds,
+                    )
+        return buffer
+
+    def record(self, stream_id: str, frame: Frame) -> bool:
+        """
+        Feed a frame of `stream_id`, keeping at most `fps` frames per second.
+
+        Returns:
+            True if the frame was stored.
+        """
+        return self.get(stream_id).record(frame)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Frames and memory held per stream."""
+        with self._lock:
+            buffers = list(self._buffers.items())
+        return [
+            {
+                "stream_id": stream_id,
+                "frames": len(buffer),
+                "memory_bytes": buffer.memory_bytes,
+            }
+            for stream_id, buffer in buffers
+        ]
+
+    def _prune(self, now: float) -> None:
+        for stream_id, buffer in list(self._buffers.items()):
+            if (
+                buffer.last_recorded_at
+                and now - buffer.last_recorded_at > STREAM_IDLE_TTL_SEC
+            ):
+                del self._buffers[stream_id]
+
+
+# Global instance, shared by the alert managers of all use cases so every
+# stream is recorded once
+video_buffers = VideoBufferRegistry(
+    seconds=20,
+    fps=10,
+    storage=settings.RECORDER_STORAGE,
+    max_width=settings.RECORDER_MAX_WIDTH,
+    jpeg_quality=settings.RECORDER_JPEG_QUALITY,
+    max_bytes=int(settings.RECORDER_MEMORY_MB * 1024**2),
+    segment_seconds=settings.RECORDER_SEGMENT_SECONDS,
+)
@@ -1,31 +1,276 @@
-from collections import deque
-from typing import List
+import logging
+import threading
+import time
+from typing import List, Literal, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+#: A buffered frame: raw BGR image or encoded (JPEG/PNG) bytes
+Frame = Union[np.ndarray, bytes, memoryview]
 
 
 class VideoRingBuffer:
-    def __init__(self, seconds: int, fps: int):
+    """
+    Fixed-size ring of the most recent frames of one stream.
+
+    Frames live in preallocated slots addressed by a head index and a count,
+    each with its capture timestamp, so reading the last N frames or a time
+    range costs O(N) regardless of the buffer size.
+
+    With `storage="raw"` frames are copied into a NumPy ring (allocated on
+    the first frame, reallocated if the resolution changes), so nothing is
+    encoded or decoded until a clip is built. With `storage="encoded"` frames
+    are kept as JPEG bytes without extra copies.
+
+    Frames wider than `max_width` are downscaled before they are stored and
+    `max_bytes` caps the memory held by the buffer, whatever the resolution.
+    With `segment_seconds` the frames are also encoded into rolling video
+    segments, so alert clips only need to join finished segments.
+    """
+
+    def __init__(
+        self,
+        seconds: int,
+        fps: int,
+        storage: Literal["raw", "encoded"] = "raw",
+        max_width: Optional[int] = None,
+        jpeg_quality: int = 95,
+        max_bytes: Optional[int] = None,
+        segment_seconds: float = 0.0,
+    ):
         self.seconds = seconds
         self.fps = fps
         self.capacity = seconds * fps
-        self._buffer: deque[bytes] = deque(maxlen=self.capacity)
+        self.storage = storage
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self.last_recorded_at = 0.0
+        self._next_record_at = float("-inf")
+
+        # Ring indices shared by both storages
+        self._slots = self.capacity  # lowered for raw frames when max_bytes is set
+        self._head = 0  # next slot to write
+        self._count = 0
+        self._timestamps = np.zeros(self._slots, dtype=np.float64)
+
+        # Encoded storage
+        self._encoded: List[Optional[memoryview]] = [None] * self._slots
+        self._bytes = 0
+
+        # Raw storage
+        self._frames: Optional[np.ndarray] = None
+
+        self.segments = None
+        if segment_seconds > 0:
+            # Imported here: the encoder module depends on this one for `Frame`
+            from ..video.encoder import SegmentedVideoEncoder
+
+            self.segments = SegmentedVideoEncoder(
+                fps=fps, segment_seconds=segment_seconds, retain_seconds=seconds
+            )
+
+    def record(self, frame: Frame, timestamp: Optional[float] = None) -> bool:
+        """
+        Push a frame unless one was recorded less than 1/fps seconds ago.
+
+        Meant to be called for every frame of the stream: surplus frames are
+        rejected before any resize or encode work happens.
+
+        Args:
+            frame: Raw BGR frame or encoded image.
+            timestamp: Capture time (epoch seconds), defaults to now.
+
+        Returns:
+            True if the frame was stored.
+        """
+        now = time.time() if timestamp is None else timestamp
+        interval = 1.0 / self.fps
+        if now < self.last_recorded_at:
+            self._next_record_at = float("-inf")  # clock went backwards
+        # Small tolerance so timestamp jitter does not skip a whole slot
+        if now < self._next_record_at - 0.1 * interval:
+            return False
+        if now - self._next_record_at < interval:
+            self._next_record_at += interval  # stay on the fps grid
+        else:
+            self._next_record_at = now + interval  # first frame or after a gap
+        self.last_recorded_at = now
+        self.push(frame, timestamp=now)
+        return True
+
+    def push(self, frame: Frame, timestamp: Optional[float] = None) -> None:
+        """Store a frame unconditionally, stamped with `timestamp` (default now)."""
+        timestamp = time.time() if timestamp is None else timestamp
+
+        if not isinstance(frame, np.ndarray) and (
+            self.storage == "raw" or self.segments is not None
+        ):
+            frame = cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                logger.warning("Dropping undecodable frame")
+                return
+        if isinstance(frame, np.ndarray):
+            frame = self._downscale(frame)
+            if self.segments is not None:
+                self.segments.write(frame, timestamp)
 
-    def push(self, frame_bytes: bytes) -> None:
-        self._buffer.append(frame_bytes)
+        if self.storage == "raw":
+            with self._lock:
+                self._push_raw(frame, timestamp)
+            return
 
-    def get_last_seconds(self, seconds: int) -> List[bytes]:
+        if isinstance(frame, np.ndarray):
+            success, encoded = cv2.imencode(
+                ".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
+            )
+            if not success:
+                logger.warning("Dropping unencodable frame")
+                return
+            # memoryview over the encoder output: no .tobytes() copy
+            frame = encoded.data
+        with self._lock:
+            self._push_encoded(memoryview(frame), timestamp)
+
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        if not self.max_width or width <= self.max_width:
+            return frame
+        size = (self.max_width, max(1, round(height * self.max_width / width)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def _advance(self, timestamp: float) -> int:
+        """Claim the head slot for a new frame and return its index."""
+        slot = self._head
+        self._timestamps[slot] = timestamp
+        self._head = (self._head + 1) % self._slots
+        self._count = min(self._count + 1, self._slots)
+        return slot
+
+    def _push_encoded(self, frame: memoryview, timestamp: float) -> None:
+        overwritten = self._encoded[self._head]
+        if overwritten is not None:
+            self._bytes -= overwritten.nbytes
+
+        self._encoded[self._advance(timestamp)] = frame
+        self._bytes += frame.nbytes
+
+        # Drop the oldest frames while over the memory budget
+        while self.max_bytes and self._bytes > self.max_bytes and self._count > 1:
+            tail = (self._head - self._count) % self._slots
+            self._bytes -= self._encoded[tail].nbytes
+            self._encoded[tail] = None
+            self._count -= 1
+
+    def _push_raw(self, frame: np.ndarray, timestamp: float) -> None:
+        if (
+            self._frames is None
+            or self._frames.shape[1:] != frame.shape
+            or self._frames.dtype != frame.dtype
+        ):
+            self._slots = self.capacity
+            if self.max_bytes:
+                self._slots = max(1, min(self.capacity, self.max_bytes // frame.nbytes))
+            # np.empty only reserves memory; pages are committed as slots fill
+            self._frames = np.empty((self._slots, *frame.shape), dtype=frame.dtype)
+            self._timestamps = np.zeros(self._slots, dtype=np.float64)
+            self._head = 0
+            self._count = 0
+
+        np.copyto(self._frames[self._advance(timestamp)], frame)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes held by the buffered frames."""
+        if self.storage == "raw":
+            return self._count * self._frames[0].nbytes if self._count else 0
+        return self._bytes
+
+    def _last_indices(self, count: int) -> np.ndarray:
+        """Slot indices of the newest `count` frames, oldest first."""
+        count = max(0, min(count, self._count))
+        return (self._head - count + np.arange(count)) % self._slots
+
+    def _take(self, indices: np.ndarray) -> Sequence[Frame]:
+        if self.storage == "raw":
+            if self._frames is None or not len(indices):
+                return []
+            # Fancy indexing copies the frames out, so the clip stays valid
+            # while newer frames overwrite the ring
+            return self._frames[indices]
+        return [self._encoded[i] for i in indices]
+
+    def get_last(
+        self, count: int, with_timestamps: bool = False
+    ) -> Union[Sequence[Frame], Tuple[Sequence[Frame], np.ndarray]]:
+        """
+        Retrieve the newest `count` frames, oldest first.
+
+        Args:
+            count: Number of frames; fewer are returned if the buffer holds less.
+            with_timestamps: Also return the capture timestamp of each frame.
+
+        Returns:
+            Frames, or (frames, timestamps) when `with_timestamps` is set.
+        """
+        with self._lock:
+            indices = self._last_indices(count)
+            frames = self._take(indices)
+            if with_timestamps:
+                return frames, self._timestamps[indices]
+            return frames
+
+    def get_last_seconds(self, seconds: int) -> Sequence[Frame]:
         """
         Retrieve the last N seconds of video frames.
         If the buffer doesn't have enough frames, returns all available frames.
         """
-        frame_count = seconds * self.fps
-        # slice the deque from the end
-        if frame_count >= len(self._buffer):
-            return list(self._buffer)
+        return self.get_last(seconds * self.fps)
+
+    def get_range(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        with_timestamps: bool = False,
+    ) -> Union[Sequence[Frame], Tuple[Sequence[Frame], np.ndarray]]:
+        """
+        Retrieve the frames captured between two timestamps (inclusive).
 
-        # Inefficient to list(deque) but robust for now.
-        # For high perf, use itertools.islice or similar, but list conversion is needed anyway.
-        # list(deque)[-n:] copies efficiently enough for reasonable buffer sizes.
-        return list(self._buffer)[-frame_count:]
+        Args:
+            start: Epoch seconds of the first frame to include.
+            end: Epoch seconds of the last frame to include (None = newest).
+            with_timestamps: Also return the capture timestamp of each frame.
+
+        Returns:
+            Frames, or (frames, timestamps) when `with_timestamps` is set.
+        """
+        with self._lock:
+            indices = self._last_indices(self._count)
+            # Timestamps are monotonic along the ring, so binary search works
+            timestamps = self._timestamps[indices]
+            lo = np.searchsorted(timestamps, start, side="left")
+            hi = (
+                len(timestamps)
+                if end is None
+                else np.searchsorted(timestamps, end, side="right")
+            )
+            indices = indices[lo:hi]
+            frames = self._take(indices)
+            if with_timestamps:
+                return frames, self._timestamps[indices]
+            return frames
 
     def clear(self) -> None:
-        self._buffer.clear()
+        with self._lock:
+            self._encoded = [None] * len(self._encoded)
+            self._bytes = 0
+            self._head = 0
+            self._count = 0
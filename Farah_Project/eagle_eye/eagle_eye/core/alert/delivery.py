@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from eagle_eye.config.settings import settings
+
+from .event import AlertEvent
+from .notifier.base import NotificationProvider
+from .snapshot import AlertSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class _Delivery:
+    due_at: float
+    seq: int
+    notifier: NotificationProvider = field(compare=False)
+    event: AlertEvent = field(compare=False)
+    snapshot: AlertSnapshot = field(compare=False)
+    on_done: Optional[Callable[[bool], Any]] = field(default=None, compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class DeliveryQueue:
+    """
+    Sends notifications on a background thread, retrying failed sends.
+
+    A failed delivery is rescheduled with exponential backoff until
+    `max_attempts` is reached, so a slow or unavailable provider (SMTP)
+    never blocks rule evaluation or clip building.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_sec: float = 2.0,
+        max_size: int = 100,
+    ) -> None:
+        """
+        Args:
+            max_attempts: Send attempts before a notification is dropped.
+            backoff_sec: Delay before the first retry, doubled on each retry.
+            max_size: Notifications waiting at once; new ones are dropped beyond it.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_sec = backoff_sec
+        self.max_size = max_size
+
+        self._heap: List[_Delivery] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(
+        self,
+        notifier: NotificationProvider,
+        event: AlertEvent,
+        snapshot: AlertSnapshot,
+        on_done: Optional[Callable[[bool], Any]] = None,
+    ) -> bool:
+        """
+        Queue a notification for delivery.
+
+        Args:
+            notifier: Provider that sends the notification.
+            event: Alert event.
+            snapshot: Clip and thumbnail attached to the event.
+            on_done: Called with True/False once the notification was sent or given up.
+
+        Returns:
+            False if the queue is full and the notification was dropped.
+        """
+        with self._cond:
+            if len(self._heap) >= self.max_size:
+                self.dropped += 1
+                logger.warning(
+                    f"Delivery queue full, dropping alert '{event.name}' "
+                    f"for stream '{event.stream_id}'"
+                )
+                accepted = False
+            else:
+                heapq.heappush(
+                    self._heap,
+                    _Delivery(
+                        due_at=time.monotonic(),
+                        seq=next(self._seq),
+                        notifier=notifier,
+                        event=event,
+                        snapshot=snapshot,
+                        on_done=on_done,
+                    ),
+                )
+                self._ensure_worker()
+                self._cond.notify_all()
+                accepted = True
+
+        if not accepted and on_done:
+            on_done(False)
+        return accepted
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued notification is sent or given up."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._heap and not self._in_flight, timeout=timeout
+            )
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "pending": len(self._heap) + self._in_flight,
+                "sent": self.sent,
+                "retried": self.retried,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._worker_loop, name="alert-delivery", daemon=True
+            )
+            self._thread.start()
+
+    def _next_due(self) -> _Delivery:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0].due_at <= now:
+                    self._in_flight += 1
+                    return heapq.heappop(self._heap)
+                timeout = self._heap[0].due_at - now if self._heap else None
+                self._cond.wait(timeout)
+
+    def _worker_loop(self) -> None:
+        while True:
+            delivery = self._next_due()
+            delivery.attempts += 1
+            try:
+                delivery.notifier.send(delivery.event, delivery.snapshot)
+                sent = True
+            except Exception:
+                sent = False
+                logger.exception(
+                    f"Sending alert '{delivery.event.name}' failed "
+                    f"(attempt {delivery.attempts}/{self.max_attempts})"
+                )
+            retry = not sent and delivery.attempts < self.max_attempts
+
+            with self._cond:
+                self._in_flight -= 1
+                if retry:
+                    self.retried += 1
+                    backoff = self.backoff_sec * 2 ** (delivery.attempts - 1)
+                    delivery.due_at = time.monotonic() + backoff
+                    heapq.heappush(self._heap, delivery)
+                elif sent:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+                self._cond.notify_all()
+
+            if not retry and delivery.on_done:
+                try:
+                    delivery.on_done(sent)
+                except Exception:
+                    logger.exception("Delivery callback failed")
+
+
+# Global instance
+delivery_queue = DeliveryQueue(
+    max_attempts=settings.ALERT_DELIVERY_ATTEMPTS,
+    backoff_sec=settings.ALERT_DELIVERY_BACKOFF_SEC,
+)
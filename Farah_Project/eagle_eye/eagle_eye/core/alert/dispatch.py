@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Union,
+    get_args,
+)
+
+logger = logging.getLogger(__name__)
+
+OverflowPolicy = Literal["drop_oldest", "drop_newest", "coalesce"]
+
+
+@dataclass
+class _QueuedAlert:
+    stream_id: str
+    frame: Any
+    result: Any
+    enqueued_at: float
+
+
+class AlertQueue:
+    """
+    Bounded queue feeding alert processing from a single background thread.
+
+    When the queue is full the `overflow` policy decides what is lost:
+
+    - "drop_oldest": discard the oldest queued alert to make room;
+    - "drop_newest": discard the incoming alert;
+    - "coalesce": keep only the latest alert per stream, so a detection
+      storm on one stream costs one slot (the oldest stream is dropped if
+      every slot holds a different stream).
+    """
+
+    #: Live queues, for monitoring
+    instances: ClassVar["weakref.WeakSet[AlertQueue]"] = weakref.WeakSet()
+
+    def __init__(
+        self,
+        handler: Callable[[str, Any, Any], Any],
+        max_size: int = 32,
+        overflow: OverflowPolicy = "coalesce",
+        name: str = "alert-queue",
+    ) -> None:
+        """
+        Args:
+            handler: Called as handler(stream_id, frame, result) for each alert.
+            max_size: Alerts waiting at once.
+            overflow: Policy applied when the queue is full.
+            name: Name of the worker thread.
+        """
+        if overflow not in get_args(OverflowPolicy):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.handler = handler
+        self.max_size = max(1, max_size)
+        self.overflow = overflow
+        self.name = name
+
+        self._items: Union[Deque[_QueuedAlert], "OrderedDict[str, _QueuedAlert]"] = (
+            OrderedDict() if overflow == "coalesce" else deque()
+        )
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._latency_ms = 0.0
+        self.max_latency_ms = 0.0
+
+        AlertQueue.instances.add(self)
+
+    def put(self, stream_id: str, frame: Any, result: Any) -> bool:
+        """
+        Queue an alert without blocking.
+
+        Returns:
+            False if the alert was dropped.
+        """
+        item = _QueuedAlert(stream_id, frame, result, time.monotonic())
+
+        with self._cond:
+            if self._closed:
+                return False
+            self.enqueued += 1
+
+            if self.overflow == "coalesce":
+                if stream_id in self._items:
+                    # Newer result of the same stream replaces the queued one
+                    self._items.pop(stream_id)
+                    self.coalesced += 1
+                elif len(self._items) >= self.max_size:
+                    self._items.popitem(last=False)
+                    self.dropped += 1
+                self._items[stream_id] = item
+            elif len(self._items) >= self.max_size:
+                self.dropped += 1
+                if self.overflow == "drop_newest":
+                    return False
+                self._items.popleft()
+                self._items.append(item)
+            else:
+                self._items.append(item)
+
+            self._ensure_worker()
+            self._cond.notify()
+            return True
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the queue is empty and no alert is being processed."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._items and not self._busy, timeout=timeout
+            )
+
+    def close(self) -> None:
+        """Stop accepting alerts; queued alerts are still processed."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, drop counts and processing latency."""
+        with self._cond:
+            return {
+                "name": self.name,
+                "policy": self.overflow,
+                "depth": len(self._items),
+                "max_size": self.max_size,
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "failed": self.failed,
+                "avg_latency_ms": round(self._latency_ms, 2),
+                "max_latency_ms": round(self.max_latency_ms, 2),
+            }
+
+    @classmethod
+    def all_stats(cls) -> List[Dict[str, Any]]:
+        return [queue.stats for queue in list(cls.instances)]
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._worker_loop, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def _next(self) -> Optional[_QueuedAlert]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed)
+            if not self._items:
+                return None
+            self._busy = True
+            if isinstance(self._items, OrderedDict):
+                return self._items.popitem(last=False)[1]
+            return self._items.popleft()
+
+    def _worker_loop(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+
+            failed = False
+            try:
+                self.handler(item.stream_id, item.frame, item.result)
+            except Exception:
+                failed = True
+                logger.exception(
+                    f"Alert handling failed in '{self.name}' for stream '{item.stream_id}'"
+                )
+
+            # Latency from enqueue to the end of processing
+            latency_ms = (time.monotonic() - item.enqueued_at) * 1000
+            with self._cond:
+                self._busy = False
+                self.processed += 1
+                self.failed += failed
+                self._latency_ms = (
+                    latency_ms
+                    if self.processed == 1
+                    else 0.9 * self._latency_ms + 0.1 * latency_ms
+                )
+                self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+                self._cond.notify_all()
@@ -1,37 +1,65 @@
 import logging
 import threading
 import time
+import uuid
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Iterable, List
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
 
 import cv2
 import numpy as np
 
+from eagle_eye.config.folder_manager import CLIPS_DIR
+from eagle_eye.config.settings import settings
+
 from .buffer.registry import VideoBufferRegistry
+from .buffer.ring_buffer import Frame
+from .delivery import DeliveryQueue, delivery_queue
 from .event import AlertEvent
 from .notifier.base import NotificationProvider
 from .rules.base import AlertRule
 from .severity import AlertSeverity
 from .snapshot import AlertSnapshot
 from .video.encoder import VideoEncoder
+from .video.profile import CLIP_PROFILES, ClipProfile
 
 logger = logging.getLogger(__name__)
 
+#: Shared pool building alert clips (decode + encode), off the frame path
+clip_executor_pool = ThreadPoolExecutor(
+    max_workers=settings.ALERT_CLIP_WORKERS,
+    thread_name_prefix="alert-clip",
+)
+
 
 class BaseAlertManager(ABC):
     """Base contract for all alert managers."""
 
     @abstractmethod
-    def process(self, stream_id: str, frame_bytes: bytes, result: dict) -> None:
-        """Process a frame and inference result."""
+    def process(self, stream_id: str, frame: Frame, result: dict) -> None:
+        """Process a frame (raw BGR or encoded bytes) and inference result."""
         raise NotImplementedError
 
+    def record(self, stream_id: str, frame: Frame) -> None:
+        """Feed a frame to the clip recorder; called for every frame."""
+        return
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for alerts still being processed in the background."""
+        return True
+
 
 class AlertManager(BaseAlertManager):
     """
     Manages the lifecycle of alerts, including rule evaluation, cooldown management,
     and notification dispatching with video clips.
+
+    Alerts go through three stages so the caller is never held up:
+    rules and cooldowns are evaluated under a per-stream lock, clips are
+    built on a shared worker pool, and notifications are sent from a
+    retrying delivery queue.
     """
 
     def __init__(
@@ -43,6 +71,9 @@ class AlertManager(BaseAlertManager):
         clip_seconds: int = 15,
         cooldown_sec: int = 30,
         severity: AlertSeverity = AlertSeverity.MEDIUM,
+        clip_executor: Optional[Executor] = None,
+        delivery: Optional[DeliveryQueue] = None,
+        clip_profile: Optional[ClipProfile] = None,
     ):
         """
         Initializes the AlertManager.
@@ -55,6 +86,11 @@ class AlertManager(BaseAlertManager):
             clip_seconds: Duration of the video clip to include with alerts.
             cooldown_sec: Minimum time between alerts for the same stream.
             severity: Default severity level for alerts.
+            clip_executor: Pool building the clips (default: shared clip pool).
+            delivery: Queue sending the notifications (default: shared queue).
+            clip_profile: Size and quality of the clips; clips still over its
+                size cap are stored locally and linked instead of attached
+                (default: settings.ALERT_CLIP_PROFILE).
         """
         self.rules = rules
         self.notifier = notifier
@@ -63,18 +99,47 @@ class AlertManager(BaseAlertManager):
         self.clip_seconds = clip_seconds
         self.cooldown_sec = cooldown_sec
         self._cooldowns = defaultdict(float)
-        self._lock = threading.RLock()
+        self._stream_locks: Dict[str, threading.Lock] = {}
         self.severity = severity
+        self.clip_executor = clip_executor or clip_executor_pool
+        self.delivery = delivery or delivery_queue
+        self.clip_profile = clip_profile or CLIP_PROFILES[settings.ALERT_CLIP_PROFILE]
+
+        # Alerts fired but not yet delivered (or given up)
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+
+    def record(self, stream_id: str, frame: Frame) -> None:
+        self.buffers.record(stream_id, frame)
+
+    def process(self, stream_id: str, frame: Frame, result: dict):
+        # No-op when the recorder already stored a frame this tick
+        self.buffers.record(stream_id, frame)
+
+        event = self._evaluate(stream_id, result)
+        if event is None:
+            return
+
+        with self._pending_cond:
+            self._pending += 1
+        try:
+            self.clip_executor.submit(self._build_and_deliver, event)
+        except RuntimeError:
+            # Executor shut down (interpreter exit)
+            self._alert_done(False)
 
-    def process(self, stream_id: str, frame_bytes: bytes, result: dict):
-        with self._lock:
-            buffer = self.buffers.get(stream_id)
-            buffer.push(frame_bytes)
+    def _evaluate(self, stream_id: str, result: dict) -> Optional[AlertEvent]:
+        """Check cooldown and rules for one stream; return the event to fire, if any."""
+        lock = self._stream_locks.get(stream_id)
+        if lock is None:
+            lock = self._stream_locks.setdefault(stream_id, threading.Lock())
 
+        # Streams never wait on each other, only on their own previous frame
+        with lock:
             now = time.time()
             # Check cooldown
             if now < self._cooldowns[stream_id]:
-                return
+                return None
 
             # Evaluate ALL rules
             satisfied_rules = []
@@ -83,51 +148,174 @@ class AlertManager(BaseAlertManager):
                     satisfied_rules.append(rule)
 
             # Requirement: "rules inside the AlertManager must all is True to send a one event"
-            if len(satisfied_rules) == len(self.rules) and len(self.rules) > 0:
-                # All rules passed. Trigger one event.
-                event = AlertEvent(
-                    name=self.name,
-                    stream_id=stream_id,
-                    severity=self.severity,
-                    triggered_rules=[r.name for r in satisfied_rules],
-                    metadata=result,
-                    timestamp=now,
-                )
+            if len(satisfied_rules) != len(self.rules) or len(self.rules) == 0:
+                return None
 
-                data = self._build_clip(stream_id)
+            # Start the cooldown now, before the clip is built
+            self._cooldowns[stream_id] = now + self.cooldown_sec
 
-                self.notifier.send(event, data)
+            # Cleanup all rules
+            for rule in self.rules:
+                rule.cleanup(stream_id)
 
-                self._cooldowns[stream_id] = now + self.cooldown_sec
+        # All rules passed. Trigger one event.
+        return AlertEvent(
+            name=self.name,
+            stream_id=stream_id,
+            severity=self.severity,
+            triggered_rules=[r.name for r in satisfied_rules],
+            metadata=result,
+            timestamp=now,
+        )
 
-                # Cleanup all rules
-                for rule in self.rules:
-                    rule.cleanup(stream_id)
+    def _build_and_deliver(self, event: AlertEvent) -> None:
+        try:
+            data = self._build_clip(event.stream_id, until=event.timestamp)
+        except Exception:
+            logger.exception(
+                f"Building clip for alert '{self.name}' stream '{event.stream_id}' failed"
+            )
+            self._alert_done(False)
+            return
+        self.delivery.submit(self.notifier, event, data, on_done=self._alert_done)
 
-    def _build_clip(self, stream_id: str) -> AlertSnapshot:
-        frames = self.buffers.get(stream_id).get_last_seconds(self.clip_seconds)
-        fps = self.buffers.get(stream_id).fps
+    def _alert_done(self, sent: bool) -> None:
+        with self._pending_cond:
+            self._pending -= 1
+            self._pending_cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every fired alert was delivered or given up.
+
+        Returns:
+            False if the timeout expired first.
+        """
+        with self._pending_cond:
+            return self._pending_cond.wait_for(
+                lambda: self._pending == 0, timeout=timeout
+            )
+
+    def _build_clip(self, stream_id: str, until: float) -> AlertSnapshot:
+        buffer = self.buffers.get(stream_id)
+        # Select by capture time so gaps in the stream do not stretch the clip
+        frames = buffer.get_range(until - self.clip_seconds, until)
+        fps = buffer.fps
 
         # Extract thumbnail from first available frame
         thumbnail_bytes = None
-        if frames:
+        if len(frames):
             try:
-                # Decode first frame
-                nparr = np.frombuffer(frames[0], np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                if img is not None:
+                first = frames[0]
+                if isinstance(first, np.ndarray):
                     # Encode as JPEG with high quality
                     encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 90]
-                    _, buffer = cv2.imencode(".jpg", img, encode_param)
-                    thumbnail_bytes = buffer.tobytes()
+                    success, encoded = cv2.imencode(".jpg", first, encode_param)
+                    if success:
+                        thumbnail_bytes = encoded.tobytes()
+                else:
+                    # Already an encoded image, no need to transcode
+                    thumbnail_bytes = bytes(first)
             except Exception as e:
                 logger.error(f"Failed to extract thumbnail: {e}")
 
-        video_bytes = self._encode_video(frames, fps)
+        max_bytes = self.clip_profile.max_bytes
+        if buffer.segments is not None:
+            # Join the pre-encoded segments instead of encoding the frames now
+            video_bytes = buffer.segments.clip(until - self.clip_seconds, until)
+            if max_bytes and len(video_bytes) > max_bytes and len(frames):
+                compact = self._encode_video(frames, fps)
+                if len(compact) <= max_bytes:
+                    video_bytes = compact
+        else:
+            video_bytes = self._encode_video(frames, fps)
+
+        if max_bytes and len(video_bytes) > max_bytes:
+            # Too large to attach: keep it on disk and send a link instead
+            path = self._store_clip(stream_id, until, video_bytes)
+            logger.info(
+                f"Clip of {len(video_bytes)} bytes over the {max_bytes} byte cap, "
+                f"stored at {path}"
+            )
+            return AlertSnapshot(
+                video_bytes=b"",
+                thumbnail_bytes=thumbnail_bytes,
+                video_path=str(path),
+                video_url=_clip_url(path.name),
+            )
         return AlertSnapshot(video_bytes=video_bytes, thumbnail_bytes=thumbnail_bytes)
 
-    def _encode_video(self, frames: List[bytes], fps: int) -> bytes:
-        return VideoEncoder.encode(frames, fps=fps)
+    def _encode_video(self, frames: Sequence[Frame], fps: int) -> bytes:
+        return VideoEncoder.encode(frames, fps=fps, profile=self.clip_profile)
+
+    def _store_clip(self, stream_id: str, until: float, video_bytes: bytes) -> Path:
+        CLIPS_DIR.mkdir(parents=True, exist_ok=True)
+        # The stream ID comes from the client: never part of the path
+        path = CLIPS_DIR / f"{int(until * 1000)}_{uuid.uuid4().hex}.mp4"
+        path.write_bytes(video_bytes)
+        prune_clips(
+            CLIPS_DIR,
+            max_age_sec=settings.CLIPS_MAX_AGE_HOURS * 3600,
+            max_bytes=int(settings.CLIPS_MAX_MB * 1024 * 1024),
+            keep=path,
+        )
+        return path
+
+
+def prune_clips(
+    directory: Path,
+    max_age_sec: float,
+    max_bytes: int,
+    keep: Optional[Path] = None,
+    now: Optional[float] = None,
+) -> List[Path]:
+    """
+    Delete stored clips older than `max_age_sec`, then the oldest ones until
+    the directory holds at most `max_bytes`.
+
+    Args:
+        directory: Directory of the stored clips.
+        max_age_sec: Maximum clip age (0 = no age limit).
+        max_bytes: Maximum total size (0 = no size limit).
+        keep: Clip never deleted (the one just stored).
+        now: Current time (default: time.time()).
+
+    Returns:
+        Paths of the deleted clips.
+    """
+    now = time.time() if now is None else now
+    clips = []
+    for path in directory.glob("*.mp4"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # deleted meanwhile by another clip worker
+        clips.append((stat.st_mtime, stat.st_size, path))
+    clips.sort()
+
+    total = sum(size for _, size, _ in clips)
+    deleted = []
+    for mtime, size, path in clips:
+        too_old = max_age_sec and now - mtime > max_age_sec
+        too_large = max_bytes and total > max_bytes
+        if not (too_old or too_large):
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+        deleted.append(path)
+
+    if deleted:
+        logger.info(f"Deleted {len(deleted)} stored clip(s) from {directory}")
+    return deleted
+
+
+def _clip_url(filename: str) -> Optional[str]:
+    """Public link to a stored clip, if the API's base URL is known."""
+    if not settings.PUBLIC_BASE_URL:
+        return None
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/v1/media/clips/{filename}"
 
 
 class AlertManagerGroup(BaseAlertManager):
@@ -139,10 +327,31 @@ class AlertManagerGroup(BaseAlertManager):
     def __init__(self, managers: Iterable[BaseAlertManager]):
         self.managers: List[BaseAlertManager] = list(managers)
 
-    def process(self, stream_id: str, frame_bytes: bytes, result: dict) -> None:
+    def record(self, stream_id: str, frame: Frame) -> None:
+        # Managers usually share one buffer registry; record into each only once
+        seen = set()
+        for manager in self.managers:
+            buffers = getattr(manager, "buffers", None)
+            if buffers is not None:
+                if id(buffers) in seen:
+                    continue
+                seen.add(id(buffers))
+            try:
+                manager.record(stream_id, frame)
+            except Exception:
+                logger.exception(
+                    "Recording failed in %s for stream_id=%s",
+                    manager.__class__.__name__,
+                    stream_id,
+                )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return all(manager.flush(timeout) for manager in self.managers)
+
+    def process(self, stream_id: str, frame: Frame, result: dict) -> None:
         for manager in self.managers:
             try:
-                manager.process(stream_id, frame_bytes, result)
+                manager.process(stream_id, frame, result)
             except Exception:
                 logger.exception(
                     "AlertManager %s failed for stream_id=%s",
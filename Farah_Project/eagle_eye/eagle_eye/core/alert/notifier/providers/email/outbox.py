@@ -0,0 +1,220 @@
+import json
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from eagle_eye.core.alert.event import AlertEvent
+from eagle_eye.core.alert.severity import AlertSeverity
+from eagle_eye.core.alert.snapshot import AlertSnapshot
+from eagle_eye.database.models import EmailOutbox
+from eagle_eye.database.sql.outbox_store import OutboxStore
+
+if TYPE_CHECKING:
+    from .provider import EmailNotificationProvider
+
+logger = logging.getLogger(__name__)
+
+
+def encode_event(event: AlertEvent) -> str:
+    return json.dumps(
+        {
+            "name": event.name,
+            "stream_id": event.stream_id,
+            "severity": event.severity.value,
+            "triggered_rules": event.triggered_rules,
+            "metadata": event.metadata,
+            "timestamp": event.timestamp,
+        },
+        default=str,
+    )
+
+
+def decode_event(data: str) -> AlertEvent:
+    fields = json.loads(data)
+    fields["severity"] = AlertSeverity(fields["severity"])
+    return AlertEvent(**fields)
+
+
+class EmailOutboxSender:
+    """
+    Background sender delivering the outbox of one SMTP channel.
+
+    Alerts created within `digest_window_sec` of the oldest pending one are
+    sent together as a single email (up to `digest_max_alerts` clips). A
+    failed email is retried with exponential backoff; entries survive
+    restarts since they live in the database until delivered. Delivered and
+    failed entries are deleted once older than `retention_sec`.
+    """
+
+    def __init__(
+        self,
+        provider: "EmailNotificationProvider",
+        digest_window_sec: float = 30.0,
+        digest_max_alerts: int = 5,
+        max_attempts: int = 5,
+        backoff_sec: float = 30.0,
+        poll_interval_sec: float = 5.0,
+        retention_sec: float = 7 * 86400,
+        purge_interval_sec: float = 3600.0,
+    ) -> None:
+        """
+        Args:
+            provider: Builds and sends the emails.
+            digest_window_sec: How long the oldest pending alert may wait for others.
+            digest_max_alerts: Alerts per email at most.
+            max_attempts: Attempts before an entry is marked as failed.
+            backoff_sec: Delay before the first retry, doubled on each retry.
+            poll_interval_sec: Longest sleep between outbox checks.
+            retention_sec: Age at which sent and failed entries are deleted
+                (0 = kept forever).
+            purge_interval_sec: Time between two purges of old entries.
+        """
+        self.provider = provider
+        self.digest_window_sec = digest_window_sec
+        self.digest_max_alerts = max(1, digest_max_alerts)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_sec = backoff_sec
+        self.poll_interval_sec = poll_interval_sec
+        self.retention_sec = retention_sec
+        self.purge_interval_sec = purge_interval_sec
+        self._purged_at = 0.0
+
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.emails_sent = 0
+        self.alerts_sent = 0
+        self.failures = 0
+
+    @property
+    def channel(self) -> str:
+        return self.provider.channel
+
+    def start(self) -> "EmailOutboxSender":
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"email-outbox-{self.channel}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def wake(self) -> None:
+        """Check the outbox now (a new alert was queued)."""
+        self._wake.set()
+
+    def send_due(self, now: Optional[float] = None, force: bool = False) -> int:
+        """
+        Send the next digest if it is ready.
+
+        Args:
+            now: Current time (epoch seconds).
+            force: Send pending alerts without waiting for the digest window.
+
+        Returns:
+            Number of alerts delivered.
+        """
+        now = time.time() if now is None else now
+        entries = OutboxStore.due(self.channel, now, limit=self.digest_max_alerts)
+        if not entries:
+            return 0
+
+        window_open = now - entries[0].created_at < self.digest_window_sec
+        if window_open and len(entries) < self.digest_max_alerts and not force:
+            return 0
+
+        # One email per recipient list
+        recipients = entries[0].recipients
+        entries = [entry for entry in entries if entry.recipients == recipients]
+        ids = [entry.id for entry in entries]
+
+        try:
+            self.provider.deliver(_alerts(entries), recipients.split(","))
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Sending {len(ids)} alert(s) failed: {e}")
+            OutboxStore.mark_failed(
+                ids, str(e), now, self.max_attempts, self.backoff_sec
+            )
+            return 0
+
+        OutboxStore.mark_sent(ids, now)
+        self.emails_sent += 1
+        self.alerts_sent += len(ids)
+        return len(ids)
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """
+        Delete sent and failed entries older than `retention_sec`.
+
+        Runs at most once per `purge_interval_sec`.
+
+        Returns:
+            Number of deleted entries.
+        """
+        now = time.time() if now is None else now
+        if not self.retention_sec or now - self._purged_at < self.purge_interval_sec:
+            return 0
+        self._purged_at = now
+        count = OutboxStore.purge(self.channel, before=now - self.retention_sec)
+        if count:
+            logger.info(f"Purged {count} old outbox entries of {self.channel}")
+        return count
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "emails_sent": self.emails_sent,
+            "alerts_sent": self.alerts_sent,
+            "failures": self.failures,
+            "outbox": OutboxStore.counts(self.channel),
+        }
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                while self.send_due():
+                    pass
+                self.purge()
+                timeout = self._sleep_time()
+            except Exception:
+                logger.exception("Email outbox check failed")
+                timeout = self.poll_interval_sec
+
+            self._wake.wait(timeout)
+            self._wake.clear()
+        self.provider.close()
+
+    def _sleep_time(self) -> float:
+        """Seconds until the next digest window closes or a retry is due."""
+        next_attempt = OutboxStore.next_attempt_at(self.channel)
+        if next_attempt is None:
+            # Connections are not kept open while there is nothing to send
+            self.provider.close()
+            return self.poll_interval_sec
+        entries = OutboxStore.due(self.channel, time.time(), limit=1)
+        ready_at = (
+            entries[0].created_at + self.digest_window_sec if entries else next_attempt
+        )
+        return min(self.poll_interval_sec, max(0.05, ready_at - time.time()))
+
+
+def _alerts(entries: List[EmailOutbox]) -> List[Tuple[AlertEvent, AlertSnapshot]]:
+    return [
+        (
+            decode_event(entry.event),
+            AlertSnapshot(
+                video_bytes=entry.video,
+                thumbnail_bytes=entry.thumbnail,
+                video_url=entry.video_url,
+            ),
+        )
+        for entry in entries
+    ]
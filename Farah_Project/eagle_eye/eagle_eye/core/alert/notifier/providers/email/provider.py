@@ -1,6 +1,7 @@
 import logging
 import smtplib
 import ssl
+import threading
 from datetime import datetime
 from email import encoders
 from email.mime.base import MIMEBase
@@ -8,19 +9,35 @@ from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
 
 from jinja2 import Environment, FileSystemLoader
 
 from eagle_eye.config.settings import settings
 from eagle_eye.core.alert.event import AlertEvent
 from eagle_eye.core.alert.snapshot import AlertSnapshot
+from eagle_eye.database.sql.outbox_store import OutboxStore
 
 from ...base import NotificationProvider
+from .outbox import EmailOutboxSender, encode_event
 
 logger = logging.getLogger(__name__)
 
 
+#: One outbox sender per SMTP channel, shared by all providers using it
+_senders: Dict[str, EmailOutboxSender] = {}
+_senders_lock = threading.Lock()
+
+
 class EmailNotificationProvider(NotificationProvider):
+    """
+    Sends alerts by email.
+
+    With `outbox=True` (default) `send()` only stores the alert in the
+    database outbox; a background sender delivers it over a reused SMTP
+    connection, grouping alerts that arrive close together into one email.
+    """
+
     def __init__(
         self,
         smtp_server: str = "smtp.gmail.com",
@@ -29,6 +46,8 @@ class EmailNotificationProvider(NotificationProvider):
         password: str = None,
         from_email: str = None,
         to_emails: list[str] = None,
+        use_ssl: bool = True,
+        outbox: bool = True,
     ):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
@@ -36,11 +55,37 @@ class EmailNotificationProvider(NotificationProvider):
         self.password = password or settings.GMAIL_PASSWORD
         self.from_email = from_email or self.username
         self.to_emails = to_emails or settings.TO_EMAILS
+        self.use_ssl = use_ssl
+        self.outbox = outbox
 
         # Setup Jinja2 environment
         template_dir = Path(__file__).parent / "templates"
         self.env = Environment(loader=FileSystemLoader(str(template_dir)))
 
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_lock = threading.RLock()
+
+    @property
+    def channel(self) -> str:
+        """Identifies the SMTP account; outbox entries are grouped by it."""
+        return f"{self.username}@{self.smtp_server}:{self.smtp_port}"
+
+    @property
+    def sender(self) -> EmailOutboxSender:
+        """Background sender of this provider's channel (started on first use)."""
+        with _senders_lock:
+            sender = _senders.get(self.channel)
+            if sender is None:
+                sender = _senders[self.channel] = EmailOutboxSender(
+                    self,
+                    digest_window_sec=settings.EMAIL_DIGEST_WINDOW_SEC,
+                    digest_max_alerts=settings.EMAIL_DIGEST_MAX_ALERTS,
+                    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+                    backoff_sec=settings.EMAIL_RETRY_BACKOFF_SEC,
+                    retention_sec=settings.EMAIL_OUTBOX_RETENTION_DAYS * 86400,
+                )
+        return sender.start()
+
     def send(self, event: AlertEvent, snapshot: AlertSnapshot) -> None:
         if not self.username or not self.password:
             logger.error("Email credentials not configured.")
@@ -50,32 +95,38 @@ class EmailNotificationProvider(NotificationProvider):
             logger.error("No recipient emails configured.")
             return
 
-        # Use thumbnail from AlertSnapshot
-        snapshot_bytes = snapshot.thumbnail_bytes
-
-        # Prepare timestamp
-        event_dt = datetime.fromtimestamp(event.timestamp)
-
-        # Decide video filename
-        video_filename = f"alert_{event.timestamp}.mp4"
-        video_cid = video_filename  # use filename as CID for referencing
+        if not self.outbox:
+            self.deliver([(event, snapshot)], self.to_emails)
+            return
 
-        # Render HTML body
-        template = self.env.get_template("alert.html")
-        html_content = template.render(
-            event=event,
-            event_dt=event_dt,
-            now=datetime.now(),
-            has_snapshot=bool(snapshot_bytes),
-            video_cid=video_cid,
-            filename=video_filename,  # for hyperlink in template
+        OutboxStore.enqueue(
+            channel=self.channel,
+            recipients=self.to_emails,
+            event=encode_event(event),
+            video=snapshot.video_bytes,
+            thumbnail=snapshot.thumbnail_bytes,
+            video_url=snapshot.video_url,
         )
+        self.sender.wake()
+
+    def resume(self) -> None:
+        """Start delivering alerts left in the outbox by a previous run."""
+        self.sender.wake()
 
+    def build_message(
+        self,
+        alerts: Sequence[Tuple[AlertEvent, AlertSnapshot]],
+        to_emails: Sequence[str],
+    ) -> MIMEMultipart:
+        """Build one email carrying the clips of all `alerts`."""
         # Create root message
         msg = MIMEMultipart("mixed")
-        msg["Subject"] = f"Security Alert: {event.name.title()}"
+        if len(alerts) == 1:
+            msg["Subject"] = f"Security Alert: {alerts[0][0].name.title()}"
+        else:
+            msg["Subject"] = f"Security Alerts: {len(alerts)} events"
         msg["From"] = self.from_email
-        msg["To"] = ", ".join(self.to_emails)
+        msg["To"] = ", ".join(to_emails)
 
         # Create `related` section for HTML + inline images
         msg_related = MIMEMultipart("related")
@@ -84,35 +135,118 @@ class EmailNotificationProvider(NotificationProvider):
         msg_alternative = MIMEMultipart("alternative")
         msg_related.attach(msg_alternative)
 
+        items = []
+        for index, (event, snapshot) in enumerate(alerts):
+            # Decide video filename
+            video_filename = f"alert_{event.timestamp}.mp4"
+            snapshot_cid = "snapshot" if len(alerts) == 1 else f"snapshot-{index}"
+            # Clips over the size cap are linked instead of attached; their
+            # local path means nothing to the recipient, so without a public
+            # URL the email carries no link at all
+            if snapshot.video_bytes:
+                video_link = f"cid:{video_filename}"
+            else:
+                video_link = snapshot.video_url
+            items.append(
+                {
+                    "event": event,
+                    "event_dt": datetime.fromtimestamp(event.timestamp),
+                    "has_snapshot": bool(snapshot.thumbnail_bytes),
+                    "snapshot_cid": snapshot_cid,
+                    # use filename as CID for referencing
+                    "video_cid": video_filename,
+                    "video_link": video_link,
+                    "filename": video_filename,
+                }
+            )
+
+            # Inline snapshot image
+            if snapshot.thumbnail_bytes:
+                img = MIMEImage(snapshot.thumbnail_bytes, _subtype="jpeg")
+                img.add_header("Content-ID", f"<{snapshot_cid}>")
+                img.add_header(
+                    "Content-Disposition", "inline", filename=f"{snapshot_cid}.jpg"
+                )
+                msg_related.attach(img)
+
+            if not snapshot.video_bytes:
+                continue
+
+            # Attach video as regular attachment with a Content-ID
+            part = MIMEBase("application", "octet-stream")
+            part.set_payload(snapshot.video_bytes)
+            encoders.encode_base64(part)
+
+            # Add attachment headers
+            part.add_header(
+                "Content-Disposition", f'attachment; filename="{video_filename}"'
+            )
+            part.add_header("Content-ID", f"<{video_filename}>")
+            msg.attach(part)
+
+        # Render HTML body
+        if len(items) == 1:
+            html_content = self.env.get_template("alert.html").render(
+                now=datetime.now(), **items[0]
+            )
+        else:
+            html_content = self.env.get_template("digest.html").render(
+                now=datetime.now(), alerts=items
+            )
         msg_alternative.attach(MIMEText(html_content, "html"))
 
-        # Inline snapshot image
-        if snapshot_bytes:
-            img = MIMEImage(snapshot_bytes)
-            img.add_header("Content-ID", "<snapshot>")
-            img.add_header("Content-Disposition", "inline", filename="snapshot.jpg")
-            msg_related.attach(img)
-
-        # Attach video as regular attachment with a Content-ID
-        part = MIMEBase("application", "octet-stream")
-        part.set_payload(snapshot.video_bytes)
-        encoders.encode_base64(part)
-
-        # Add attachment headers
-        part.add_header(
-            "Content-Disposition", f'attachment; filename="{video_filename}"'
-        )
-        part.add_header("Content-ID", f"<{video_cid}>")
-        msg.attach(part)
+        return msg
 
-        # Send the email
-        context = ssl.create_default_context()
+    def deliver(
+        self,
+        alerts: Sequence[Tuple[AlertEvent, AlertSnapshot]],
+        to_emails: Sequence[str],
+    ) -> None:
+        """
+        Send `alerts` as one email over the shared SMTP connection.
+
+        Raises:
+            smtplib.SMTPException, OSError: if sending failed.
+        """
+        msg = self.build_message(alerts, to_emails)
+
+        with self._smtp_lock:
+            try:
+                self._connection().send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # The server closed an idle connection: reconnect once
+                self.close()
+                self._connection().send_message(msg)
+        logger.info(f"Email with {len(alerts)} alert(s) sent to {list(to_emails)}")
+
+    def close(self) -> None:
+        """Close the SMTP connection, if open."""
+        with self._smtp_lock:
+            if self._smtp is None:
+                return
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def _connection(self) -> smtplib.SMTP:
+        """Return the open SMTP connection, connecting and logging in if needed."""
+        if self._smtp is not None:
+            return self._smtp
+
+        if self.use_ssl:
+            context = ssl.create_default_context()
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=context)
+        else:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
         try:
-            with smtplib.SMTP_SSL(
-                self.smtp_server, self.smtp_port, context=context
-            ) as server:
+            server.ehlo()
+            # Servers without AUTH (local relays, test stand-ins) take mail as-is
+            if self.password and server.has_extn("auth"):
                 server.login(self.username, self.password)
-                server.send_message(msg)
-            logger.info(f"Email sent to {self.to_emails}")
-        except Exception as e:
-            logger.error(f"Failed to send email: {e}")
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        return server
@@ -1,5 +1,6 @@
 import json
 import logging
+import shutil
 from datetime import datetime
 from pathlib import Path
 
@@ -40,7 +41,11 @@ class LocalFileProvider(NotificationProvider):
 
         # Save video clip
         video_path = alert_dir / "video.mp4"
-        video_path.write_bytes(snapshot.video_bytes)
+        if snapshot.video_bytes or not snapshot.video_path:
+            video_path.write_bytes(snapshot.video_bytes)
+        else:
+            # Clip over the attachment cap, already stored on disk
+            shutil.copyfile(snapshot.video_path, video_path)
 
         # Save thumbnail
         if snapshot.thumbnail_bytes is not None:
@@ -7,3 +7,7 @@ class AlertSnapshot:
 
     video_bytes: bytes
     thumbnail_bytes: bytes | None = None
+    #: Clip stored on disk instead of attached (too large for `video_bytes`)
+    video_path: str | None = None
+    #: Link to the stored clip, when a public base URL is configured
+    video_url: str | None = None
@@ -1,64 +1,430 @@
-import tempfile
+import io
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from fractions import Fraction
 from pathlib import Path
-from typing import List
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
+import av
 import cv2
 import numpy as np
 
+from ..buffer.ring_buffer import Frame
+from .profile import ClipProfile
+
+logger = logging.getLogger(__name__)
+
+#: Where encoded video goes: a file path, a writable binary file object,
+#: or a callable receiving each chunk of bytes
+Sink = Union[str, Path, BinaryIO, Callable[[bytes], Any]]
+
+#: OpenCV FourCC names accepted for backwards compatibility
+_FOURCC_CODECS = {
+    "mp4v": "mpeg4",
+    "xvid": "mpeg4",
+    "avc1": "libx264",
+    "h264": "libx264",
+}
+
+#: Fragmented MP4 never seeks back, so it can be written to any stream
+_STREAMING_MP4_OPTIONS = {"movflags": "frag_keyframe+empty_moov"}
+
+
+def decode_frame(frame: Frame) -> Optional[np.ndarray]:
+    """Return a BGR image, decoding only if the frame is encoded."""
+    if isinstance(frame, np.ndarray):
+        return frame
+    return cv2.imdecode(np.frombuffer(frame, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class _CallbackWriter(io.RawIOBase):
+    """Non-seekable file object forwarding every write to a callback."""
+
+    def __init__(self, callback: Callable[[bytes], Any]) -> None:
+        self._callback = callback
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._callback(bytes(data))
+        return len(data)
+
+
+def _open_output(sink: Sink, container: str) -> av.container.OutputContainer:
+    options = _STREAMING_MP4_OPTIONS if container == "mp4" else {}
+    if isinstance(sink, (str, Path)):
+        return av.open(str(sink), mode="w", format=container)
+    if callable(sink) and not hasattr(sink, "write"):
+        sink = _CallbackWriter(sink)
+    return av.open(sink, mode="w", format=container, options=options)
+
+
+class StreamingVideoEncoder:
+    """
+    Encodes frames one at a time straight into a sink.
+
+    Nothing touches the disk unless the sink is a path, and only the
+    encoder's own packets are buffered, so clips never have to be held in
+    memory as a whole. The output size is taken from the first frame.
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        fps: int = 10,
+        codec: str = "mpeg4",
+        container: str = "mp4",
+        bit_rate: Optional[int] = 1_000_000,
+        start_pts: int = 0,
+        max_width: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            sink: File path, writable binary file object or chunk callback.
+            fps: Frames per second of the output video.
+            codec: FFmpeg encoder name (OpenCV FourCC names are mapped).
+            container: Output format, e.g. "mp4" or "mpegts".
+            bit_rate: Target bit rate in bits per second (None = codec default).
+            start_pts: Timestamp of the first frame, in frames.
+            max_width: Downscale frames wider than this.
+        """
+        self.sink = sink
+        self.fps = fps
+        self.codec = _FOURCC_CODECS.get(codec.lower(), codec)
+        self.container = container
+        self.bit_rate = bit_rate
+        self.max_width = max_width
+        self.frames_written = 0
+        self.size: Optional[tuple[int, int]] = None
+
+        self._pts = start_pts
+        self._output: Optional[av.container.OutputContainer] = None
+        self._stream = None
+
+    def _open(self, width: int, height: int) -> None:
+        self._output = _open_output(self.sink, self.container)
+        self._stream = self._output.add_stream(self.codec, rate=self.fps)
+        self._stream.width = width
+        self._stream.height = height
+        self._stream.pix_fmt = "yuv420p"
+        self._stream.codec_context.time_base = Fraction(1, self.fps)
+        if self.bit_rate:
+            self._stream.bit_rate = self.bit_rate
+        self.size = (width, height)
+
+    def write(self, frame: Frame) -> bool:
+        """
+        Encode one frame.
+
+        Returns:
+            False if the frame could not be decoded and was skipped.
+        """
+        image = decode_frame(frame)
+        if image is None:
+            return False
+
+        if self._output is None:
+            height, width = image.shape[:2]
+            if self.max_width and width > self.max_width:
+                height = round(height * self.max_width / width)
+                width = self.max_width
+            # yuv420p needs even dimensions
+            self._open(width - width % 2, height - height % 2)
+
+        width, height = self.size
+        if image.shape[1] != width or image.shape[0] != height:
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+        video_frame = av.VideoFrame.from_ndarray(image, format="bgr24")
+        video_frame.pts = self._pts
+        video_frame.time_base = Fraction(1, self.fps)
+        self._pts += 1
+
+        for packet in self._stream.encode(video_frame):
+            self._output.mux(packet)
+        self.frames_written += 1
+        return True
+
+    def close(self) -> None:
+        """Flush the encoder and finalize the container."""
+        if self._output is None:
+            return
+        for packet in self._stream.encode():
+            self._output.mux(packet)
+        self._output.close()
+        self._output = None
+
+    def __enter__(self) -> "StreamingVideoEncoder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@dataclass
+class _Segment:
+    start: float
+    end: float
+    size: tuple[int, int]
+    data: bytes
+
+
+class SegmentedVideoEncoder:
+    """
+    Encodes a rolling stream into short MPEG-TS segments as frames arrive.
+
+    Segments carry continuous timestamps, so a clip is built by
+    concatenating the finished segments that overlap the requested window
+    and remuxing them into MP4, without encoding any frame again.
+    """
+
+    def __init__(
+        self,
+        fps: int,
+        segment_seconds: float = 2.0,
+        retain_seconds: float = 20.0,
+        codec: str = "mpeg4",
+        bit_rate: Optional[int] = 1_000_000,
+    ) -> None:
+        """
+        Args:
+            fps: Frames per second of the recorded stream.
+            segment_seconds: Duration of each segment.
+            retain_seconds: Finished segments older than this are dropped.
+            codec: FFmpeg encoder name.
+            bit_rate: Target bit rate in bits per second.
+        """
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.retain_seconds = retain_seconds
+        self.codec = codec
+        self.bit_rate = bit_rate
+
+        self._segments: Deque[_Segment] = deque()
+        self._lock = threading.Lock()
+        self._pts = 0
+        self._current: Optional[StreamingVideoEncoder] = None
+        self._current_buffer: Optional[io.BytesIO] = None
+        self._current_start = 0.0
+        self._current_end = 0.0
+
+    def write(self, frame: np.ndarray, timestamp: float) -> None:
+        """Encode a frame into the current segment, rolling over when it is full."""
+        with self._lock:
+            height, width = frame.shape[:2]
+            size = (width - width % 2, height - height % 2)
+            if self._current is not None and (
+                timestamp - self._current_start >= self.segment_seconds
+                or self._current.size != size
+            ):
+                self._finish_segment()
+
+            if self._current is None:
+                self._current_buffer = io.BytesIO()
+                self._current = StreamingVideoEncoder(
+                    self._current_buffer,
+                    fps=self.fps,
+                    codec=self.codec,
+                    container="mpegts",
+                    bit_rate=self.bit_rate,
+                    start_pts=self._pts,
+                )
+                self._current_start = timestamp
+
+            if self._current.write(frame):
+                self._pts += 1
+                self._current_end = timestamp
+
+    def flush(self) -> None:
+        """Finish the segment being recorded so it can be part of a clip."""
+        with self._lock:
+            self._finish_segment()
+
+    def _finish_segment(self) -> None:
+        if self._current is None:
+            return
+        self._current.close()
+        if self._current.frames_written:
+            self._segments.append(
+                _Segment(
+                    start=self._current_start,
+                    end=self._current_end,
+                    size=self._current.size,
+                    data=self._current_buffer.getvalue(),
+                )
+            )
+        self._current = None
+        self._current_buffer = None
+
+        while (
+            self._segments
+            and self._current_end - self._segments[0].end > self.retain_seconds
+        ):
+            self._segments.popleft()
+
+    def segments(self, start: float, end: Optional[float] = None) -> List[bytes]:
+        """
+        Finished segments overlapping [start, end], oldest first.
+
+        Only the trailing run of segments sharing the newest resolution is
+        returned, since segments of different sizes cannot be joined.
+        """
+        with self._lock:
+            selected = [
+                segment
+                for segment in self._segments
+                if segment.end >= start and (end is None or segment.start <= end)
+            ]
+        if not selected:
+            return []
+        size = selected[-1].size
+        while selected[0].size != size:
+            selected.pop(0)
+        return [segment.data for segment in selected]
+
+    def clip(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        sink: Optional[Sink] = None,
+    ) -> Optional[bytes]:
+        """
+        Build an MP4 clip of [start, end] from the pre-encoded segments.
+
+        Args:
+            start: Epoch seconds of the clip start.
+            end: Epoch seconds of the clip end (None = newest).
+            sink: Where to write the clip; by default it is returned as bytes.
+
+        Returns:
+            The clip bytes when no sink is given, otherwise None.
+        """
+        self.flush()
+        segments = self.segments(start, end)
+        if sink is not None:
+            remux_to_mp4(segments, sink)
+            return None
+        buffer = io.BytesIO()
+        remux_to_mp4(segments, buffer)
+        return buffer.getvalue()
+
+
+def remux_to_mp4(segments: Sequence[bytes], sink: Sink) -> None:
+    """Join MPEG-TS segments and copy their packets into an MP4 container."""
+    if not segments:
+        return
+    source = av.open(io.BytesIO(b"".join(segments)), mode="r", format="mpegts")
+    output = _open_output(sink, "mp4")
+    try:
+        in_stream = source.streams.video[0]
+        out_stream = output.add_stream_from_template(in_stream)
+        offset = None
+        for packet in source.demux(in_stream):
+            if packet.dts is None:
+                continue
+            # Rebase so the clip starts at zero
+            if offset is None:
+                offset = min(
+                    packet.dts, packet.pts if packet.pts is not None else packet.dts
+                )
+            packet.dts -= offset
+            if packet.pts is not None:
+                packet.pts -= offset
+            packet.stream = out_stream
+            output.mux(packet)
+    finally:
+        output.close()
+        source.close()
+
 
 class VideoEncoder:
     @staticmethod
-    def encode(frames: List[bytes], fps: int = 10, codec: str = "mp4v") -> bytes:
+    def encode(
+        frames: Sequence[Frame],
+        fps: int = 10,
+        codec: str = "mp4v",
+        profile: Optional[ClipProfile] = None,
+    ) -> bytes:
         """
-        Encode a list of frame bytes into a video file (MP4).
+        Encode a sequence of frames into a video file (MP4).
 
         Args:
-            frames: List of frame data as bytes (JPEG/PNG encoded)
+            frames: Raw BGR frames, or frame data as bytes (JPEG/PNG encoded)
             fps: Frames per second for the output video
-            codec: FourCC codec string (default: 'mp4v' for MP4)
+            codec: Encoder name or FourCC string (default: 'mp4v' for MPEG-4)
+            profile: Resolution, frame rate, bit rate and size cap to honour
 
         Returns:
             Video file as bytes
         """
-        if not frames:
+        if len(frames) == 0:
             return b""
 
-        # Decode first frame to get dimensions
-        first_frame = cv2.imdecode(
-            np.frombuffer(frames[0], dtype=np.uint8), cv2.IMREAD_COLOR
+        buffer = io.BytesIO()
+        written = VideoEncoder.encode_to(
+            frames, buffer, fps=fps, codec=codec, profile=profile
         )
-        if first_frame is None:
+        if not written:
             return b"VIDEO_ENCODING_ERROR"
+        return buffer.getvalue()
 
-        height, width = first_frame.shape[:2]
-
-        # Use system temp directory instead of current directory
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp_file:
-            temp_path = tmp_file.name
-
-        try:
-            # Initialize video writer
-            fourcc = cv2.VideoWriter_fourcc(*codec)
-            writer = cv2.VideoWriter(temp_path, fourcc, fps, (width, height))
-
-            # Write all frames
-            for frame_bytes in frames:
-                frame = cv2.imdecode(
-                    np.frombuffer(frame_bytes, dtype=np.uint8), cv2.IMREAD_COLOR
-                )
-                if frame is not None:
-                    writer.write(frame)
+    @staticmethod
+    def encode_to(
+        frames: Sequence[Frame],
+        sink: Sink,
+        fps: int = 10,
+        codec: str = "mp4v",
+        profile: Optional[ClipProfile] = None,
+    ) -> int:
+        """
+        Encode frames into a sink (path, file object or chunk callback).
 
-            writer.release()
+        With a profile, frames are dropped to reach its frame rate and the
+        bit rate and resolution are lowered so the clip fits its size cap.
 
-            # Read the video file into memory
-            with open(temp_path, "rb") as f:
-                video_data = f.read()
+        Returns:
+            Number of frames written.
+        """
+        options = {}
+        if profile is not None and len(frames):
+            first = decode_frame(frames[0])
+            width = first.shape[1] if first is not None else 0
+            fitted = profile.fit(len(frames), fps, width)
+            step = max(1, round(fps / fitted.fps))
+            frames = frames[::step]
+            fps = max(1, round(fps / step))
+            options = {"bit_rate": fitted.bit_rate, "max_width": fitted.max_width}
 
-            return video_data
+        with StreamingVideoEncoder(sink, fps=fps, codec=codec, **options) as encoder:
+            for frame in frames:
+                encoder.write(frame)
+        return encoder.frames_written
 
+    @staticmethod
+    def iter_chunks(
+        frames: Sequence[Frame], fps: int = 10, codec: str = "mp4v"
+    ) -> Iterator[bytes]:
+        """Encode frames lazily, yielding MP4 chunks as soon as they are produced."""
+        chunks: List[bytes] = []
+        encoder = StreamingVideoEncoder(chunks.append, fps=fps, codec=codec)
+        try:
+            for frame in frames:
+                encoder.write(frame)
+                yield from chunks
+                chunks.clear()
         finally:
-            # Cleanup temp file
-            temp_path_obj = Path(temp_path)
-            if temp_path_obj.exists():
-                temp_path_obj.unlink()
+            encoder.close()
+        yield from chunks
@@ -0,0 +1,71 @@
+import math
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+#: Share of the size cap given to the video stream; the rest covers container overhead
+_CONTAINER_HEADROOM = 0.9
+
+
+@dataclass(frozen=True)
+class ClipProfile:
+    """
+    Output settings for alert clips.
+
+    Attributes:
+        max_width: Frames wider than this are downscaled (None = keep size).
+        fps: Output frame rate; frames are dropped to reach it (None = source fps).
+        bit_rate: Target video bit rate in bits per second.
+        max_bytes: Largest clip that may be attached (None = no limit).
+        min_bit_rate: Below this bit rate the clip is downscaled and frames
+            are dropped instead of starving the encoder.
+    """
+
+    max_width: Optional[int] = 640
+    fps: Optional[int] = None
+    bit_rate: int = 600_000
+    max_bytes: Optional[int] = None
+    min_bit_rate: int = 150_000
+
+    def fit(self, frame_count: int, source_fps: int, width: int) -> "ClipProfile":
+        """
+        Adjust the profile so a clip of `frame_count` frames fits `max_bytes`.
+
+        The bit rate is lowered first; if it would fall under
+        `min_bit_rate`, the resolution and then the frame rate are reduced.
+
+        Args:
+            frame_count: Frames in the source clip.
+            source_fps: Frame rate of the source clip.
+            width: Width of the source frames.
+
+        Returns:
+            A profile with concrete fps, width and bit rate.
+        """
+        fps = min(self.fps or source_fps, source_fps)
+        max_width = min(self.max_width or width, width)
+        if not self.max_bytes or not frame_count:
+            return replace(self, fps=fps, max_width=max_width)
+
+        duration = frame_count / source_fps
+        budget = self.max_bytes * 8 * _CONTAINER_HEADROOM / duration
+        bit_rate = min(self.bit_rate, int(budget))
+
+        if bit_rate < self.min_bit_rate:
+            # Fewer pixels keep the remaining bits useful
+            scale = math.sqrt(bit_rate / self.min_bit_rate)
+            max_width = max(160, int(max_width * scale) // 2 * 2)
+            if scale < 0.5:
+                fps = max(1, fps // 2)
+
+        return replace(self, fps=fps, max_width=max_width, bit_rate=bit_rate)
+
+
+#: Built-in profiles, selected with settings.ALERT_CLIP_PROFILE
+CLIP_PROFILES: Dict[str, ClipProfile] = {
+    # Small enough to attach to an email
+    "email": ClipProfile(
+        max_width=640, fps=10, bit_rate=500_000, max_bytes=4 * 1024**2
+    ),
+    # Full quality, for clips kept on disk
+    "archive": ClipProfile(max_width=None, bit_rate=2_000_000),
+}
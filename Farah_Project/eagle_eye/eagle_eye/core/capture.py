@@ -0,0 +1,183 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, ClassVar, Deque, Dict, List, Optional, Set
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def open_capture(url: str) -> cv2.VideoCapture:
+    cap = cv2.VideoCapture(url)
+    if not cap.isOpened():
+        logger.error(f"Failed to open video source: {url}")
+    return cap
+
+
+class FrameGrabber:
+    """
+    Reads a video source on a dedicated thread into a small drop-oldest queue.
+
+    The consumer always receives the freshest frames; when it falls behind,
+    the oldest queued frames are discarded instead of piling up in the
+    decoder. File sources are paced at their native FPS so they behave like
+    a live camera.
+    """
+
+    #: Grabbers currently running, for monitoring
+    active: ClassVar[Set["FrameGrabber"]] = set()
+    _active_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        url: str,
+        loop: bool = False,
+        max_queue: int = 1,
+        reconnect_delay: float = 0.3,
+        open_video: Callable[[str], Any] = open_capture,
+    ) -> None:
+        """
+        Args:
+            url: Video source (file path, RTSP/HTTP URL, device).
+            loop: Restart file sources when they end.
+            max_queue: Number of frames kept for the consumer.
+            reconnect_delay: Delay before reopening a source that failed.
+            open_video: Factory returning a cv2.VideoCapture-like object.
+        """
+        self.url = url
+        self.loop = loop
+        self.reconnect_delay = reconnect_delay
+        self.open_video = open_video
+
+        self._frames: Deque[np.ndarray] = deque(maxlen=max(1, max_queue))
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._finished = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def start(self) -> "FrameGrabber":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._capture_loop, name=f"capture-{self.url}", daemon=True
+            )
+            self._thread.start()
+            with self._active_lock:
+                FrameGrabber.active.add(self)
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        with self._active_lock:
+            FrameGrabber.active.discard(self)
+
+    def read(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Wait for the next frame.
+
+        Returns:
+            The oldest queued frame, or None when the source ended, the
+            grabber was stopped, or the timeout expired.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._frames or self._finished or self._stopped.is_set(),
+                timeout=timeout,
+            ):
+                return None
+            if not self._frames:
+                return None
+            self.delivered += 1
+            return self._frames.popleft()
+
+    @property
+    def finished(self) -> bool:
+        """True once the source ended (or the grabber stopped) and the queue is empty."""
+        with self._cond:
+            return (self._finished or self._stopped.is_set()) and not self._frames
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "captured": self.captured,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+    @classmethod
+    def all_stats(cls) -> List[Dict[str, Any]]:
+        with cls._active_lock:
+            return [grabber.stats for grabber in cls.active]
+
+    def _push(self, frame: np.ndarray) -> None:
+        with self._cond:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append(frame)
+            self.captured += 1
+            self._cond.notify()
+
+    def _capture_loop(self) -> None:
+        cap = self.open_video(self.url)
+        frame_interval = _frame_interval(cap)
+        next_frame_at = time.monotonic()
+
+        try:
+            while not self._stopped.is_set():
+                if not cap or not cap.isOpened():
+                    self._stopped.wait(self.reconnect_delay)
+                    cap = self.open_video(self.url)
+                    frame_interval = _frame_interval(cap)
+                    continue
+
+                ret, frame = cap.read()
+                if ret:
+                    self._push(frame)
+                    if frame_interval:
+                        # Pace files at their native rate instead of decoding flat out
+                        next_frame_at = max(
+                            next_frame_at + frame_interval, time.monotonic()
+                        )
+                        self._stopped.wait(max(0.0, next_frame_at - time.monotonic()))
+                    continue
+
+                if self.loop:
+                    logger.info("Loop enabled → restarting video")
+                    cap.release()
+                    cap = self.open_video(self.url)
+                    self._stopped.wait(0.05)
+                else:
+                    break
+        finally:
+            if cap:
+                cap.release()
+            with self._cond:
+                self._finished = True
+                self._cond.notify_all()
+            with self._active_lock:
+                FrameGrabber.active.discard(self)
+            logger.info(
+                f"Capture of '{self.url}' ended: {self.delivered} delivered, "
+                f"{self.dropped} dropped"
+            )
+
+
+def _frame_interval(cap: Any) -> float:
+    """Seconds between frames for file sources, 0 for live sources."""
+    try:
+        # Live streams report no (or a negative) frame count
+        if cap.get(cv2.CAP_PROP_FRAME_COUNT) <= 0:
+            return 0.0
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        return 1.0 / fps if fps and fps > 0 else 0.0
+    except Exception:
+        return 0.0
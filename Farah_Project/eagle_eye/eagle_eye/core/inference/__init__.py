@@ -0,0 +1,12 @@
+from .batch_scheduler import BatchScheduler
+from .model_registry import ModelHandle, ModelRegistry, model_registry
+from .pool import InferencePool, inference_pool
+
+__all__ = [
+    "BatchScheduler",
+    "InferencePool",
+    "ModelHandle",
+    "ModelRegistry",
+    "inference_pool",
+    "model_registry",
+]
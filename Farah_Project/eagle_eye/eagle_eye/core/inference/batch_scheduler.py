@@ -0,0 +1,185 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _BatchRequest:
+    stream_id: str
+    item: Any
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class BatchScheduler:
+    """
+    Collects single-item requests from many streams and runs them as one batch.
+
+    A batch is dispatched when it is full, when the oldest request has waited
+    `max_wait_ms`, or as soon as every recently active stream has a request
+    pending (so a lone stream never waits for peers that do not exist).
+    Batches are filled round-robin across streams, one request per stream
+    per round, so a fast producer cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 15.0,
+        stream_idle_sec: float = 1.0,
+        name: str = "batch-scheduler",
+    ) -> None:
+        """
+        Args:
+            predict_batch: Function mapping a list of items to a list of results.
+            max_batch_size: Maximum number of items per batch.
+            max_wait_ms: Maximum time the oldest request waits for a batch to fill.
+            stream_idle_sec: Time after which a silent stream is no longer waited for.
+            name: Name of the dispatcher thread.
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.stream_idle_sec = stream_idle_sec
+        self.name = name
+
+        self._queues: "OrderedDict[str, Deque[_BatchRequest]]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.batches_run = 0
+        self.items_run = 0
+
+    def submit(self, stream_id: str, item: Any) -> Future:
+        """Queue one item and return a future resolving to its result."""
+        request = _BatchRequest(stream_id=stream_id, item=item)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+
+            self._ensure_thread()
+            self._queues.setdefault(stream_id, deque()).append(request)
+            self._last_seen[stream_id] = request.enqueued_at
+            self._pending += 1
+            self._cond.notify()
+
+        return request.future
+
+    def predict(
+        self, stream_id: str, item: Any, timeout: Optional[float] = None
+    ) -> Any:
+        """Queue one item and block until its result is available."""
+        return self.submit(stream_id, item).result(timeout=timeout)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Batch counters since creation."""
+        return {
+            "batches": self.batches_run,
+            "items": self.items_run,
+            "avg_batch_size": self.items_run / self.batches_run
+            if self.batches_run
+            else 0.0,
+            "pending": self._pending,
+        }
+
+    def close(self) -> None:
+        """Stop the dispatcher; pending requests are cancelled."""
+        with self._cond:
+            self._closed = True
+            for queue in self._queues.values():
+                for request in queue:
+                    request.future.cancel()
+            self._queues.clear()
+            self._pending = 0
+            self._cond.notify_all()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def _active_streams(self, now: float) -> int:
+        # Forget streams that stopped producing (closed sessions)
+        for stream_id, seen in list(self._last_seen.items()):
+            if now - seen > self.stream_idle_sec:
+                del self._last_seen[stream_id]
+        return len(self._last_seen)
+
+    def _ready(self, now: float) -> bool:
+        if self._pending >= self.max_batch_size:
+            return True
+        # Every stream that is still producing already has a request queued
+        if len(self._queues) >= self._active_streams(now):
+            return True
+        oldest = min(queue[0].enqueued_at for queue in self._queues.values())
+        return now - oldest >= self.max_wait
+
+    def _take_batch(self) -> List[_BatchRequest]:
+        """Pop up to max_batch_size requests, one per stream per round."""
+        batch: List[_BatchRequest] = []
+
+        while self._queues and len(batch) < self.max_batch_size:
+            for stream_id in list(self._queues):
+                queue = self._queues[stream_id]
+                batch.append(queue.popleft())
+                # Served streams go to the back of the line for the next batch
+                if queue:
+                    self._queues.move_to_end(stream_id)
+                else:
+                    del self._queues[stream_id]
+                if len(batch) >= self.max_batch_size:
+                    break
+
+        self._pending -= len(batch)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._pending:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+                while not self._closed and not self._ready(time.monotonic()):
+                    oldest = min(q[0].enqueued_at for q in self._queues.values())
+                    self._cond.wait(max(0.0, oldest + self.max_wait - time.monotonic()))
+                if self._closed:
+                    return
+
+                batch = self._take_batch()
+
+            self._execute(batch)
+
+    def _execute(self, batch: List[_BatchRequest]) -> None:
+        try:
+            results = self.predict_batch([request.item for request in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"predict_batch returned {len(results)} results for {len(batch)} items"
+                )
+        except Exception as e:
+            logger.exception(f"Batch inference failed in '{self.name}'")
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+        self.batches_run += 1
+        self.items_run += len(batch)
@@ -0,0 +1,267 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from eagle_eye.config.settings import settings
+
+from .batch_scheduler import BatchScheduler
+
+logger = logging.getLogger(__name__)
+
+ModelKey = Tuple[str, str]
+
+
+@dataclass
+class _ModelEntry:
+    key: ModelKey
+    loader: Callable[[], Any]
+    model: Any = None
+    refs: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    memory_bytes: int = 0
+    scheduler: Optional[BatchScheduler] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class ModelHandle:
+    """
+    Reference to a shared model.
+
+    The model is loaded on the first `get()` and reloaded transparently if the
+    registry evicted it while idle.
+    """
+
+    def __init__(self, registry: "ModelRegistry", key: ModelKey) -> None:
+        self._registry = registry
+        self.key = key
+        self._released = False
+
+    def get(self) -> Any:
+        """Return the loaded model, loading it if needed."""
+        return self._registry._load(self.key)
+
+    def scheduler(
+        self, predict_batch: Callable[[Any, List[Any]], List[Any]], **options: Any
+    ) -> BatchScheduler:
+        """
+        Batch scheduler shared by every holder of this model.
+
+        Requests of all use cases and streams using the same weights are
+        stacked into one forward pass. The scheduler is created by the first
+        caller, with its `predict_batch` and `options`, and closed once the
+        last reference is released.
+
+        Args:
+            predict_batch: Maps (model, items) to one result per item; items
+                must carry everything a prediction needs.
+            options: Keyword arguments of `BatchScheduler`.
+        """
+        return self._registry._scheduler(self.key, predict_batch, options)
+
+    def release(self) -> None:
+        """Drop this reference. Safe to call more than once."""
+        if not self._released:
+            self._released = True
+            self._registry._release(self.key)
+
+
+class ModelRegistry:
+    """
+    Process-wide, reference-counted cache of loaded models.
+
+    Models are keyed by (weight path, device) so every use case asking for the
+    same weights shares one instance. Models unused for `idle_timeout_sec` are
+    unloaded by a background janitor; unreferenced entries are dropped entirely.
+    """
+
+    def __init__(
+        self, idle_timeout_sec: float = 600.0, check_interval_sec: float = 30.0
+    ):
+        """
+        Args:
+            idle_timeout_sec: Idle time after which a model is unloaded (0 = never).
+            check_interval_sec: How often the janitor looks for idle models.
+        """
+        self.idle_timeout_sec = idle_timeout_sec
+        self.check_interval_sec = check_interval_sec
+        self._entries: Dict[ModelKey, _ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._janitor: Optional[threading.Thread] = None
+
+    def acquire(
+        self,
+        path: Any,
+        loader: Callable[[], Any],
+        device: str = "auto",
+    ) -> ModelHandle:
+        """
+        Take a reference to the model stored at `path` on `device`.
+
+        Args:
+            path: Weight path (or any string identifying the model).
+            loader: Called once to build the model when it is first needed.
+            device: Device the model runs on.
+
+        Returns:
+            A handle; call `release()` when the owner is closed.
+        """
+        key: ModelKey = (str(path), device)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _ModelEntry(key=key, loader=loader)
+            entry.refs += 1
+            entry.last_used = time.monotonic()
+            self._ensure_janitor()
+
+        return ModelHandle(self, key)
+
+    def evict_idle(self, now: Optional[float] = None) -> List[ModelKey]:
+        """
+        Unload models that have been idle longer than `idle_timeout_sec`.
+
+        Returns:
+            Keys of the evicted models.
+        """
+        if self.idle_timeout_sec <= 0:
+            return []
+
+        now = time.monotonic() if now is None else now
+        evicted: List[ModelKey] = []
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if now - entry.last_used < self.idle_timeout_sec:
+                    continue
+                # Skip models that are being loaded right now
+                if not entry.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if entry.model is not None:
+                        entry.model = None
+                        entry.memory_bytes = 0
+                        evicted.append(key)
+                    if entry.refs == 0:
+                        del self._entries[key]
+                finally:
+                    entry.lock.release()
+
+        for path, device in evicted:
+            logger.info(f"Evicted idle model '{path}' ({device})")
+        return evicted
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Resident memory, reference count and idle time per model."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "path": entry.key[0],
+                    "device": entry.key[1],
+                    "loaded": entry.model is not None,
+                    "refs": entry.refs,
+                    "memory_bytes": entry.memory_bytes,
+                    "idle_sec": round(now - entry.last_used, 1),
+                }
+                for entry in self._entries.values()
+            ]
+
+    def _load(self, key: ModelKey) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise KeyError(f"Model {key} is not registered")
+            entry.last_used = time.monotonic()
+
+        if entry.model is not None:
+            return entry.model
+
+        with entry.lock:
+            if entry.model is None:
+                rss_before = _current_rss()
+                model = entry.loader()
+                entry.memory_bytes = _model_memory(model) or max(
+                    0, _current_rss() - rss_before
+                )
+                entry.model = model
+                logger.info(
+                    f"Loaded model '{key[0]}' ({key[1]}): "
+                    f"{entry.memory_bytes / 1024**2:.1f} MiB"
+                )
+            return entry.model
+
+    def _scheduler(
+        self,
+        key: ModelKey,
+        predict_batch: Callable[[Any, List[Any]], List[Any]],
+        options: Dict[str, Any],
+    ) -> BatchScheduler:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise KeyError(f"Model {key} is not registered")
+            if entry.scheduler is None:
+                options.setdefault("name", f"batch-{os.path.basename(key[0])}")
+                entry.scheduler = BatchScheduler(
+                    lambda items: predict_batch(self._load(key), items), **options
+                )
+            return entry.scheduler
+
+    def _release(self, key: ModelKey) -> None:
+        scheduler = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs = max(0, entry.refs - 1)
+            # Keep the weights around until the idle timeout in case they are reopened
+            entry.last_used = time.monotonic()
+            if entry.refs == 0:
+                scheduler, entry.scheduler = entry.scheduler, None
+        if scheduler is not None:
+            scheduler.close()
+
+    def _ensure_janitor(self) -> None:
+        if self.idle_timeout_sec <= 0:
+            return
+        if self._janitor is None or not self._janitor.is_alive():
+            self._janitor = threading.Thread(
+                target=self._janitor_loop, name="model-janitor", daemon=True
+            )
+            self._janitor.start()
+
+    def _janitor_loop(self) -> None:
+        while True:
+            time.sleep(self.check_interval_sec)
+            try:
+                self.evict_idle()
+            except Exception:
+                logger.exception("Model eviction failed")
+
+
+def _model_memory(model: Any) -> int:
+    """Size of the parameters and buffers of a torch-style model, if any."""
+    try:
+        tensors = list(model.parameters())
+        if hasattr(model, "buffers"):
+            tensors += list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        return 0
+
+
+def _current_rss() -> int:
+    """Resident set size of this process in bytes (0 where unsupported)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+# Global instance
+model_registry = ModelRegistry(idle_timeout_sec=settings.MODEL_IDLE_TIMEOUT_SEC)
@@ -0,0 +1,80 @@
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from eagle_eye.config.settings import settings
+
+
+class InferencePool:
+    """
+    Bounded thread pool for running blocking inference from async code.
+
+    At most `max_pending` calls are admitted at once; further callers wait
+    asynchronously for a slot, so a burst of sessions applies backpressure
+    instead of growing an unbounded executor queue.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 8) -> None:
+        """
+        Args:
+            max_workers: Threads running inference concurrently.
+            max_pending: Calls admitted at once (running + queued in the executor).
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference",
+        )
+        # asyncio primitives are bound to one loop, so keep one semaphore per loop
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        self.admitted = 0
+        self.waiting = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run `fn(*args, **kwargs)` on the pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphore(loop)
+
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        try:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self.admitted -= 1
+            semaphore.release()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "admitted": self.admitted,
+            "waiting": self.waiting,
+        }
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+            return semaphore
+
+
+# Global instance
+inference_pool = InferencePool(
+    max_workers=settings.INFERENCE_WORKERS,
+    max_pending=settings.INFERENCE_MAX_PENDING,
+)
@@ -1,10 +1,12 @@
 """Consolidated database models for Eagle Eye."""
 
+import time
 from datetime import datetime
 from typing import Optional
 
 from pydantic import ConfigDict
 from pydantic import Field as PydanticField
+from sqlalchemy import Column, LargeBinary
 from sqlmodel import Field, SQLModel
 
 
@@ -30,3 +32,32 @@ class FaceMetadata(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(..., nullable=False, unique=True)
+
+
+class TableVersion(SQLModel, table=True):
+    """Change counter of a table, used to invalidate in-memory caches."""
+
+    __tablename__ = "table_versions"
+
+    name: str = Field(primary_key=True)
+    version: int = 0
+
+
+class EmailOutbox(SQLModel, table=True):
+    """Alert email queued for delivery by the background sender."""
+
+    __tablename__ = "email_outbox"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    channel: str = Field(index=True)  # SMTP account the alert is sent from
+    recipients: str  # comma-separated addresses
+    event: str  # JSON-encoded AlertEvent
+    video: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    thumbnail: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
+    video_url: Optional[str] = None  # link to a clip too large to attach
+    status: str = Field(default="pending", index=True)  # pending, sent, failed
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    created_at: float = Field(default_factory=time.time)
+    sent_at: Optional[float] = None
+    last_error: Optional[str] = None
@@ -2,5 +2,6 @@
 
 from .media_store import MediaStore
 from .metadata_store import MetadataStore
+from .outbox_store import OutboxStore
 
-__all__ = ["MetadataStore", "MediaStore"]
+__all__ = ["MetadataStore", "MediaStore", "OutboxStore"]
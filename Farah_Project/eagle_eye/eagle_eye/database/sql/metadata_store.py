@@ -7,7 +7,7 @@ from sqlalchemy import delete, select
 
 # Import shared database components
 from eagle_eye.database import get_session
-from eagle_eye.database.models import FaceMetadata
+from eagle_eye.database.models import FaceMetadata, TableVersion
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +31,7 @@ class MetadataStore:
             # Create new
             person = FaceMetadata(name=name)
             session.add(person)
+            self._bump_version(session)
             session.commit()
             session.refresh(person)
             logger.debug(f"Person created: {person}")
@@ -61,14 +62,28 @@ class MetadataStore:
     def delete_person(self, name: str) -> int:
         """Delete person by name. Returns number of deleted records."""
         with get_session() as session:
-            count = (
-                session.exec(delete(FaceMetadata).filter(FaceMetadata.name == name))
-                .scalars()
-                .first()
-            )
+            count = session.exec(
+                delete(FaceMetadata).filter(FaceMetadata.name == name)
+            ).rowcount
+            if count:
+                self._bump_version(session)
             session.commit()
             return count
 
+    def get_version(self) -> int:
+        """Change counter of the faces table, bumped by every write."""
+        with get_session() as session:
+            row = session.get(TableVersion, FaceMetadata.__tablename__)
+            return row.version if row else 0
+
+    @staticmethod
+    def _bump_version(session) -> None:
+        row = session.get(TableVersion, FaceMetadata.__tablename__)
+        if row is None:
+            row = TableVersion(name=FaceMetadata.__tablename__)
+        row.version += 1
+        session.add(row)
+
     def get_all_persons(self) -> List[dict]:
         """Get all registered persons with their face counts."""
         with get_session() as session:
@@ -0,0 +1,147 @@
+"""Outbox store service - durable queue of alert emails."""
+
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func
+from sqlmodel import col, select
+
+from eagle_eye.database import get_session
+from eagle_eye.database.models import EmailOutbox
+
+
+class OutboxStore:
+    """Service for queueing alert emails and tracking their delivery."""
+
+    @staticmethod
+    def enqueue(
+        channel: str,
+        recipients: Sequence[str],
+        event: str,
+        video: bytes,
+        thumbnail: Optional[bytes] = None,
+        video_url: Optional[str] = None,
+    ) -> int:
+        """
+        Persist an alert email for the background sender.
+
+        Args:
+            channel: SMTP account the email is sent from.
+            recipients: Destination addresses.
+            event: JSON-encoded alert event.
+            video: Clip attached to the email.
+            thumbnail: JPEG shown inline.
+            video_url: Link to a clip too large to attach.
+
+        Returns:
+            ID of the outbox entry.
+        """
+        with get_session() as session:
+            entry = EmailOutbox(
+                channel=channel,
+                recipients=",".join(recipients),
+                event=event,
+                video=video,
+                thumbnail=thumbnail,
+                video_url=video_url,
+            )
+            session.add(entry)
+            session.commit()
+            session.refresh(entry)
+            return entry.id
+
+    @staticmethod
+    def due(channel: str, now: float, limit: int) -> List[EmailOutbox]:
+        """Pending entries of `channel` ready to be sent, oldest first."""
+        with get_session() as session:
+            stmt = (
+                select(EmailOutbox)
+                .where(EmailOutbox.channel == channel)
+                .where(EmailOutbox.status == "pending")
+                .where(EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.created_at)
+                .limit(limit)
+            )
+            return list(session.exec(stmt).all())
+
+    @staticmethod
+    def next_attempt_at(channel: str) -> Optional[float]:
+        """Earliest time a pending entry of `channel` may be sent."""
+        with get_session() as session:
+            stmt = (
+                select(func.min(EmailOutbox.next_attempt_at))
+                .where(EmailOutbox.channel == channel)
+                .where(EmailOutbox.status == "pending")
+            )
+            return session.exec(stmt).first()
+
+    @staticmethod
+    def mark_sent(ids: Sequence[int], now: float) -> None:
+        """Mark entries as delivered and drop their clips."""
+        with get_session() as session:
+            entries = session.exec(
+                select(EmailOutbox).where(col(EmailOutbox.id).in_(ids))
+            ).all()
+            for entry in entries:
+                entry.status = "sent"
+                entry.sent_at = now
+                entry.attempts += 1
+                entry.video = b""
+                entry.thumbnail = None
+                session.add(entry)
+            session.commit()
+
+    @staticmethod
+    def mark_failed(
+        ids: Sequence[int],
+        error: str,
+        now: float,
+        max_attempts: int,
+        backoff_sec: float,
+    ) -> None:
+        """
+        Record a failed attempt, rescheduling with exponential backoff.
+
+        Entries that reached `max_attempts` are marked as failed for good.
+        """
+        with get_session() as session:
+            entries = session.exec(
+                select(EmailOutbox).where(col(EmailOutbox.id).in_(ids))
+            ).all()
+            for entry in entries:
+                entry.attempts += 1
+                entry.last_error = error
+                if entry.attempts >= max_attempts:
+                    entry.status = "failed"
+                else:
+                    entry.next_attempt_at = now + backoff_sec * 2 ** (
+                        entry.attempts - 1
+                    )
+                session.add(entry)
+            session.commit()
+
+    @staticmethod
+    def purge(channel: str, before: float) -> int:
+        """
+        Delete sent and failed entries of `channel` created before `before`.
+
+        Returns:
+            Number of deleted entries.
+        """
+        with get_session() as session:
+            count = session.exec(
+                delete(EmailOutbox)
+                .where(EmailOutbox.channel == channel)
+                .where(col(EmailOutbox.status).in_(("sent", "failed")))
+                .where(EmailOutbox.created_at < before)
+            ).rowcount
+            session.commit()
+            return count
+
+    @staticmethod
+    def counts(channel: Optional[str] = None) -> Dict[str, int]:
+        """Number of entries per status."""
+        with get_session() as session:
+            stmt = select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status)
+            if channel is not None:
+                stmt = stmt.where(EmailOutbox.channel == channel)
+            return {status: count for status, count in session.exec(stmt).all()}
@@ -0,0 +1,257 @@
+"""
+Recall/latency benchmark of the face gallery index types.
+
+Synthetic VGG-Face-like embeddings (several noisy images per identity) are
+indexed with every type and searched with unseen images of known
+identities. Recall is measured against the exact flat index.
+
+Usage:
+    python -m eagle_eye.database.vector.benchmark --sizes 10000 100000 1000000
+
+Recall loss of compressed encodings on the enrolled faces:
+    python -m eagle_eye.database.vector.benchmark --gallery --types flat hnsw \\
+        --encodings float32 fp16 sq8
+
+1M 4096-d float32 vectors take 16 GB; use --dim to scale the run down.
+"""
+
+import argparse
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from . import index as faiss_index
+
+#: Gallery images per synthetic identity
+IMAGES_PER_IDENTITY = 5
+
+
+def synthetic_embeddings(
+    count: int, dimension: int, queries: int, seed: int = 0, chunk: int = 50_000
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Generate a gallery of `count` embeddings and `queries` probe embeddings.
+
+    Returns:
+        (gallery, identity IDs of the gallery rows, queries)
+    """
+    rng = np.random.default_rng(seed)
+    identities = max(1, count // IMAGES_PER_IDENTITY)
+    # ReLU outputs: non-negative, with a per-identity direction
+    centers = np.abs(rng.standard_normal((identities, dimension), dtype="float32"))
+
+    ids = np.arange(count, dtype="int64") % identities
+    gallery = np.empty((count, dimension), dtype="float32")
+    for start in range(0, count, chunk):
+        rows = ids[start : start + chunk]
+        noise = rng.standard_normal((len(rows), dimension), dtype="float32")
+        gallery[start : start + chunk] = centers[rows] + 0.5 * noise
+
+    probe_ids = rng.choice(identities, queries)
+    probes = centers[probe_ids] + 0.5 * rng.standard_normal(
+        (queries, dimension), dtype="float32"
+    )
+    return gallery, ids, probes.astype("float32")
+
+
+def run_benchmark(
+    size: int,
+    dimension: int = 4096,
+    queries: int = 200,
+    index_types: Sequence[str] = faiss_index.INDEX_TYPES,
+    k: int = 10,
+    nprobe: int = 16,
+    ef_search: int = 64,
+    encodings: Sequence[str] = ("float32",),
+) -> List[Dict[str, float]]:
+    """
+    Build each index type over `size` vectors and measure it.
+
+    Returns:
+        One row per type and encoding: build time, bytes per vector, search
+        latency, recall@1/@k against the flat index and how often the top
+        match has the right identity.
+    """
+    gallery, ids, probes = synthetic_embeddings(size, dimension, queries)
+    return _compare(gallery, ids, probes, index_types, encodings, k, nprobe, ef_search)
+
+
+def run_gallery_benchmark(
+    vectors: np.ndarray,
+    ids: np.ndarray,
+    queries: int = 200,
+    index_types: Sequence[str] = ("flat",),
+    encodings: Sequence[str] = faiss_index.ENCODINGS,
+    k: int = 10,
+    nprobe: int = 16,
+    ef_search: int = 64,
+    metric: str = "l2",
+    seed: int = 0,
+) -> List[Dict[str, float]]:
+    """
+    Measure the recall loss of compressed encodings on a real gallery.
+
+    `queries` random gallery vectors are held out and searched in indices
+    built from the others, so every query has true neighbours of the same
+    person but never finds itself.
+    """
+    rng = np.random.default_rng(seed)
+    held_out = np.zeros(len(vectors), dtype=bool)
+    held_out[
+        rng.choice(len(vectors), min(queries, len(vectors) // 2), replace=False)
+    ] = True
+    return _compare(
+        vectors[~held_out],
+        ids[~held_out],
+        vectors[held_out],
+        index_types,
+        encodings,
+        k,
+        nprobe,
+        ef_search,
+        metric,
+    )
+
+
+def _compare(
+    gallery: np.ndarray,
+    ids: np.ndarray,
+    probes: np.ndarray,
+    index_types: Sequence[str],
+    encodings: Sequence[str],
+    k: int,
+    nprobe: int,
+    ef_search: int,
+    metric: str = "l2",
+) -> List[Dict[str, float]]:
+    size, dimension = gallery.shape
+    queries = len(probes)
+    # Row numbers as IDs: recall compares neighbours, not identities
+    rows = np.arange(size, dtype="int64")
+
+    # The exact float32 flat index first: the reference
+    configs = [("flat", "float32")] + [
+        (kind, encoding)
+        for kind in index_types
+        for encoding in (["float32"] if kind == "ivfpq" else encodings)
+        if (kind, encoding) != ("flat", "float32")
+    ]
+
+    rows_out = []
+    exact = None
+    for kind, encoding in configs:
+        started = time.perf_counter()
+        try:
+            index = faiss_index.build_index(
+                kind,
+                dimension,
+                gallery,
+                rows,
+                nprobe=nprobe,
+                ef_search=ef_search,
+                metric=metric,
+                encoding=encoding,
+            )
+        except ValueError as e:
+            print(f"  skipping {kind}/{encoding}: {e}")
+            continue
+        build_sec = time.perf_counter() - started
+
+        # One query at a time, like the recognition path
+        latencies = []
+        found = np.empty((queries, k), dtype="int64")
+        for i in range(queries):
+            started = time.perf_counter()
+            _, neighbours = index.search(probes[i : i + 1], k)
+            latencies.append(time.perf_counter() - started)
+            found[i] = neighbours[0]
+
+        if exact is None:
+            exact = found
+        recall_1 = float(np.mean(found[:, 0] == exact[:, 0]))
+        recall_k = float(
+            np.mean([len(np.intersect1d(f, e)) / k for f, e in zip(found, exact)])
+        )
+        rows_out.append(
+            {
+                "type": kind,
+                "encoding": faiss_index.index_encoding(index),
+                "size": size,
+                "build_sec": build_sec,
+                "bytes_per_vector": faiss_index.code_size(index),
+                "latency_ms": float(np.median(latencies) * 1000),
+                "p99_ms": float(np.percentile(latencies, 99) * 1000),
+                "recall@1": recall_1,
+                f"recall@{k}": recall_k,
+                "identity_match": float(np.mean(ids[found[:, 0]] == ids[exact[:, 0]])),
+            }
+        )
+    return rows_out
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--dim", type=int, default=4096)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--types", nargs="+", default=list(faiss_index.INDEX_TYPES))
+    parser.add_argument("--encodings", nargs="+", default=["float32"])
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument(
+        "--gallery",
+        action="store_true",
+        help="measure the encodings on the enrolled faces instead",
+    )
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'size':>9} {'type':>6} {'enc':>7} {'B/vec':>6} {'build s':>8} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'R@1':>6} {'R@10':>6} {'ID@1':>6}"
+    )
+    if args.gallery:
+        from eagle_eye.database.vector import face_db
+
+        vectors, ids = face_db.get_vectors()
+        results = [
+            run_gallery_benchmark(
+                vectors,
+                ids,
+                args.queries,
+                args.types,
+                args.encodings,
+                nprobe=args.nprobe,
+                ef_search=args.ef_search,
+                metric=face_db.index_stats["metric"],
+            )
+        ]
+    else:
+        results = (
+            run_benchmark(
+                size,
+                args.dim,
+                args.queries,
+                args.types,
+                nprobe=args.nprobe,
+                ef_search=args.ef_search,
+                encodings=args.encodings,
+            )
+            for size in args.sizes
+        )
+
+    for rows in results:
+        for row in rows:
+            print(
+                f"{row['size']:>9} {row['type']:>6} {row['encoding']:>7} "
+                f"{row['bytes_per_vector']:>6} {row['build_sec']:>8.1f} "
+                f"{row['latency_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+                f"{row['recall@1']:>6.3f} {row['recall@10']:>6.3f} "
+                f"{row['identity_match']:>6.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
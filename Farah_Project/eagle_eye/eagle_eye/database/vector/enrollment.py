@@ -0,0 +1,304 @@
+"""
+Parallel face enrollment: images are decoded and embedded in worker processes.
+
+Usage (bulk import of a directory with one sub-directory per person):
+    python -m eagle_eye.database.vector.enrollment /path/to/gallery --workers 4
+
+    gallery/
+        alice/1.jpg, alice/2.jpg, ...
+        bob/1.png, ...
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    AsyncIterable,
+    Callable,
+    Deque,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import cv2
+import numpy as np
+from deepface import DeepFace
+
+logger = logging.getLogger(__name__)
+
+#: Encoded image bytes, an image path or a decoded BGR image
+ImageSource = Union[bytes, str, Path, np.ndarray]
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+@dataclass
+class ImageResult:
+    """Outcome of one enrollment image."""
+
+    index: int
+    label: str
+    ok: bool
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "image": self.label,
+            "status": "ok" if self.ok else "failed",
+            "error": self.error,
+        }
+
+
+@dataclass
+class EnrollmentResult:
+    """Embeddings of the images a face was found in, and the status of each image."""
+
+    vectors: np.ndarray
+    images: List[ImageResult] = field(default_factory=list)
+
+    @property
+    def added(self) -> int:
+        return len(self.vectors)
+
+
+#: Called after each image with (result, images done, total if known)
+ProgressCallback = Callable[[ImageResult, int, Optional[int]], None]
+
+
+def _warm_up(model_name: str) -> None:
+    """Build the model once per worker process, before the first image."""
+    try:
+        DeepFace.build_model(model_name=model_name, task="facial_recognition")
+    except Exception as e:
+        logger.warning(f"Failed to preload {model_name}: {e}")
+
+
+def _decode(source: ImageSource) -> np.ndarray:
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, bytes):
+        image = cv2.imdecode(np.frombuffer(source, np.uint8), cv2.IMREAD_COLOR)
+    else:
+        image = cv2.imread(str(source), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Invalid image file")
+    return image
+
+
+def embed_image(source: ImageSource, model_name: str) -> np.ndarray:
+    """
+    Decode an image and compute the embedding of its face (runs in a worker).
+
+    Raises:
+        ValueError: If the image cannot be decoded or shows no face.
+    """
+    embeddings = DeepFace.represent(
+        img_path=_decode(source), model_name=model_name, enforce_detection=True
+    )
+    if not embeddings:
+        raise ValueError("No face detected")
+    # Take the first detected face
+    return np.asarray(embeddings[0]["embedding"], dtype="float32")
+
+
+class FaceEnroller:
+    """
+    Computes enrollment embeddings in a process pool.
+
+    Images are submitted as soon as they arrive, so uploads are decoded and
+    embedded while later ones are still being read. At most `max_pending`
+    images are in flight, which bounds memory on large imports. Each worker
+    process builds the recognition model once.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "VGG-Face",
+        workers: int = 2,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            model_name: DeepFace recognition model.
+            workers: Worker processes (0 = one thread of this process).
+            max_pending: Images in flight at most (default: 4 per worker).
+        """
+        self.model_name = model_name
+        self.workers = workers
+        self.max_pending = max_pending or 4 * max(1, workers)
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """Pool of the workers, started on first use."""
+        if self._executor is None:
+            if self.workers > 0:
+                # TensorFlow is not fork-safe: workers start from a clean interpreter
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up,
+                    initargs=(self.model_name,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="face-enroll"
+                )
+        return self._executor
+
+    def submit(self, source: ImageSource) -> Future:
+        return self.executor.submit(embed_image, source, self.model_name)
+
+    async def embed(
+        self,
+        sources: Union[Iterable, AsyncIterable],
+        total: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> EnrollmentResult:
+        """
+        Embed a stream of images.
+
+        Args:
+            sources: (label, image) pairs, possibly an async iterator.
+            total: Number of images, if known (for progress reports).
+            on_progress: Called after each image, in input order.
+
+        Returns:
+            The embeddings of the faces found, in input order.
+        """
+        pending: Deque[Tuple[int, str, Future]] = deque()
+        vectors: List[np.ndarray] = []
+        images: List[ImageResult] = []
+
+        async def collect() -> None:
+            index, label, future = pending.popleft()
+            try:
+                vectors.append(await asyncio.wrap_future(future))
+                result = ImageResult(index, label, ok=True)
+            except Exception as e:
+                result = ImageResult(index, label, ok=False, error=str(e))
+            images.append(result)
+            if on_progress is not None:
+                on_progress(result, len(images), total)
+
+        index = 0
+        async for label, source in _aiter(sources):
+            pending.append((index, label, self.submit(source)))
+            index += 1
+            if len(pending) >= self.max_pending:
+                await collect()
+        while pending:
+            await collect()
+
+        if vectors:
+            matrix = np.stack(vectors)
+        else:
+            matrix = np.empty((0, 0), dtype="float32")
+        return EnrollmentResult(matrix, images)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+async def _aiter(sources: Union[Iterable, AsyncIterable]):
+    if hasattr(sources, "__aiter__"):
+        async for item in sources:
+            yield item
+    else:
+        for item in sources:
+            yield item
+
+
+def scan_gallery(directory: Path) -> List[Tuple[str, List[Path]]]:
+    """(name, image paths) of every person sub-directory of `directory`."""
+    persons = []
+    for person_dir in sorted(Path(directory).iterdir()):
+        if not person_dir.is_dir():
+            continue
+        paths = sorted(
+            path
+            for path in person_dir.iterdir()
+            if path.suffix.lower() in IMAGE_SUFFIXES
+        )
+        if paths:
+            persons.append((person_dir.name, paths))
+    return persons
+
+
+async def import_gallery(
+    face_db,
+    directory: Path,
+    enroller: FaceEnroller,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Tuple[int, List[ImageResult]]:
+    """
+    Enroll every person of a gallery directory.
+
+    All images go through one pool and the vectors of all persons are
+    added to the index at once.
+
+    Returns:
+        Number of faces added, and the status of every image.
+    """
+    persons = scan_gallery(directory)
+    names = [name for name, paths in persons for _ in paths]
+    sources = [
+        (str(path.relative_to(directory)), path)
+        for _, paths in persons
+        for path in paths
+    ]
+
+    result = await enroller.embed(sources, total=len(sources), on_progress=on_progress)
+    # Name of each vector, in input order
+    vector_names = [names[image.index] for image in result.images if image.ok]
+    if vector_names:
+        face_db.add_embeddings(vector_names, result.vectors)
+    return result.added, result.images
+
+
+def main(argv: Sequence[str] = None) -> None:
+    from eagle_eye.config.settings import settings
+    from eagle_eye.database import init_db
+    from eagle_eye.database.vector import face_db
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--workers", type=int, default=settings.FACE_ENROLL_WORKERS)
+    args = parser.parse_args(argv)
+
+    def report(result: ImageResult, done: int, total: Optional[int]) -> None:
+        status = "ok" if result.ok else f"failed: {result.error}"
+        print(f"[{done}/{total}] {result.label} {status}", flush=True)
+
+    init_db()
+    enroller = FaceEnroller(face_db.model_name, workers=args.workers)
+    started = time.perf_counter()
+    try:
+        added, images = asyncio.run(
+            import_gallery(face_db, args.directory, enroller, on_progress=report)
+        )
+    finally:
+        enroller.close()
+    face_db.compact()
+
+    failed = sum(not image.ok for image in images)
+    print(
+        f"Added {added} face(s) from {len(images)} image(s), {failed} failed, "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""FAISS index types for the face gallery and selection by gallery size."""
+
+import logging
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+#: Index types, from small to large galleries
+INDEX_TYPES = ("flat", "hnsw", "ivf", "ivfpq")
+
+#: Types that need k-means training before vectors can be added
+TRAINED_TYPES = ("ivf", "ivfpq")
+
+#: "l2": Euclidean distance; "cosine": inner product of L2-normalized vectors
+METRICS = ("l2", "cosine")
+
+#: Storage of the vectors of "flat", "hnsw" and "ivf" indices ("ivfpq" uses
+#: PQ codes): 4, 2 or 1 byte(s) per dimension
+ENCODINGS = ("float32", "fp16", "sq8")
+
+#: Vectors needed to learn the per-dimension ranges of "sq8"
+SQ8_MIN_TRAIN = 1000
+
+#: Neighbours per HNSW node; more = better recall, more memory
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+
+#: Bits per PQ code
+PQ_NBITS = 8
+
+#: Training points per IVF list (FAISS warns below 39)
+_TRAIN_POINTS_PER_LIST = 39
+_MIN_NLIST = 16
+
+
+def choose_index_type(count: int, thresholds: Sequence[int]) -> str:
+    """
+    Pick the index type suited to a gallery of `count` vectors.
+
+    Args:
+        count: Number of vectors in the gallery.
+        thresholds: Largest gallery served by "flat", "hnsw" and "ivf";
+            bigger galleries use "ivfpq".
+    """
+    for kind, limit in zip(INDEX_TYPES, thresholds):
+        if count < limit:
+            return kind
+    return INDEX_TYPES[-1]
+
+
+def nlist_for(count: int) -> int:
+    """Number of IVF lists for `count` vectors (about 4 * sqrt(n))."""
+    nlist = min(int(4 * math.sqrt(count)), count // _TRAIN_POINTS_PER_LIST)
+    return max(1, min(nlist, 65536))
+
+
+def min_train_size(kind: str, encoding: str = "float32") -> int:
+    """Vectors needed before an index of `kind` can be trained."""
+    if kind == "ivf":
+        return max(
+            _MIN_NLIST * _TRAIN_POINTS_PER_LIST, min_train_size("flat", encoding)
+        )
+    if kind == "ivfpq":
+        return (1 << PQ_NBITS) * _TRAIN_POINTS_PER_LIST
+    if encoding == "sq8":
+        return SQ8_MIN_TRAIN
+    return 0
+
+
+def pq_subquantizers(dimension: int) -> int:
+    """Largest divisor of `dimension` up to 64 (64 bytes per 4096-d vector)."""
+    for m in range(min(64, dimension // 2), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def build_index(
+    kind: str,
+    dimension: int,
+    vectors: Optional[np.ndarray] = None,
+    ids: Optional[np.ndarray] = None,
+    nprobe: int = 16,
+    ef_search: int = 64,
+    metric: str = "l2",
+    encoding: str = "float32",
+) -> faiss.IndexIDMap:
+    """
+    Create an ID-mapped index of `kind`, train it and add `vectors`.
+
+    Args:
+        kind: One of INDEX_TYPES.
+        dimension: Embedding size.
+        vectors: float32 matrix (n, dimension); required for trained types.
+        ids: int64 IDs of `vectors`.
+        nprobe: IVF lists scanned per search.
+        ef_search: HNSW candidates explored per search.
+        metric: One of METRICS; "cosine" expects normalized `vectors`.
+        encoding: One of ENCODINGS; "sq8" needs `vectors` to train on.
+
+    Raises:
+        ValueError: for an unknown type, metric or encoding, or too few
+            vectors to train.
+    """
+    count = 0 if vectors is None else len(vectors)
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding: {encoding}")
+    if encoding == "sq8" and count < min_train_size("flat", encoding):
+        raise ValueError(f"Not enough vectors to train 'sq8': {count}")
+    metric_type = faiss.METRIC_INNER_PRODUCT if metric == "cosine" else faiss.METRIC_L2
+    qtype = _QTYPES.get(encoding)
+
+    if kind == "flat":
+        if qtype is None:
+            inner = faiss.IndexFlat(dimension, metric_type)
+        else:
+            inner = faiss.IndexScalarQuantizer(dimension, qtype, metric_type)
+    elif kind == "hnsw":
+        if qtype is None:
+            inner = faiss.IndexHNSWFlat(dimension, HNSW_M, metric_type)
+        else:
+            inner = faiss.IndexHNSWSQ(dimension, qtype, HNSW_M, metric_type)
+        inner.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    elif kind in TRAINED_TYPES:
+        nlist = nlist_for(count)
+        if count < max(nlist, 1 << PQ_NBITS if kind == "ivfpq" else 1):
+            raise ValueError(f"Not enough vectors to train '{kind}': {count}")
+        quantizer = faiss.IndexFlat(dimension, metric_type)
+        if kind == "ivf" and qtype is not None:
+            inner = faiss.IndexIVFScalarQuantizer(
+                quantizer, dimension, nlist, qtype, metric_type
+            )
+        elif kind == "ivf":
+            inner = faiss.IndexIVFFlat(quantizer, dimension, nlist, metric_type)
+        else:
+            inner = faiss.IndexIVFPQ(
+                quantizer,
+                dimension,
+                nlist,
+                pq_subquantizers(dimension),
+                PQ_NBITS,
+                metric_type,
+            )
+    else:
+        raise ValueError(f"Unknown index type: {kind}")
+
+    if not inner.is_trained:
+        inner.train(_training_sample(vectors, nlist_for(count)))
+
+    index = faiss.IndexIDMap(inner)
+    tune_index(index, nprobe=nprobe, ef_search=ef_search)
+    if count:
+        index.add_with_ids(vectors, ids)
+    return index
+
+
+def tune_index(index: faiss.Index, nprobe: int = 16, ef_search: int = 64) -> None:
+    """Apply search-time parameters (they are not all persisted by FAISS)."""
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexIVF):
+        inner.nprobe = min(nprobe, inner.nlist)
+    elif isinstance(inner, faiss.IndexHNSW):
+        inner.hnsw.efSearch = ef_search
+
+
+def index_type(index: faiss.Index) -> str:
+    """Type of an index built by `build_index` (or loaded from disk)."""
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(inner, faiss.IndexIVF):
+        return "ivf"
+    if isinstance(inner, faiss.IndexHNSW):
+        return "hnsw"
+    return "flat"
+
+
+def index_encoding(index: faiss.Index) -> str:
+    """Encoding of the vectors of an index built by `build_index` ("pq" for "ivfpq")."""
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexIVFPQ):
+        return "pq"
+    if isinstance(inner, faiss.IndexHNSW):
+        inner = faiss.downcast_index(inner.storage)
+    if isinstance(inner, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        for encoding, qtype in _QTYPES.items():
+            if inner.sq.qtype == qtype:
+                return encoding
+    return "float32"
+
+
+def code_size(index: faiss.Index) -> int:
+    """Bytes stored per vector (without IDs and graph or list overhead)."""
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        inner = faiss.downcast_index(inner.storage)
+    return int(inner.code_size)
+
+
+def index_metric(index: faiss.Index) -> str:
+    """Metric of an index built by `build_index`."""
+    if _inner(index).metric_type == faiss.METRIC_INNER_PRODUCT:
+        return "cosine"
+    return "l2"
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalized float32 copy of `vectors`."""
+    vectors = np.array(np.atleast_2d(vectors), dtype="float32", order="C")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def to_similarity(distances: np.ndarray, metric: str) -> np.ndarray:
+    """
+    Convert search distances to similarities (1 = same vector).
+
+    Inner products of normalized vectors are cosine similarities already.
+    Squared L2 distances are mapped with 1 - d / 2, which is the cosine
+    similarity too when the vectors are normalized.
+    """
+    if metric == "cosine":
+        return distances
+    return 1.0 - (distances / 2.0)
+
+
+def supports_remove(kind: str) -> bool:
+    """HNSW graphs cannot drop vectors; the index is rebuilt instead."""
+    return kind != "hnsw"
+
+
+def index_ids(index: faiss.IndexIDMap) -> np.ndarray:
+    """The ID of every vector stored in `index`."""
+    return faiss.vector_to_array(index.id_map).astype("int64")
+
+
+def id_counts(ids: np.ndarray) -> Dict[int, int]:
+    """Number of vectors per ID."""
+    unique, counts = np.unique(ids, return_counts=True)
+    return dict(zip(unique.tolist(), counts.tolist()))
+
+
+def extract_vectors(index: faiss.IndexIDMap) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return all (vectors, ids) stored in `index`.
+
+    Vectors of an "ivfpq" index, or stored as "fp16" or "sq8", are
+    reconstructed from their codes, so they are approximations of the
+    original embeddings. Never train a new index on them: type upgrades and
+    rebuilds use the float32 vectors kept by `IndexStore` instead.
+    """
+    ids = index_ids(index)
+    inner = _inner(index)
+    if inner.ntotal == 0:
+        return np.empty((0, inner.d), dtype="float32"), ids
+    if not isinstance(inner, faiss.IndexIVF):
+        return inner.reconstruct_n(0, inner.ntotal), ids
+
+    # The direct map is dropped again afterwards: it blocks remove_ids
+    inner.make_direct_map()
+    try:
+        return inner.reconstruct_n(0, inner.ntotal), ids
+    finally:
+        inner.make_direct_map(False)
+
+
+def remove_ids(
+    index: faiss.IndexIDMap,
+    ids: np.ndarray,
+    source: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    **params,
+) -> faiss.Index:
+    """
+    Remove `ids` from `index`.
+
+    Args:
+        index: Index built by `build_index`.
+        ids: IDs to remove.
+        source: Original float32 (vectors, ids) of `index`, used to rebuild
+            an HNSW graph. Without it the vectors are decoded from the index,
+            which is lossy for compressed encodings.
+        params: Search parameters of the new index.
+
+    Returns:
+        The index holding the remaining vectors (a new one for HNSW).
+    """
+    kind = index_type(index)
+    if supports_remove(kind):
+        index.remove_ids(np.asarray(ids, dtype="int64"))
+        return index
+
+    vectors, stored_ids = source if source is not None else extract_vectors(index)
+    if index_metric(index) == "cosine":
+        vectors = normalize(vectors)
+    keep = ~np.isin(stored_ids, ids)
+    encoding = index_encoding(index)
+    # "sq8" cannot be trained again on fewer vectors than it needs
+    if np.count_nonzero(keep) < min_train_size(kind, encoding):
+        encoding = "fp16"
+    return build_index(
+        kind,
+        index.d,
+        vectors[keep],
+        stored_ids[keep],
+        metric=index_metric(index),
+        encoding=encoding,
+        **params,
+    )
+
+
+def search_excluding(
+    index: faiss.Index, queries: np.ndarray, k: int, excluded: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Search `index` as if the vectors of the `excluded` IDs were removed.
+
+    The search is widened until every query has `k` other results, or the
+    whole index was searched.
+
+    Returns:
+        (distances, ids) like `faiss.Index.search`, -1 IDs past the results.
+    """
+    excluded = np.asarray(list(excluded), dtype="int64")
+    width = k
+    while True:
+        distances, ids = index.search(queries, width)
+        keep = (ids != -1) & ~np.isin(ids, excluded)
+        if width >= index.ntotal or keep.sum(axis=1).min() >= k:
+            break
+        width *= 2
+
+    # Kept results first, still in order of distance
+    order = np.argsort(~keep, axis=1, kind="stable")[:, :k]
+    distances = np.take_along_axis(distances, order, axis=1)
+    ids = np.where(
+        np.take_along_axis(keep, order, axis=1),
+        np.take_along_axis(ids, order, axis=1),
+        -1,
+    )
+    return distances, ids
+
+
+def nearest_per_id(
+    index: faiss.Index, query: np.ndarray, ids: Sequence[int], limit: int
+) -> Dict[int, float]:
+    """
+    Distance from `query` to the nearest vector of each of `ids`.
+
+    Only the vectors of `ids` are searched (ID selector). The search is
+    widened until every ID was found or `limit` results were returned.
+
+    Args:
+        index: Index built by `build_index`.
+        query: One query vector.
+        ids: IDs to look up.
+        limit: Number of vectors stored under `ids` (upper bound of the search).
+
+    Returns:
+        Distance per ID; IDs the search did not reach are missing.
+    """
+    selector = faiss.IDSelectorBatch(np.asarray(ids, dtype="int64"))
+    params = _search_parameters(index, selector)
+    queries = np.ascontiguousarray(query, dtype="float32").reshape(1, -1)
+    width = max(1, min(len(ids), limit))
+    while True:
+        distances, found = index.search(queries, width, params=params)
+        nearest: Dict[int, float] = {}
+        # Results are sorted, so the first hit of an ID is its nearest vector
+        for distance, found_id in zip(distances[0].tolist(), found[0].tolist()):
+            if found_id != -1 and found_id not in nearest:
+                nearest[found_id] = distance
+        if len(nearest) == len(ids) or width >= limit or found[0, -1] == -1:
+            return nearest
+        width = min(2 * width, limit)
+
+
+def index_stats(index: Optional[faiss.Index]) -> Dict[str, object]:
+    if index is None:
+        return {
+            "type": None,
+            "metric": None,
+            "encoding": None,
+            "vectors": 0,
+            "dimension": None,
+        }
+    return {
+        "type": index_type(index),
+        "metric": index_metric(index),
+        "encoding": index_encoding(index),
+        "vectors": index.ntotal,
+        "dimension": index.d,
+    }
+
+
+_QTYPES = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def _inner(index: faiss.Index) -> faiss.Index:
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return faiss.downcast_index(index)
+
+
+def _search_parameters(
+    index: faiss.Index, selector: faiss.IDSelector
+) -> faiss.SearchParameters:
+    """Search parameters restricted to `selector`, keeping the tuned ones."""
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=inner.nprobe)
+    if isinstance(inner, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def _training_sample(vectors: np.ndarray, nlist: int) -> np.ndarray:
+    """Random subset large enough for k-means (and the PQ codebooks)."""
+    size = max(64 * nlist, 64 << PQ_NBITS)
+    if len(vectors) <= size:
+        return vectors
+    rows = np.random.default_rng(0).choice(len(vectors), size, replace=False)
+    return vectors[np.sort(rows)]
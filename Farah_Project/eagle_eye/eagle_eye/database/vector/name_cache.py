@@ -0,0 +1,131 @@
+"""In-memory copy of the faces table for the recognition hot path."""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from eagle_eye.database.sql.metadata_store import MetadataStore
+
+logger = logging.getLogger(__name__)
+
+
+class PersonNameCache:
+    """
+    Write-through cache of person IDs and names.
+
+    The whole table is loaded once; writes go through the store and update
+    the cache immediately. Changes made by other processes are picked up by
+    comparing the table's version counter, checked at most every
+    `check_interval_sec`, so lookups normally run no SQL at all.
+    """
+
+    def __init__(self, store: MetadataStore, check_interval_sec: float = 5.0) -> None:
+        """
+        Args:
+            store: Metadata store backing the cache.
+            check_interval_sec: Time between version checks (0 = every lookup).
+        """
+        self.store = store
+        self.check_interval_sec = check_interval_sec
+
+        self._names: Dict[int, str] = {}
+        self._ids: Dict[str, int] = {}
+        self._version: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.RLock()
+
+        self.reloads = 0
+
+    def get_name(self, person_id: int) -> Optional[str]:
+        self._check()
+        return self._names.get(person_id)
+
+    def get_names(self, person_ids: Iterable[int]) -> Dict[int, str]:
+        self._check()
+        names = self._names
+        return {
+            person_id: names[person_id]
+            for person_id in person_ids
+            if person_id in names
+        }
+
+    def get_id(self, name: str) -> Optional[int]:
+        self._check()
+        return self._ids.get(name)
+
+    def get_or_create_id(self, name: str) -> int:
+        """Get the ID of `name`, creating the person in the store if needed."""
+        person_id = self.get_id(name)
+        if person_id is not None:
+            return person_id
+
+        person_id = self.store.get_or_create_person_id(name)
+        with self._lock:
+            self._set(person_id, name)
+        return person_id
+
+    def delete(self, name: str) -> Optional[int]:
+        """
+        Delete `name` from the store.
+
+        Returns:
+            The ID the person had, or None if unknown.
+        """
+        person_id = self.get_id(name)
+        self.store.delete_person(name)
+        with self._lock:
+            self._names = {
+                key: value for key, value in self._names.items() if value != name
+            }
+            self._ids = {key: value for key, value in self._ids.items() if key != name}
+        return person_id
+
+    def all(self) -> List[dict]:
+        """All persons, as {"name", "id"} dicts."""
+        self._check()
+        return [
+            {"name": name, "id": person_id} for person_id, name in self._names.items()
+        ]
+
+    def reload(self) -> None:
+        """Load the whole table from the store."""
+        with self._lock:
+            version = self.store.get_version()
+            persons = self.store.get_all_persons()
+            self._names = {person["id"]: person["name"] for person in persons}
+            self._ids = {name: person_id for person_id, name in self._names.items()}
+            self._version = version
+            self._checked_at = time.monotonic()
+            self.reloads += 1
+        logger.debug(f"Loaded {len(persons)} person(s), version {version}")
+
+    def _check(self) -> None:
+        """Reload if the table changed since it was loaded."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_sec:
+            return
+
+        with self._lock:
+            if now - self._checked_at < self.check_interval_sec:
+                return
+            if self._version is None:
+                self.reload()
+                return
+            try:
+                version = self.store.get_version()
+            except Exception as e:
+                # Keep serving the cached names
+                logger.warning(f"Checking the faces table version failed: {e}")
+                version = self._version
+            self._checked_at = now
+            if version != self._version:
+                self.reload()
+
+    def _set(self, person_id: int, name: str) -> None:
+        # Copy-on-write: lookups read the dicts without the lock
+        names = dict(self._names)
+        names[person_id] = name
+        ids = dict(self._ids)
+        ids[name] = person_id
+        self._names, self._ids = names, ids
@@ -0,0 +1,213 @@
+"""Per-person prototype search: a few centroids per identity, re-ranked exactly."""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from .index import nearest_per_id, normalize
+
+logger = logging.getLogger(__name__)
+
+
+def person_prototypes(
+    vectors: np.ndarray,
+    count: int,
+    metric: str = "l2",
+    seed: int = 1234,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Up to `count` k-means centroids summarizing the vectors of one person.
+
+    A person with no more vectors than `count` keeps its vectors as they are.
+    With the "cosine" metric the centroids are normalized (spherical k-means).
+
+    Args:
+        vectors: Vectors (or earlier centroids) of the person.
+        count: Centroids at most.
+        metric: "l2" or "cosine".
+        seed: k-means seed.
+        weights: Vectors each row stands for (default: 1 each).
+
+    Returns:
+        (centroids, weights): the centroids and the vectors each stands for.
+    """
+    if weights is None:
+        weights = np.ones(len(vectors), dtype="float32")
+    if len(vectors) <= count:
+        return vectors, weights
+    if count == 1:
+        centroids = np.average(vectors, axis=0, weights=weights)[None]
+        assigned = np.zeros(len(vectors), dtype="int64")
+    else:
+        kmeans = faiss.Kmeans(
+            vectors.shape[1],
+            count,
+            niter=20,
+            seed=seed,
+            spherical=metric == "cosine",
+            # A person has few images: no warning for small training sets
+            min_points_per_centroid=1,
+        )
+        kmeans.train(np.ascontiguousarray(vectors), weights=weights)
+        centroids = kmeans.centroids
+        _, assigned = kmeans.index.search(np.ascontiguousarray(vectors), 1)
+        assigned = assigned[:, 0]
+    sizes = np.bincount(assigned, weights=weights, minlength=len(centroids))
+    centroids = normalize(centroids) if metric == "cosine" else centroids
+    return centroids, sizes.astype("float32")
+
+
+class PrototypeIndex:
+    """
+    Searches identities instead of enrollment images.
+
+    Every person is represented by up to `per_person` centroids of its
+    embeddings. A query is first matched against the centroids only, then
+    the best `candidates` persons are re-ranked with the distance to their
+    own vectors in the main index (searched through an ID selector), so the
+    similarities are the same as a search of all vectors. Persons with no
+    more vectors than centroids need no re-ranking.
+
+    Search cost grows with the number of persons, not of images. Only the
+    centroids are kept: new vectors are merged into them by weighted k-means.
+    """
+
+    def __init__(
+        self, per_person: int = 3, candidates: int = 10, metric: str = "l2"
+    ) -> None:
+        """
+        Args:
+            per_person: Centroids per person at most.
+            candidates: Persons re-ranked per query.
+            metric: "l2", or "cosine" for normalized vectors.
+        """
+        self.per_person = max(1, per_person)
+        self.candidates = max(1, candidates)
+        self.metric = metric
+        # Centroids of each person and the vectors each stands for
+        self._centroids: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._index: faiss.IndexIDMap = None
+
+    @property
+    def ntotal(self) -> int:
+        """Number of prototypes."""
+        return 0 if self._index is None else self._index.ntotal
+
+    def build(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """Replace the contents with `vectors` labelled with person `ids`."""
+        self._centroids = {}
+        self._index = None
+        self.add(vectors, ids)
+        logger.info(
+            f"Built {self.ntotal} prototypes for {len(self._centroids)} person(s)"
+        )
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """Add vectors and update the prototypes of their persons."""
+        if not len(ids):
+            return
+        if self._index is None:
+            metric_type = (
+                faiss.METRIC_INNER_PRODUCT
+                if self.metric == "cosine"
+                else faiss.METRIC_L2
+            )
+            self._index = faiss.IndexIDMap(
+                faiss.IndexFlat(vectors.shape[1], metric_type)
+            )
+
+        changed = np.unique(ids)
+        for person_id in changed.tolist():
+            new = vectors[ids == person_id]
+            weights = np.ones(len(new), dtype="float32")
+            old = self._centroids.get(person_id)
+            if old is not None:
+                new = np.concatenate([old[0], new])
+                weights = np.concatenate([old[1], weights])
+            self._centroids[person_id] = person_prototypes(
+                new, self.per_person, self.metric, weights=weights
+            )
+
+        self._index.remove_ids(changed)
+        for person_id in changed.tolist():
+            prototypes, _ = self._centroids[person_id]
+            self._index.add_with_ids(
+                np.ascontiguousarray(prototypes, dtype="float32"),
+                np.full(len(prototypes), person_id, dtype="int64"),
+            )
+
+    def remove(self, ids: np.ndarray) -> None:
+        """Remove persons."""
+        for person_id in np.asarray(ids).tolist():
+            self._centroids.pop(person_id, None)
+        if self._index is not None:
+            self._index.remove_ids(np.asarray(ids, dtype="int64"))
+
+    def search(
+        self, queries: np.ndarray, k: int, index: faiss.Index
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the `k` nearest persons of each query.
+
+        Args:
+            queries: Query vectors.
+            k: Persons per query.
+            index: Main index holding every vector, used for the re-ranking.
+
+        Returns:
+            (distances, ids) like `faiss.Index.search`: squared L2 distance to
+            (or inner product with) the nearest vector of each person, -1 IDs
+            when fewer persons match.
+        """
+        cosine = self.metric == "cosine"
+        distances = np.full(
+            (len(queries), k), -np.inf if cosine else np.inf, dtype="float32"
+        )
+        labels = np.full((len(queries), k), -1, dtype="int64")
+        if self._index is None or self._index.ntotal == 0:
+            return distances, labels
+
+        # First pass: centroids only (a person may have several among the hits)
+        candidates = max(k, self.candidates)
+        proto_distances, proto_ids = self._index.search(
+            queries, candidates * self.per_person
+        )
+
+        for row, query in enumerate(queries):
+            scored: Dict[int, float] = {}
+            for distance, person_id in zip(
+                proto_distances[row].tolist(), proto_ids[row].tolist()
+            ):
+                if person_id != -1 and person_id not in scored:
+                    scored[person_id] = distance
+                    if len(scored) == candidates:
+                        break
+
+            # Re-rank: distance to the person's nearest own vector
+            counts = {
+                person_id: int(self._centroids[person_id][1].sum())
+                for person_id in scored
+            }
+            rerank = [p for p in scored if counts[p] > self.per_person]
+            if rerank:
+                nearest = nearest_per_id(
+                    index, query, rerank, limit=sum(counts[p] for p in rerank)
+                )
+                for person_id in rerank:
+                    if person_id in nearest:
+                        scored[person_id] = nearest[person_id]
+                    else:
+                        # Not reached by the main index either
+                        del scored[person_id]
+
+            ranked = sorted(
+                ((distance, person_id) for person_id, distance in scored.items()),
+                reverse=cosine,
+            )
+            for col, (distance, person_id) in enumerate(ranked[:k]):
+                distances[row, col] = distance
+                labels[row, col] = person_id
+        return distances, labels
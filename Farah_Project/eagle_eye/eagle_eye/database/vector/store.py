@@ -0,0 +1,368 @@
+"""Crash-safe persistence of the face index: snapshots plus an append-only log."""
+
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import faiss
+import numpy as np
+
+from .index import extract_vectors
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_RE = re.compile(r"^(\d{10})\.(add|remove)\.npy$")
+
+
+class IndexStore:
+    """
+    Stores the face index as a snapshot plus a log of later changes.
+
+    Every enrollment or removal is appended to the log as a small segment
+    file (only the vectors or IDs it touched), so saving no longer rewrites
+    the whole index. Once the log grows past `max_log_bytes` or
+    `max_log_segments` it is compacted into a new snapshot.
+
+    Crash safety: files are written under a temporary name, flushed and
+    renamed. The manifest names the current snapshot and the last change it
+    contains; replacing it is the commit point of a snapshot. On startup the
+    snapshot is loaded and newer segments are replayed.
+
+    Next to each snapshot the float32 vectors it holds are kept as well.
+    Compressed indices ("fp16", "sq8", "ivfpq") only hold approximations of
+    the embeddings; rebuilds train and encode from these source vectors, so
+    repeated rebuilds never add up encoding errors.
+
+    Layout of `directory`:
+        MANIFEST.json                 {"snapshot": ..., "seq": ...}
+        snapshot-<seq>.index          FAISS index holding changes up to <seq>
+        snapshot-<seq>.vectors.npy    structured array of (id, vector) in it
+        log/<seq>.add.npy             structured array of (id, vector)
+        log/<seq>.remove.npy          int64 IDs
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        legacy_file: Optional[Path] = None,
+        max_log_bytes: int = 256 * 1024**2,
+        max_log_segments: int = 1000,
+        fsync: bool = True,
+    ) -> None:
+        """
+        Args:
+            directory: Where snapshots and the log are kept.
+            legacy_file: Single-file index of older versions, loaded if no
+                manifest exists yet and removed by the first snapshot.
+            max_log_bytes: Log size that triggers a compaction.
+            max_log_segments: Segment count that triggers a compaction.
+            fsync: Flush files to disk before committing them.
+        """
+        self.directory = Path(directory)
+        self.log_dir = self.directory / "log"
+        self.manifest_file = self.directory / "MANIFEST.json"
+        self.legacy_file = legacy_file
+        self.max_log_bytes = max_log_bytes
+        self.max_log_segments = max_log_segments
+        self.fsync = fsync
+
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._log_bytes = 0
+        self._log_segments = 0
+        # Segments left out on load, left out of the source vectors too
+        self._skipped: Set[int] = set()
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(
+        self,
+        create_index: Callable[[int], faiss.Index],
+        remove_ids: Callable[[faiss.Index, np.ndarray], faiss.Index],
+        add_vectors: Optional[
+            Callable[[faiss.Index, np.ndarray, np.ndarray, int], faiss.Index]
+        ] = None,
+    ) -> Optional[faiss.Index]:
+        """
+        Load the snapshot and replay the log.
+
+        Args:
+            create_index: Builds an empty index of a dimension (log without snapshot).
+            remove_ids: Removes IDs from an index, returning the resulting index.
+            add_vectors: Adds (vectors, ids) logged as change `seq` to an
+                index, returning the resulting index (default: `add_with_ids`).
+
+        Returns:
+            The index, or None if nothing is stored.
+        """
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._remove_temp_files()
+
+        segments = list(self._segments())
+        # New changes never reuse the number of a segment on disk
+        self._seq = max((seq for seq, _, _ in segments), default=0)
+        index, self._snapshot_seq = self._load_snapshot()
+        self._seq = max(self._seq, self._snapshot_seq)
+        self._log_bytes = 0
+        self._log_segments = 0
+        self._skipped = set()
+        if index is not None and not self._vectors_file(self._snapshot_seq).exists():
+            # Snapshot of an older version: its stored vectors are all there is
+            self._write_vectors(self._snapshot_seq, *extract_vectors(index))
+
+        replayed = 0
+        for seq, kind, path in segments:
+            if seq <= self._snapshot_seq:
+                # Already in the snapshot (crash before the log was trimmed)
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                data = np.load(path, mmap_mode="r")
+            except Exception as e:
+                # Never committed: a crash while it was being renamed
+                logger.warning(f"Skipping unreadable index log segment {path}: {e}")
+                self._skipped.add(seq)
+                continue
+
+            try:
+                if kind == "add":
+                    if index is None:
+                        index = create_index(data["vector"].shape[1])
+                    vectors = np.ascontiguousarray(data["vector"])
+                    ids = np.ascontiguousarray(data["id"])
+                    if add_vectors is None:
+                        index.add_with_ids(vectors, ids)
+                    else:
+                        index = add_vectors(index, vectors, ids, seq)
+                elif index is not None:
+                    index = remove_ids(index, np.asarray(data))
+            except Exception as e:
+                # One bad change must not make the whole gallery unloadable
+                logger.error(f"Failed to replay index log segment {path}: {e}")
+                self._skipped.add(seq)
+                continue
+            self._log_bytes += path.stat().st_size
+            self._log_segments += 1
+            replayed += 1
+
+        if replayed:
+            logger.info(f"Replayed {replayed} index log segment(s)")
+        return index
+
+    def _load_snapshot(self) -> Tuple[Optional[faiss.Index], int]:
+        if self.manifest_file.exists():
+            manifest = json.loads(self.manifest_file.read_text())
+            path = self.directory / manifest["snapshot"]
+            index = faiss.read_index(str(path))
+            logger.info(f"Loaded index snapshot {path.name} ({index.ntotal} vectors)")
+            return index, int(manifest["seq"])
+
+        if self.legacy_file is not None and self.legacy_file.exists():
+            index = faiss.read_index(str(self.legacy_file))
+            logger.info(
+                f"Loaded index from {self.legacy_file} ({index.ntotal} vectors)"
+            )
+            return index, 0
+
+        return None, 0
+
+    def source_vectors(
+        self, until: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The float32 (vectors, ids) of the gallery, as they were logged.
+
+        Args:
+            until: Last change to include (default: all of them).
+
+        Returns:
+            Vectors of the snapshot plus the ones added since, without the
+            removed IDs, oldest first.
+        """
+        with self._lock:
+            chunks: List[Tuple[np.ndarray, np.ndarray]] = []
+            snapshot_file = self._vectors_file(self._snapshot_seq)
+            if snapshot_file.exists():
+                records = np.load(snapshot_file)
+                if len(records):
+                    chunks.append((records["vector"], records["id"]))
+
+            for seq, kind, path in self._segments():
+                if seq <= self._snapshot_seq or seq in self._skipped:
+                    continue
+                if until is not None and seq > until:
+                    break
+                data = np.load(path)
+                if kind == "add":
+                    chunks.append((data["vector"], data["id"]))
+                else:
+                    removed = chunks
+                    chunks = []
+                    for vectors, ids in removed:
+                        keep = ~np.isin(ids, data)
+                        chunks.append((vectors[keep], ids[keep]))
+
+        if not chunks:
+            return np.empty((0, 0), dtype="float32"), np.empty(0, dtype="int64")
+        vectors = np.concatenate([vectors for vectors, _ in chunks])
+        ids = np.concatenate([ids for _, ids in chunks])
+        return np.ascontiguousarray(vectors, dtype="float32"), ids.astype("int64")
+
+    # ------------------------------------------------------------------
+    # Log
+    # ------------------------------------------------------------------
+
+    def append_add(self, vectors: np.ndarray, ids: np.ndarray) -> int:
+        """Log added vectors; returns the sequence number of the change."""
+        records = np.empty(
+            len(ids), dtype=[("id", "<i8"), ("vector", "<f4", (vectors.shape[1],))]
+        )
+        records["id"] = ids
+        records["vector"] = vectors
+        return self._append("add", records)
+
+    def append_remove(self, ids: np.ndarray) -> int:
+        """Log removed IDs; returns the sequence number of the change."""
+        return self._append("remove", np.asarray(ids, dtype="<i8"))
+
+    def _append(self, kind: str, data: np.ndarray) -> int:
+        with self._lock:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            seq = self._seq + 1
+            path = self.log_dir / f"{seq:010d}.{kind}.npy"
+            self._write_atomic(path, lambda f: np.save(f, data))
+            self._seq = seq
+            self._log_bytes += path.stat().st_size
+            self._log_segments += 1
+            return seq
+
+    def discard(self, seq: int) -> None:
+        """Drop the last logged change, which could not be applied."""
+        with self._lock:
+            if seq != self._seq:
+                raise ValueError(f"Only the last change can be discarded: {seq}")
+            for path in self.log_dir.glob(f"{seq:010d}.*.npy"):
+                self._log_bytes -= path.stat().st_size
+                self._log_segments -= 1
+                path.unlink()
+            self._seq = seq - 1
+
+    @property
+    def needs_compaction(self) -> bool:
+        return (
+            self._log_bytes >= self.max_log_bytes
+            or self._log_segments >= self.max_log_segments
+        )
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshot(self, index: faiss.Index) -> None:
+        """
+        Write `index` as the new snapshot and trim the log.
+
+        The caller must hold off changes to the index until this returns, so
+        the snapshot matches the last logged change.
+        """
+        with self._lock:
+            seq = self._seq
+            name = f"snapshot-{seq:010d}.index"
+            vectors_file = self._vectors_file(seq)
+            if seq != self._snapshot_seq or not vectors_file.exists():
+                self._write_vectors(seq, *self.source_vectors())
+            temp = self.directory / f"{name}.tmp"
+            faiss.write_index(index, str(temp))
+            self._commit(temp, self.directory / name)
+            # Commit point
+            manifest = json.dumps({"snapshot": name, "seq": seq}).encode()
+            self._write_atomic(self.manifest_file, lambda f: f.write(manifest))
+            self._snapshot_seq = seq
+
+            # Everything older is now garbage
+            for old_seq, _, path in self._segments():
+                if old_seq <= seq:
+                    path.unlink(missing_ok=True)
+            for path in self.directory.glob("snapshot-*"):
+                if path.name not in (name, vectors_file.name):
+                    path.unlink(missing_ok=True)
+            if self.legacy_file is not None:
+                self.legacy_file.unlink(missing_ok=True)
+            self._log_bytes = 0
+            self._log_segments = 0
+
+        logger.info(f"Wrote index snapshot {name} ({index.ntotal} vectors)")
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "seq": self._seq,
+            "snapshot_seq": self._snapshot_seq,
+            "log_segments": self._log_segments,
+            "log_bytes": self._log_bytes,
+        }
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _segments(self) -> Iterator[Tuple[int, str, Path]]:
+        """Log segments, oldest first."""
+        found: List[Tuple[int, str, Path]] = []
+        for path in self.log_dir.glob("*.npy"):
+            match = _SEGMENT_RE.match(path.name)
+            if match:
+                found.append((int(match.group(1)), match.group(2), path))
+        return iter(sorted(found))
+
+    def _vectors_file(self, seq: int) -> Path:
+        return self.directory / f"snapshot-{seq:010d}.vectors.npy"
+
+    def _write_vectors(self, seq: int, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """Store the source vectors of the snapshot of change `seq`."""
+        dimension = vectors.shape[1] if vectors.ndim == 2 else 0
+        records = np.empty(
+            len(ids), dtype=[("id", "<i8"), ("vector", "<f4", (dimension,))]
+        )
+        records["id"] = ids
+        records["vector"] = vectors
+        self._write_atomic(self._vectors_file(seq), lambda f: np.save(f, records))
+
+    def _write_atomic(self, path: Path, write: Callable[[Any], Any]) -> None:
+        """Write through a temporary file renamed over `path`."""
+        temp = path.with_name(path.name + ".tmp")
+        with open(temp, "wb") as f:
+            write(f)
+        self._commit(temp, path)
+
+    def _commit(self, temp: Path, path: Path) -> None:
+        """Flush `temp` to disk and rename it over `path`."""
+        if self.fsync:
+            with open(temp, "rb+") as f:
+                os.fsync(f.fileno())
+        os.replace(temp, path)
+        if self.fsync:
+            self._fsync_dir(path.parent)
+
+    @staticmethod
+    def _fsync_dir(directory: Path) -> None:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return  # not supported on this platform
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _remove_temp_files(self) -> None:
+        for directory in (self.directory, self.log_dir):
+            for path in directory.glob("*.tmp"):
+                path.unlink(missing_ok=True)
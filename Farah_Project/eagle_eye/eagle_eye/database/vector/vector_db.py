@@ -1,14 +1,22 @@
 import asyncio
 import logging
-from typing import List, Optional, Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import faiss
 import numpy as np
-from deepface import DeepFace
 
 from eagle_eye.config.folder_manager import VECTOR_DIR
+from eagle_eye.config.settings import settings
 from eagle_eye.database.sql.metadata_store import MetadataStore
 
+from . import index as faiss_index
+from .enrollment import EnrollmentResult, FaceEnroller, ProgressCallback, embed_image
+from .name_cache import PersonNameCache
+from .prototypes import PrototypeIndex
+from .store import IndexStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,160 +36,488 @@ class FaceDatabase:
         self._index: Optional[faiss.Index] = None
         self._model_name = "VGG-Face"
 
-        # Persistence paths
-        self._index_file = VECTOR_DIR / "faiss_index.bin"
+        # Index type: fixed, or "auto" to upgrade as the gallery grows
+        self._index_type = settings.FACE_INDEX_TYPE
+        self._index_params = {
+            "nprobe": settings.FACE_INDEX_NPROBE,
+            "ef_search": settings.FACE_INDEX_EF_SEARCH,
+        }
+        # "cosine" normalizes vectors and searches by inner product
+        self._metric = settings.FACE_METRIC
+        # Vector storage: "float32", or compressed "fp16" / "sq8"
+        self._encoding = settings.FACE_INDEX_ENCODING
+        # Guards the index; searches run on the old index during a rebuild
+        self._lock = threading.RLock()
+        self._rebuild_thread: Optional[threading.Thread] = None
+        # Changes made while a rebuild runs (with their log sequence number),
+        # replayed on the new index
+        self._journal: Optional[List[Tuple[str, Any, Any, int]]] = None
+        # Person IDs removed from an index that cannot delete (HNSW): hidden
+        # from searches until a background rebuild drops their vectors
+        self._tombstones: Set[int] = set()
+        # Vectors per person ID, so counts need no scan of the index
+        self._counts: Dict[int, int] = {}
+        # Optional first pass over a few centroids per person
+        self._prototypes: Optional[PrototypeIndex] = None
+        if settings.FACE_SEARCH_MODE == "prototypes":
+            self._prototypes = PrototypeIndex(
+                per_person=settings.FACE_PROTOTYPES_PER_PERSON,
+                candidates=settings.FACE_PROTOTYPE_CANDIDATES,
+                metric=self._metric,
+            )
+
+        # Persistence: snapshot plus a log of enrollments and removals
+        self._store = IndexStore(
+            VECTOR_DIR,
+            legacy_file=VECTOR_DIR / "faiss_index.bin",
+            max_log_bytes=settings.FACE_INDEX_LOG_MAX_MB * 1024**2,
+            max_log_segments=settings.FACE_INDEX_LOG_MAX_SEGMENTS,
+            fsync=settings.FACE_INDEX_FSYNC,
+        )
+        self._loaded = False
+        self._compact_thread: Optional[threading.Thread] = None
+
+        # Enrollment embeddings are computed in worker processes
+        self._enroller = FaceEnroller(
+            self._model_name, workers=settings.FACE_ENROLL_WORKERS
+        )
 
         # Initialize metadata database (uses shared engine)
         self._metadata_db: Optional[MetadataStore] = None
+        # Person names, cached so recognition runs no SQL per frame
+        self._names: Optional[PersonNameCache] = None
 
     def _ensure_db_loaded(self):
         """Load database from disk if not already loaded."""
-        if self._index is None:
+        if self._index is None and not self._loaded:
             VECTOR_DIR.mkdir(parents=True, exist_ok=True)
-
-            # Load FAISS Index
-            if self._index_file.exists():
-                try:
-                    self._index = faiss.read_index(str(self._index_file))
-                    logger.info(f"Loaded FAISS index from {self._index_file}")
-                except Exception as e:
-                    logger.error(f"Failed to load FAISS index: {e}")
-                    self._index = None
+            self._loaded = True
+
+            # Load FAISS Index: last snapshot, then the changes logged since
+            try:
+                with self._lock:
+                    self._tombstones = set()
+                    self._index = self._store.load(
+                        create_index=lambda dimension: faiss_index.build_index(
+                            self._target_index_type(0),
+                            dimension,
+                            metric=self._metric,
+                            encoding=self._target_encoding(0),
+                            **self._index_params,
+                        ),
+                        remove_ids=lambda index, ids: self._apply_remove(
+                            index, ids, self._tombstones
+                        ),
+                        add_vectors=lambda index, vectors, ids, seq: self._apply_add(
+                            index, vectors, ids, self._tombstones, seq
+                        ),
+                    )
+                if (
+                    self._index is not None
+                    and faiss_index.index_metric(self._index) != self._metric
+                ):
+                    # Migration: the vectors are re-normalized into a new index
+                    logger.info(
+                        f"Migrating FAISS index from "
+                        f"{faiss_index.index_metric(self._index)} to {self._metric}"
+                    )
+                    self.rebuild_index(faiss_index.index_type(self._index))
+                if self._index is not None:
+                    self._counts = faiss_index.id_counts(
+                        faiss_index.index_ids(self._index)
+                    )
+                    for person_id in self._tombstones:
+                        self._counts.pop(person_id, None)
+                    if self._prototypes is not None:
+                        self._prototypes.build(*self._source_vectors())
+                    faiss_index.tune_index(self._index, **self._index_params)
+                    logger.info(
+                        f"Loaded {faiss_index.index_type(self._index)} FAISS index "
+                        f"({self._index.ntotal} vectors) from {VECTOR_DIR}"
+                    )
+                    # A gallery saved under another configuration may need a new type
+                    self._schedule_rebuild()
+            except Exception as e:
+                logger.error(f"Failed to load FAISS index: {e}")
+                self._index = None
 
         if self._metadata_db is None:
             # Use shared database engine (no path needed)
             self._metadata_db = MetadataStore()
 
-        self._initialized = True
-
-    async def _save_index_async(self):
-        """Save FAISS index to disk asynchronously."""
-        # Ensure index is loaded
-        self._ensure_db_loaded()
-        try:
-            VECTOR_DIR.mkdir(parents=True, exist_ok=True)
+        if self._names is None:
+            self._names = PersonNameCache(
+                self._metadata_db, check_interval_sec=settings.FACE_NAMES_CHECK_SEC
+            )
 
-            if self._index is not None:
-                # Use run_in_executor for CPU-bound FAISS write operation
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(
-                    None, faiss.write_index, self._index, str(self._index_file)
-                )
-                logger.info("Saved FAISS index to disk")
-        except Exception as e:
-            logger.error(f"Failed to save FAISS index: {e}")
+        self._initialized = True
 
-    def _save_index(self):
-        """Save FAISS index to disk (synchronous wrapper)."""
-        try:
-            asyncio.run(self._save_index_async())
-        except RuntimeError:
-            # If event loop is already running, use sync version
-            self._save_index_sync()
+    def compact(self) -> None:
+        """Write the index as a snapshot and drop the log it replaces."""
+        # No changes while the snapshot is written, so it matches the log
+        with self._lock:
+            if self._index is None:
+                return
+            if self._tombstones:
+                # The snapshot would bring removed faces back: the rebuild
+                # that drops them compacts the log instead
+                logger.debug("Compaction deferred until removed faces are purged")
+                return
+            self._store.snapshot(self._index)
+
+    def _schedule_compaction(self) -> None:
+        """Compact in the background once the log grew too large."""
+        if not self._store.needs_compaction:
+            return
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return
+        self._compact_thread = threading.Thread(
+            target=self._compact_safely, name="faiss-compact", daemon=True
+        )
+        self._compact_thread.start()
 
-    def _save_index_sync(self):
-        """Save FAISS index to disk (synchronous)."""
-        self._ensure_db_loaded()
+    def _compact_safely(self) -> None:
         try:
-            VECTOR_DIR.mkdir(parents=True, exist_ok=True)
-            if self._index is not None:
-                faiss.write_index(self._index, str(self._index_file))
-                logger.info("Saved FAISS index to disk (sync)")
+            self.compact()
         except Exception as e:
-            logger.error(f"Failed to save FAISS index: {e}")
+            # The log is intact; compaction is retried after the next change
+            logger.error(f"Failed to compact FAISS index: {e}")
 
     def _init_index(self, dimension: int):
         """Initialize FAISS index with ID mapping."""
         if self._index is None:
-            self._index = faiss.IndexIDMap(faiss.IndexFlatL2(dimension))
+            self._index = faiss_index.build_index(
+                self._target_index_type(0),
+                dimension,
+                metric=self._metric,
+                encoding=self._target_encoding(0),
+                **self._index_params,
+            )
+
+    def _target_index_type(self, count: int) -> str:
+        """Index type wanted for `count` vectors."""
+        if self._index_type == "auto":
+            kind = faiss_index.choose_index_type(
+                count,
+                (
+                    settings.FACE_INDEX_FLAT_MAX,
+                    settings.FACE_INDEX_HNSW_MAX,
+                    settings.FACE_INDEX_IVF_MAX,
+                ),
+            )
+        else:
+            kind = self._index_type
+        # Trained types wait for enough vectors; exact search until then
+        if count < faiss_index.min_train_size(kind, self._target_encoding(count)):
+            return "flat"
+        return kind
+
+    def _target_encoding(self, count: int) -> str:
+        """Vector encoding wanted for `count` vectors."""
+        # "sq8" learns value ranges from the gallery; half precision until then
+        if count < faiss_index.min_train_size("flat", self._encoding):
+            return "fp16"
+        return self._encoding
+
+    def _add_vectors(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """Add vectors to the index, upgrading its type if the gallery outgrew it."""
+        if self._metric == "cosine":
+            vectors = faiss_index.normalize(vectors)
+        with self._lock:
+            # Logged first: a change is durable once the call returns
+            seq = self._store.append_add(vectors, ids)
+            try:
+                if self._index is None:
+                    self._init_index(vectors.shape[1])
+                self._index = self._apply_add(
+                    self._index, vectors, ids, self._tombstones, seq
+                )
+            except Exception:
+                # Not applied, so it must not be replayed either
+                self._store.discard(seq)
+                raise
+            for person_id, count in faiss_index.id_counts(ids).items():
+                self._counts[person_id] = self._counts.get(person_id, 0) + count
+            if self._prototypes is not None:
+                self._prototypes.add(vectors, ids)
+            if self._journal is not None:
+                self._journal.append(("add", vectors, ids, seq))
+            self._schedule_rebuild()
+        self._schedule_compaction()
+
+    def _remove_ids(self, ids: np.ndarray) -> None:
+        with self._lock:
+            seq = self._store.append_remove(ids)
+            try:
+                self._index = self._apply_remove(self._index, ids, self._tombstones)
+            except Exception:
+                self._store.discard(seq)
+                raise
+            for person_id in ids.tolist():
+                self._counts.pop(person_id, None)
+            if self._prototypes is not None:
+                self._prototypes.remove(ids)
+            if self._journal is not None:
+                self._journal.append(("remove", ids, None, seq))
+            self._schedule_rebuild()
+        self._schedule_compaction()
+
+    def _apply_add(
+        self,
+        index: faiss.Index,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        tombstones: Set[int],
+        seq: int,
+    ) -> faiss.Index:
+        """Add the vectors of change `seq` to `index` (removed IDs: `tombstones`)."""
+        reused = [i for i in np.unique(ids).tolist() if i in tombstones]
+        if reused:
+            # The ID of a removed person was given out again: its old
+            # vectors must really go before the new ones are visible. An
+            # HNSW graph is rebuilt from the vectors logged before this
+            # change, which no longer hold any removed person.
+            index = faiss_index.remove_ids(
+                index,
+                np.array(reused, dtype="int64"),
+                source=self._store.source_vectors(until=seq - 1),
+                **self._index_params,
+            )
+            if not faiss_index.supports_remove(faiss_index.index_type(index)):
+                tombstones.clear()
+        index.add_with_ids(vectors, ids)
+        tombstones.difference_update(reused)
+        return index
+
+    def _apply_remove(
+        self, index: faiss.Index, ids: np.ndarray, tombstones: Set[int]
+    ) -> faiss.Index:
+        """Remove IDs from `index`, or tombstone them if it cannot delete."""
+        if faiss_index.supports_remove(faiss_index.index_type(index)):
+            return faiss_index.remove_ids(index, ids, **self._index_params)
+        # Rebuilding the graph here would block searches for as long
+        tombstones.update(np.asarray(ids).tolist())
+        return index
+
+    def _source_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Original float32 (vectors, ids) of the index, without the removed ones.
 
-    async def add_face_batch(self, images: List[str], name: str) -> bool:
+        Read from the snapshot and the log rather than decoded from the
+        index, which only holds approximations of compressed vectors.
         """
-        Add multiple faces for the same person to the vector database.
+        return self._store.source_vectors()
+
+    def _schedule_rebuild(self) -> None:
+        """
+        Start a background rebuild when the index type or encoding should
+        change, or removed vectors are waiting to be dropped.
+        """
+        current = faiss_index.index_type(self._index)
+        target = self._target_index_type(self._index.ntotal)
+        # "auto" only moves up: removing faces does not shrink the index
+        if self._index_type == "auto" and faiss_index.INDEX_TYPES.index(
+            target
+        ) < faiss_index.INDEX_TYPES.index(current):
+            if not self._tombstones:
+                return
+            target = current
+        encoding = faiss_index.index_encoding(self._index)
+        if (
+            target == current
+            and encoding in (self._target_encoding(self._index.ntotal), "pq")
+            and not self._tombstones
+        ):
+            return
+        thread = self._rebuild_thread
+        if (
+            thread is not None
+            and thread.is_alive()
+            and thread is not threading.current_thread()
+        ):
+            return
+
+        self._rebuild_thread = threading.Thread(
+            target=self.rebuild_index, args=(target,), name="faiss-rebuild", daemon=True
+        )
+        self._rebuild_thread.start()
+
+    def rebuild_index(self, index_type: Optional[str] = None) -> bool:
+        """
+        Rebuild the index, training it on the current vectors.
+
+        The vectors come from the store as they were enrolled, so repeated
+        rebuilds of a compressed index encode the same values every time.
+        Searches and enrollments keep using the current index while the new
+        one is trained; changes made meanwhile are replayed before the swap.
+        Vectors of removed persons are left out of the new index.
 
         Args:
-            images: List of image paths or numpy arrays (BGR).
-            name: Name of the person.
+            index_type: Type of the new index (default: the configured target).
 
         Returns:
-            True if at least one face was added successfully, False otherwise.
+            True if the index was replaced.
         """
-        # Ensure index is loaded
         self._ensure_db_loaded()
+        with self._lock:
+            if self._index is None:
+                return False
+            vectors, ids = self._source_vectors()
+            kind = index_type or self._target_index_type(len(ids))
+            self._journal = []
 
-        if not images:
-            logger.warning(f"No images provided for {name}")
-            return False
-
+        started = time.perf_counter()
         try:
-            # Get or create person ID (reuses existing ID if name exists)
-            person_id = self._metadata_db.get_or_create_person_id(name)
-
-            embeddings_list = []
-            successful_count = 0
-
-            # Process each image and collect embeddings
-            for idx, image in enumerate(images):
-                try:
-                    # Generate embedding
-                    embeddings = DeepFace.represent(
-                        img_path=image,
-                        model_name=self._model_name,
-                        enforce_detection=True,
-                    )
+            if self._metric == "cosine":
+                vectors = faiss_index.normalize(vectors)
+            index = faiss_index.build_index(
+                kind,
+                vectors.shape[1],
+                vectors,
+                ids,
+                metric=self._metric,
+                encoding=self._target_encoding(len(ids)),
+                **self._index_params,
+            )
+        except Exception as e:
+            logger.error(f"Failed to build {kind} FAISS index: {e}")
+            with self._lock:
+                self._journal = None
+            return False
 
-                    if embeddings:
-                        # Take the first detected face
-                        embedding = embeddings[0]["embedding"]
-                        embeddings_list.append(embedding)
-                        successful_count += 1
-                        logger.info(
-                            f"Processed image {idx + 1}/{len(images)} for {name}"
-                        )
-                    else:
-                        logger.warning(
-                            f"No face detected in image {idx + 1} for {name}"
-                        )
-
-                except Exception as e:
-                    logger.warning(f"Failed to process image {idx + 1} for {name}: {e}")
-                    continue
-
-            if not embeddings_list:
-                logger.error(
-                    f"No faces detected in any of the {len(images)} images for {name}"
-                )
+        with self._lock:
+            # Only removals made during the build are still to be dropped
+            tombstones: Set[int] = set()
+            for action, values, value_ids, seq in self._journal:
+                if action == "add":
+                    index = self._apply_add(index, values, value_ids, tombstones, seq)
+                else:
+                    index = self._apply_remove(index, values, tombstones)
+            self._journal = None
+            self._index = index
+            self._tombstones = tombstones
+
+        logger.info(
+            f"Rebuilt FAISS index as {kind} with {index.ntotal} vectors "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        # Snapshot the new type, so a restart does not rebuild again
+        self._compact_safely()
+        with self._lock:
+            if self._tombstones:
+                self._schedule_rebuild()
+        return True
+
+    def wait_for_rebuild(self, timeout: Optional[float] = None) -> bool:
+        """Wait for background rebuilds; False if one is still running."""
+        thread = self._rebuild_thread
+        while thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
                 return False
-
-            # Initialize index if needed
-            dim = len(embeddings_list[0])
+            # A rebuild may have started another one for later removals
+            if self._rebuild_thread is thread:
+                break
+            thread = self._rebuild_thread
+        return True
+
+    def get_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All stored (embeddings, person IDs), e.g. to evaluate index settings."""
+        self._ensure_db_loaded()
+        with self._lock:
             if self._index is None:
-                self._init_index(dim)
+                return np.empty((0, 0), dtype="float32"), np.empty(0, dtype="int64")
+            return self._source_vectors()
 
-            # Convert embeddings to numpy array
-            vectors = np.array(embeddings_list, dtype="float32")
+    @property
+    def index_stats(self) -> Dict[str, Any]:
+        """Type, size and dimension of the index."""
+        self._ensure_db_loaded()
+        stats = faiss_index.index_stats(self._index)
+        stats["configured"] = self._index_type
+        stats["rebuilding"] = self._journal is not None
+        return stats
+
+    async def enroll(
+        self,
+        name: str,
+        images: Any,
+        total: Optional[int] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> EnrollmentResult:
+        """
+        Add the faces of several images of the same person.
 
-            # Create person IDs array (same ID for all embeddings)
-            person_ids = np.array([person_id] * len(embeddings_list))
+        Images are decoded and embedded in the enrollment worker pool as they
+        arrive, without blocking the event loop; the vectors are then added
+        to the index at once.
 
-            # Add all vectors to index
-            self._index.add_with_ids(vectors, person_ids)
+        Args:
+            name: Name of the person.
+            images: (label, image) pairs, possibly an async iterator. An image
+                is encoded bytes, a path or a BGR array.
+            total: Number of images, if known (for progress reports).
+            on_progress: Called after each image.
 
-            # Save the index asynchronously
-            await self._save_index_async()
+        Returns:
+            The embeddings added and the status of each image.
+        """
+        self._ensure_db_loaded()
 
-            logger.info(
-                f"Added {successful_count}/{len(images)} face(s) for {name} with ID {person_id}"
+        result = await self._enroller.embed(
+            images, total=total, on_progress=on_progress
+        )
+        if not result.added:
+            logger.error(
+                f"No faces detected in any of the {len(result.images)} images for {name}"
             )
-            return True
+            return result
+
+        await asyncio.to_thread(
+            self.add_embeddings, [name] * result.added, result.vectors
+        )
+        logger.info(f"Added {result.added}/{len(result.images)} face(s) for {name}")
+        return result
+
+    async def add_face_batch(self, images: List[Any], name: str) -> bool:
+        """
+        Add multiple faces for the same person to the vector database.
+
+        Args:
+            images: List of image paths or numpy arrays (BGR).
+            name: Name of the person.
 
+        Returns:
+            True if at least one face was added successfully, False otherwise.
+        """
+        if not images:
+            logger.warning(f"No images provided for {name}")
+            return False
+
+        try:
+            labels = [f"image {idx + 1}" for idx in range(len(images))]
+            result = await self.enroll(name, zip(labels, images), total=len(images))
+            return result.added > 0
         except Exception as e:
             logger.error(f"Error adding faces for {name}: {e}")
-            import traceback
-
-            traceback.print_exc()
             return False
 
+    def add_embeddings(
+        self, names: Sequence[str], vectors: Union[np.ndarray, List[List[float]]]
+    ) -> None:
+        """
+        Add precomputed embeddings in a single index update.
+
+        Args:
+            names: Person of each embedding (persons are created if needed).
+            vectors: Embeddings, one row per name.
+        """
+        self._ensure_db_loaded()
+
+        ids_by_name = {name: self._names.get_or_create_id(name) for name in set(names)}
+        person_ids = np.array([ids_by_name[name] for name in names], dtype="int64")
+        self._add_vectors(np.ascontiguousarray(vectors, dtype="float32"), person_ids)
+
     def add_face(self, image: str, name: str) -> bool:
         """
         Add a face to the vector database (single image).
@@ -194,44 +530,18 @@ class FaceDatabase:
         self._ensure_db_loaded()
 
         try:
-            # Generate embedding
-            embeddings = DeepFace.represent(
-                img_path=image, model_name=self._model_name, enforce_detection=True
-            )
-
-            if not embeddings:
-                logger.warning(f"No face detected in image for {name}")
-                return False
-
-            # Take the first detected face
-            embedding = embeddings[0]["embedding"]
-            dim = len(embedding)
-
-            if self._index is None:
-                self._init_index(dim)
-
-            # Get or create person ID (reuses existing ID if name exists)
-            person_id = self._metadata_db.get_or_create_person_id(name)
-
-            logger.debug(f"Adding face for {name} with ID {person_id}")
-
-            vector = np.array([embedding], dtype="float32")
-
-            # Add to index with person ID
-            self._index.add_with_ids(vector, np.array([person_id]))
-
-            # Save only the index
-            self._save_index()
-
-            logger.info(f"Added face for {name} with ID {person_id}")
+            vector = embed_image(image, self._model_name)
+            self.add_embeddings([name], vector[None])
+            logger.info(f"Added face for {name}")
             return True
         except Exception as e:
             logger.error(f"Error adding face: {e}")
-            import traceback
-
-            traceback.print_exc()
             return False
 
+    def close(self) -> None:
+        """Stop the enrollment workers."""
+        self._enroller.close()
+
     def remove_face(self, name: str) -> bool:
         """Remove all faces for a person from the database by name."""
         # Ensure index is loaded
@@ -240,23 +550,21 @@ class FaceDatabase:
             if self._index is None:
                 return False
 
-            # Get all IDs for this person
-            person_ids = self._metadata_db.get_person_ids(name)
+            # All faces of a person share its ID
+            person_id = self._names.get_id(name)
+            count = self.get_face_count_by_id(person_id) if person_id else 0
 
-            if not person_ids:
+            if not count:
                 logger.warning(f"No face found for {name}")
                 return False
 
             # Remove from FAISS index
-            self._index.remove_ids(np.array(person_ids))
+            self._remove_ids(np.array([person_id], dtype="int64"))
 
             # Remove from metadata database
-            self._metadata_db.delete_person(name)
+            self._names.delete(name)
 
-            # Save index
-            self._save_index()
-
-            logger.info(f"Removed {len(person_ids)} face(s) for {name}")
+            logger.info(f"Removed {count} face(s) for {name}")
             return True
         except Exception as e:
             logger.error(f"Error removing face: {e}")
@@ -276,39 +584,67 @@ class FaceDatabase:
         Returns:
             Tuple of (name, similarity) or None
         """
+        matches = self.search_batch(vector, k=1, threshold=threshold)
+        if matches and matches[0]:
+            return matches[0][0]
+        return None
+
+    def search_batch(
+        self, vectors: np.ndarray, k: int = 1, threshold: float = 0.5
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Search several faces (of one frame or of many streams) at once.
+
+        Runs a single FAISS search for the whole matrix and resolves the
+        matched names with one metadata query.
+
+        Args:
+            vectors: Face embeddings, one row per face.
+            k: Nearest vectors looked up per face.
+            threshold: Similarity threshold (0-1), see `search`.
+
+        Returns:
+            Per face, up to `k` (name, similarity) matches above the threshold,
+            best first, one per person.
+        """
         # Ensure index is loaded first
         self._ensure_db_loaded()
 
-        if self._index is not None:
-            if self._index.ntotal == 0:
-                return None
+        vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype="float32")
+        if self._metric == "cosine":
+            vectors = faiss_index.normalize(vectors)
+        matches: List[List[Tuple[str, float]]] = [[] for _ in range(len(vectors))]
+        if self._index is None or self._index.ntotal == 0 or not len(vectors):
+            return matches
 
         try:
-            if self._index is None:
-                return None
-
-            distances, ids = self._index.search(vector, 1)
-            distance = distances[0][0]
-
-            # Convert distance to similarity score (invert it)
-            # For normalized L2 distance, max distance is ~2
-            # Similarity = 1 - (distance / 2)
-            # So: distance=0 → similarity=1.0 (perfect match)
-            #     distance=2 → similarity=0.0 (completely different)
-            similarity = 1.0 - (distance / 2.0)
-
-            if similarity > threshold:
-                found_id = int(ids[0][0])
-                if found_id != -1:
-                    if self._metadata_db is None:
-                        return None
-                    name = self._metadata_db.get_person_name(found_id)
-                    if name:
-                        return name, similarity
+            with self._lock:
+                if self._prototypes is not None:
+                    # Prototype mode searches persons, not every enrollment image
+                    distances, ids = self._prototypes.search(vectors, k, self._index)
+                elif self._tombstones:
+                    distances, ids = faiss_index.search_excluding(
+                        self._index, vectors, k, self._tombstones
+                    )
+                else:
+                    distances, ids = self._index.search(vectors, k)
         except Exception as e:
             logger.warning(f"Search failed: {e}")
-
-        return None
+            return matches
+
+        # Convert distance to similarity score (1 = same vector)
+        similarities = faiss_index.to_similarity(distances, self._metric)
+        hits = (similarities > threshold) & (ids != -1)
+        if not hits.any():
+            return matches
+
+        names = self._names.get_names(np.unique(ids[hits]).tolist())
+        for row, col in zip(*np.nonzero(hits)):
+            name = names.get(int(ids[row, col]))
+            # Results are sorted, so the first hit of a person is its best
+            if name and name not in (match[0] for match in matches[row]):
+                matches[row].append((name, float(similarities[row, col])))
+        return matches
 
     def get_all_faces(self) -> List[dict]:
         """
@@ -319,12 +655,10 @@ class FaceDatabase:
         """
         self._ensure_db_loaded()
 
-        if self._metadata_db is None:
-            return []
-
-        persons = self._metadata_db.get_all_persons()
+        counts = self._counts
+        persons = self._names.all()
         for person in persons:
-            person["count"] = self.get_face_count_by_id(person["id"])
+            person["count"] = counts.get(person["id"], 0)
         return persons
 
     def get_face_count(self, name: str) -> int:
@@ -337,13 +671,15 @@ class FaceDatabase:
         Returns:
             Number of face embeddings registered for this person
         """
-        person_id = self._metadata_db.get_person_id(name)
+        self._ensure_db_loaded()
+        person_id = self._names.get_id(name)
+        if person_id is None:
+            return 0
         return self.get_face_count_by_id(person_id)
 
     def get_face_count_by_id(self, person_id: int) -> int:
         """
-        Get the number of face embeddings for a person by ID
-        by counting occurrences in the FAISS index.
+        Get the number of face embeddings for a person by ID.
 
         Args:
             person_id: ID of the person
@@ -352,21 +688,7 @@ class FaceDatabase:
             Number of face embeddings registered for this person
         """
         self._ensure_db_loaded()
-
-        if self._index is None or self._index.ntotal == 0:
-            return 0
-
-        try:
-            # IndexIDMap stores IDs internally
-            ids = self._index.id_map  # type: ignore[attr-defined]
-
-            # Convert to numpy array and count matches
-            ids_np = faiss.vector_to_array(ids)
-            return int(np.sum(ids_np == person_id))
-
-        except Exception as e:
-            logger.error(f"Failed to count faces for ID {person_id}: {e}")
-            return 0
+        return self._counts.get(person_id, 0)
 
     @property
     def model_name(self) -> str:
@@ -20,9 +20,18 @@ async def lifespan(app: FastAPI):
     # Initialize the database connection
     logger.debug("Initializing database...")
     init_db()
+    if settings.notification_enabled:
+        from eagle_eye.core.alert.notifier import EmailNotificationProvider
+
+        # Deliver alerts still in the outbox from a previous run
+        EmailNotificationProvider().resume()
     # Include all defined API routes into the FastAPI application
     app.include_router(api_router)
     yield
+    from eagle_eye.database.vector import face_db
+
+    # Stop the face enrollment workers
+    face_db.close()
     # Close the database connection when the application shuts down
     logger.debug("Closing database...")
     close_db()
@@ -1,45 +1,36 @@
+import asyncio
+import json
 import logging
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 
-import cv2
-import numpy as np
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from eagle_eye.database.models import FaceMetadata
 from eagle_eye.database.vector import face_db
+from eagle_eye.database.vector.enrollment import ImageResult
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/faces", tags=["Face"])
 
 
-async def process_uploaded_image(file: UploadFile) -> np.ndarray:
+async def read_uploads(files: List[UploadFile]) -> AsyncIterator[Tuple[str, bytes]]:
     """
-    Process an uploaded image file and convert it to a numpy array.
+    Yield the (filename, contents) of uploaded images one at a time.
 
-    Args:
-        file: Uploaded image file from FastAPI
-
-    Returns:
-        Numpy array in BGR format (OpenCV format)
+    Images are decoded by the enrollment workers, so the first ones are
+    processed while the next ones are still being read.
     """
-    contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-    if img is None:
-        raise HTTPException(
-            status_code=400, detail=f"Invalid image file: {file.filename}"
-        )
-
-    return img
+    for file in files:
+        yield file.filename or "image", await file.read()
 
 
 @router.post("/", summary="Add face(s) to database")
 async def add_faces(
     name: str = Form(..., description="Name of the person"),
     images: List[UploadFile] = File(..., description="One or more face images"),
+    stream: bool = Query(False, description="Stream per-image progress as NDJSON"),
 ):
     """
     Add one or more face images for a person to the recognition database.
@@ -48,6 +39,7 @@ async def add_faces(
 
     - **name**: Name of the person (required)
     - **images**: One or more image files containing the person's face (required)
+    - **stream**: Report each image as it is processed, one JSON object per line
     """
     if not name or not name.strip():
         raise HTTPException(status_code=400, detail="Name is required")
@@ -55,40 +47,71 @@ async def add_faces(
     if not images:
         raise HTTPException(status_code=400, detail="At least one image is required")
 
+    logger.info(f"Processing {len(images)} image(s) for {name}")
+    if stream:
+        return StreamingResponse(
+            _enroll_events(name, images), media_type="application/x-ndjson"
+        )
+
     try:
-        # Process all uploaded images
-        image_arrays = []
-        for file in images:
-            img_array = await process_uploaded_image(file)
-            image_arrays.append(img_array)
+        result = await face_db.enroll(name, read_uploads(images), total=len(images))
+    except Exception as e:
+        logger.error(f"Error adding faces for {name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-        logger.info(f"Processing {len(image_arrays)} image(s) for {name}")
+    if not result.added:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Failed to add faces. Please ensure images contain clear, visible faces.",
+                "images": [image.to_dict() for image in result.images],
+            },
+        )
 
-        # Add faces to database
-        success = await face_db.add_face_batch(image_arrays, name)
+    return JSONResponse(
+        status_code=201,
+        content={
+            "status": "success",
+            "message": f"Successfully added {result.added} face(s) for {name}",
+            "name": name,
+            "total_faces": face_db.get_face_count(name),
+            "images": [image.to_dict() for image in result.images],
+        },
+    )
 
-        if success:
-            face_count = face_db.get_face_count(name)
-            return JSONResponse(
-                status_code=201,
-                content={
-                    "status": "success",
-                    "message": f"Successfully added {len(image_arrays)} face(s) for {name}",
-                    "name": name,
-                    "total_faces": face_count,
-                },
-            )
+
+async def _enroll_events(name: str, images: List[UploadFile]) -> AsyncIterator[str]:
+    """NDJSON progress events of an enrollment, then a summary line."""
+    events: asyncio.Queue = asyncio.Queue()
+
+    def report(image: ImageResult, done: int, total: Optional[int]) -> None:
+        events.put_nowait({**image.to_dict(), "done": done, "total": total})
+
+    task = asyncio.create_task(
+        face_db.enroll(
+            name, read_uploads(images), total=len(images), on_progress=report
+        )
+    )
+    while not task.done() or not events.empty():
+        getter = asyncio.ensure_future(events.get())
+        await asyncio.wait([getter, task], return_when=asyncio.FIRST_COMPLETED)
+        if getter.done():
+            yield json.dumps(getter.result()) + "\n"
         else:
-            raise HTTPException(
-                status_code=400,
-                detail="Failed to add faces. Please ensure images contain clear, visible faces.",
-            )
+            getter.cancel()
 
-    except HTTPException:
-        raise
+    try:
+        result = task.result()
+        summary = {
+            "status": "success" if result.added else "failed",
+            "name": name,
+            "added": result.added,
+            "total_faces": face_db.get_face_count(name),
+        }
     except Exception as e:
         logger.error(f"Error adding faces for {name}: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        summary = {"status": "error", "name": name, "error": str(e)}
+    yield json.dumps(summary) + "\n"
 
 
 @router.delete("/{name}", summary="Remove face from database")
@@ -5,8 +5,9 @@ from typing import List
 
 import aiofiles
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse
 
-from eagle_eye.config.folder_manager import MEDIA_DIR
+from eagle_eye.config.folder_manager import CLIPS_DIR, MEDIA_DIR
 from eagle_eye.database.models import Stream
 from eagle_eye.database.sql import MediaStore
 
@@ -59,6 +60,25 @@ def get_media_by_uid(uid: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Get an alert clip too large to be attached to its notification
+@router.get("/clips/{filename}")
+def get_clip(filename: str):
+    """
+    Get a stored alert clip.
+
+    Args:
+        filename (str): Name of the clip file.
+
+    Returns:
+        FileResponse: The MP4 clip.
+    """
+    path = CLIPS_DIR / filename
+    # Only plain file names inside the clips directory
+    if path.name != filename or not path.is_file():
+        raise HTTPException(status_code=404, detail="Clip not found")
+    return FileResponse(path, media_type="video/mp4", filename=filename)
+
+
 @router.post("/upload", response_model=Stream)
 async def upload_media(
     file: UploadFile = File(...),
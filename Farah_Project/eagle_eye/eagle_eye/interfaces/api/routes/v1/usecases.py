@@ -2,16 +2,20 @@ import asyncio
 import logging
 from typing import List
 
-import cv2
 import numpy as np
 from fastapi import APIRouter
 from fastrtc import register_webrtc
 from fastrtc.models import Request
 
 from eagle_eye.config.settings import settings
+from eagle_eye.core.alert.buffer.registry import video_buffers
+from eagle_eye.core.alert.delivery import delivery_queue
+from eagle_eye.core.alert.dispatch import AlertQueue
+from eagle_eye.core.capture import FrameGrabber
+from eagle_eye.core.inference import inference_pool, model_registry
 from eagle_eye.database.sql import MediaStore
 from eagle_eye.usecases import USE_CASES, USE_CASES_LITERAL, get_use_case_color
-from eagle_eye.usecases.pipe import build_pipeline
+from eagle_eye.usecases.pipe import build_pipeline, release_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -24,35 +28,49 @@ def get_usecases():
     return list(USE_CASES.keys())
 
 
-def open_video(url: str):
-    cap = cv2.VideoCapture(url)
-    if not cap.isOpened():
-        logger.error(f"Failed to open video source: {url}")
-    return cap
+@usecase_router.get("/captures")
+def get_captures():
+    """Running video captures with their delivered and dropped frame counts."""
+    return FrameGrabber.all_stats()
 
 
-async def video_frame_generator(url: str):
-    url, loop = MediaStore.handle_url(url)
-    cap = open_video(url)
+@usecase_router.get("/inference")
+def get_inference_pool():
+    """Occupancy of the shared inference pool used by the stream handlers."""
+    return inference_pool.stats
+
 
-    while True:
-        if not cap or not cap.isOpened():
-            await asyncio.sleep(0.3)
-            cap = open_video(url)
-            continue
+@usecase_router.get("/models")
+def get_loaded_models():
+    """Shared models with their reference count and resident memory."""
+    return model_registry.stats()
 
-        ret, frame = cap.read()
-        if ret:
-            yield frame
-            continue
 
-        if loop:
-            logger.info("Loop enabled → restarting video")
-            cap.release()
-            cap = open_video(url)
-            await asyncio.sleep(0.05)
-        else:
-            break
+@usecase_router.get("/recordings")
+def get_recordings():
+    """Frames and memory held by the per-stream clip recorder."""
+    return video_buffers.stats()
+
+
+@usecase_router.get("/alerts")
+def get_alert_queues():
+    """Alert queue depth, drops and latency per use case, and delivery status."""
+    return {"queues": AlertQueue.all_stats(), "delivery": delivery_queue.stats}
+
+
+async def video_frame_generator(url: str):
+    url, loop = MediaStore.handle_url(url)
+    # Capture runs on its own thread; only the freshest frames reach inference
+    grabber = FrameGrabber(url, loop=loop, max_queue=settings.CAPTURE_QUEUE_SIZE)
+    grabber.start()
+
+    try:
+        while not grabber.finished:
+            frame = await asyncio.to_thread(grabber.read, 0.5)
+            if frame is not None:
+                yield frame
+    finally:
+        grabber.stop()
 
 
 def stream_processor(use_cases: List[str]):
@@ -60,7 +78,9 @@ def stream_processor(use_cases: List[str]):
 
     async def handler(request: Request, url: str):
         async for frame in video_frame_generator(url):
-            annotated, result = pipeline(frame, stream_id=request.webrtc_id)
+            annotated, result = await pipeline.ainvoke(
+                frame, stream_id=request.webrtc_id
+            )
             yield annotated, result.model_dump()
 
     return handler
@@ -70,7 +90,7 @@ def live_processor(use_cases: List[str]):
     pipeline = build_pipeline(tuple(use_cases))
 
     async def handler(request: Request, frame: np.ndarray):
-        annotated, result = pipeline(frame, stream_id=request.webrtc_id)
+        annotated, result = await pipeline.ainvoke(frame, stream_id=request.webrtc_id)
         yield annotated, result.model_dump()
 
     return handler
@@ -127,13 +147,25 @@ def register_static_usecases():
 def register_dynamic_usecases():
     default_cases = ["face-detection", "guns-detection", "fight-detection"]
 
-    def dynamic_handler(req: Request, url: str, use_cases: List[USE_CASES_LITERAL]):
-        return stream_processor(use_cases)(req, url)
+    # Each call takes a reference to the cached pipeline, handed back once
+    # the call is over, so the cache never closes a pipeline in use
+    async def dynamic_handler(
+        req: Request, url: str, use_cases: List[USE_CASES_LITERAL]
+    ):
+        try:
+            async for output in stream_processor(use_cases)(req, url):
+                yield output
+        finally:
+            release_pipeline(tuple(use_cases))
 
-    def dynamic_live_handler(
+    async def dynamic_live_handler(
         req: Request, frame: np.ndarray, use_cases: List[USE_CASES_LITERAL]
     ):
-        return live_processor(use_cases)(req, frame)
+        try:
+            async for output in live_processor(use_cases)(req, frame):
+                yield output
+        finally:
+            release_pipeline(tuple(use_cases))
 
     register_usecase(
         prefix="/dynamic",
@@ -1,20 +1,35 @@
 import logging
+import math
+import threading
+import time
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, get_args
 
-import cv2
 import numpy as np
 from pydantic import BaseModel, Field
 
 from eagle_eye.config.settings import settings
+from eagle_eye.core.alert.dispatch import AlertQueue, OverflowPolicy
+from eagle_eye.core.inference import inference_pool
 
 if TYPE_CHECKING:
     from eagle_eye.core.alert.manager import AlertManager
 
 logger = logging.getLogger(__name__)
 
+#: Stream handled by the current invoke(), readable from inside _predict()
+current_stream_id: ContextVar[str] = ContextVar("current_stream_id", default="default")
+
+#: Upper bound for the stride chosen by adaptive rate control
+MAX_ADAPTIVE_STRIDE = 30
+
+#: Per-stream rate state is dropped after this many idle seconds
+RATE_STATE_TTL_SEC = 60.0
+
+_alert_queue_lock = threading.Lock()
+
 
 class UResult(BaseModel):
     """
@@ -50,6 +65,20 @@ class UResult(BaseModel):
         return self
 
 
+@dataclass
+class _RateState:
+    """Per-stream inference rate bookkeeping for a UseCase."""
+
+    stride: int
+    frame_index: int = 0
+    last_inferred_index: int = 0
+    last_inferred_at: float = 0.0
+    last_seen_at: float = 0.0
+    latency_ms: float = 0.0
+    prediction: Any = None
+    has_prediction: bool = False
+
+
 @dataclass
 class UseCase(ABC):
     """
@@ -65,16 +94,33 @@ class UseCase(ABC):
     confidence_threshold: float = 0.6
     alert_manager: Optional["AlertManager"] = None
 
-    #: Shared executor for alert processing (fire-and-forget)
-    _alert_executor: ThreadPoolExecutor = field(
-        default=ThreadPoolExecutor(
-            max_workers=1,
-            thread_name_prefix="alert-worker",
-        ),
+    #: Run inference on every Nth frame of a stream (1 = every frame)
+    inference_stride: int = 1
+    #: Maximum inferences per second per stream (None = no limit)
+    target_fps: Optional[float] = None
+    #: Raise the stride automatically while inference exceeds the frame budget
+    adaptive_rate: bool = False
+    #: Frame budget in milliseconds used by adaptive rate control
+    frame_budget_ms: float = 1000.0 / 30
+
+    _rate_state: Dict[str, _RateState] = field(
+        default_factory=dict,
         init=False,
         repr=False,
     )
 
+    #: Alerts waiting for processing; beyond it `alert_overflow` applies
+    alert_queue_size: int = settings.ALERT_QUEUE_SIZE
+    #: "drop_oldest", "drop_newest" or "coalesce" (latest alert per stream)
+    alert_overflow: OverflowPolicy = settings.ALERT_OVERFLOW_POLICY
+
+    _alert_queue: Optional[AlertQueue] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # The alert queue is built by the first alert: fail now, not mid-stream
+        if self.alert_overflow not in get_args(OverflowPolicy):
+            raise ValueError(f"Unknown alert overflow policy: {self.alert_overflow}")
+
     @abstractmethod
     def _predict(self, input_data: Any) -> Any:
         """
@@ -116,6 +162,77 @@ class UseCase(ABC):
         """
         return prediction
 
+    def _infer(self, input_data: Any) -> Any:
+        """
+        Run _predict() on due frames and reuse the last prediction otherwise.
+
+        A frame is due when `inference_stride` frames have passed since the
+        last inference of the same stream and, if `target_fps` is set, enough
+        time has elapsed. With `adaptive_rate` the stride grows while the
+        measured latency exceeds `frame_budget_ms` and shrinks back after.
+
+        Args:
+            input_data: Input frame.
+
+        Returns:
+            Raw prediction output (possibly from an earlier frame).
+        """
+        now = time.monotonic()
+        state = self._get_rate_state(current_stream_id.get(), now)
+        state.frame_index += 1
+        state.last_seen_at = now
+
+        if state.has_prediction:
+            frames_since = state.frame_index - state.last_inferred_index
+            too_soon = self.target_fps and (
+                now - state.last_inferred_at < 1.0 / self.target_fps
+            )
+            if frames_since < state.stride or too_soon:
+                return state.prediction
+
+        start = time.perf_counter()
+        prediction = self._predict(input_data)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        state.prediction = prediction
+        state.has_prediction = True
+        state.last_inferred_index = state.frame_index
+        state.last_inferred_at = now
+
+        if self.adaptive_rate:
+            # Exponential moving average smooths out single slow frames
+            state.latency_ms = (
+                elapsed_ms
+                if not state.latency_ms
+                else 0.8 * state.latency_ms + 0.2 * elapsed_ms
+            )
+            needed = math.ceil(state.latency_ms / self.frame_budget_ms)
+            state.stride = min(MAX_ADAPTIVE_STRIDE, max(self.inference_stride, needed))
+
+        return prediction
+
+    def _get_rate_state(self, stream_id: str, now: float) -> _RateState:
+        state = self._rate_state.get(stream_id)
+        if state is None:
+            # Forget streams that have gone away before tracking a new one
+            for key, old in list(self._rate_state.items()):
+                if now - old.last_seen_at > RATE_STATE_TTL_SEC:
+                    self._rate_state.pop(key, None)
+            state = self._rate_state[stream_id] = _RateState(
+                stride=max(1, self.inference_stride)
+            )
+        return state
+
+    @property
+    def batched(self) -> bool:
+        """True if predictions go through a batch scheduler shared by streams."""
+        return getattr(self, "scheduler", None) is not None
+
+    def current_stride(self, stream_id: str = "default") -> int:
+        """Stride currently applied to a stream (changes in adaptive mode)."""
+        state = self._rate_state.get(stream_id)
+        return state.stride if state else max(1, self.inference_stride)
+
     def _run(
         self, input_data: Any, stream_id: str
     ) -> Tuple[np.ndarray, Optional[UResult]]:
@@ -124,13 +241,18 @@ class UseCase(ABC):
 
         Args:
             input_data: Input frame.
+            stream_id: Unique identifier for the video stream.
 
         Returns:
             Tuple of:
                 - Annotated frame
                 - Transformed result (UResult or None)
         """
-        prediction: Any = self._predict(input_data)
+        token = current_stream_id.set(stream_id)
+        try:
+            prediction: Any = self._infer(input_data)
+        finally:
+            current_stream_id.reset(token)
         annotated_frame: np.ndarray = self._draw(input_data, prediction)
 
         transformed = self._transform_prediction(prediction)
@@ -140,6 +262,30 @@ class UseCase(ABC):
 
         return annotated_frame, None
 
+    @property
+    def alert_queue(self) -> AlertQueue:
+        """Bounded queue feeding this use case's alerts to the alert manager."""
+        if self._alert_queue is None:
+            with _alert_queue_lock:
+                if self._alert_queue is None:
+                    self._alert_queue = AlertQueue(
+                        self._dispatch_alert,
+                        max_size=self.alert_queue_size,
+                        overflow=self.alert_overflow,
+                        name=f"alert-{self.name}",
+                    )
+        return self._alert_queue
+
+    def close(self) -> None:
+        """
+        Release resources held by the use case (models, workers).
+
+        Override in subclasses that acquire shared resources, calling
+        super().close().
+        """
+        if self._alert_queue is not None:
+            self._alert_queue.close()
+
     def _dispatch_alert(
         self,
         stream_id: str,
@@ -147,7 +293,10 @@ class UseCase(ABC):
         result: UResult,
     ) -> None:
         """
-        Dispatch alert processing in a background thread.
+        Process an alert on the alert queue's background thread.
+
+        The raw frame is handed to the alert manager as-is; it is only
+        encoded when a clip is actually built.
 
         Args:
             stream_id: Unique video stream identifier.
@@ -155,15 +304,9 @@ class UseCase(ABC):
             result: Use case result.
         """
         try:
-            success, buffer = cv2.imencode(".jpg", frame)
-            if not success:
-                logger.warning("Failed to encode frame for alert")
-                return
-
-            frame_bytes: bytes = buffer.tobytes()
             metadata: Dict[str, Any] = result.model_dump()
 
-            self.alert_manager.process(stream_id, frame_bytes, metadata)
+            self.alert_manager.process(stream_id, frame, metadata)
 
         except Exception:
             logger.exception(
@@ -189,18 +332,37 @@ class UseCase(ABC):
         """
         annotated_frame, result = self._run(input_data, stream_id=stream_id)
 
-        if settings.notification_enabled:
-            if self.alert_manager and result:
-                # Fire-and-forget alert processing
-                self._alert_executor.submit(
-                    self._dispatch_alert,
-                    stream_id,
-                    input_data,
-                    result,
-                )
+        if settings.notification_enabled and self.alert_manager:
+            # Every frame goes to the clip recorder (rate-limited to its fps)
+            self.alert_manager.record(stream_id, input_data)
+
+            if result:
+                # Fire-and-forget; a full queue drops per `alert_overflow`
+                self.alert_queue.put(stream_id, input_data, result)
 
         return annotated_frame, result
 
+    async def ainvoke(
+        self,
+        input_data: Any,
+        stream_id: str = "default",
+    ) -> Tuple[np.ndarray, Optional[UResult]]:
+        """
+        Async version of invoke() for use inside event-loop handlers.
+
+        The call runs on the shared, bounded inference pool so one slow model
+        never stalls other sessions served by the same loop. When the pool is
+        saturated the caller awaits a free slot (backpressure).
+
+        Args:
+            input_data: Input frame.
+            stream_id: Unique identifier for the video stream.
+
+        Returns:
+            Annotated frame and result.
+        """
+        return await inference_pool.run(self.invoke, input_data, stream_id=stream_id)
+
     def __call__(
         self,
         input_data: Any,
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark of face embedding: per-face `DeepFace.represent` calls
+against batched forward passes of `FaceEmbedder`.
+
+Usage:
+    python -m eagle_eye.usecases.face_recognition.benchmark --faces 1 4 16 32
+
+Runs on whatever device TensorFlow picks; hide GPUs with
+CUDA_VISIBLE_DEVICES="" to measure CPU throughput.
+"""
+
+import argparse
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+from deepface import DeepFace
+
+from .embedder import FaceEmbedder
+
+
+def _random_faces(count: int, size: int = 160, seed: int = 0) -> List[np.ndarray]:
+    """RGB float [0, 1] crops, like `DeepFace.extract_faces` returns."""
+    rng = np.random.default_rng(seed)
+    return [rng.random((size, size, 3), dtype=np.float32) for _ in range(count)]
+
+
+def _per_face(faces: Sequence[np.ndarray], model_name: str) -> None:
+    for face in faces:
+        face_bgr = (face[:, :, ::-1] * 255).astype(np.uint8)
+        DeepFace.represent(
+            img_path=face_bgr, model_name=model_name, enforce_detection=False
+        )
+
+
+def run_benchmark(
+    face_counts: Sequence[int], model_name: str = "VGG-Face", repeat: int = 3
+) -> List[Dict[str, float]]:
+    """
+    Time both embedding paths for each number of faces per frame.
+
+    Returns:
+        One row per face count with the faces per second of each path.
+    """
+    embedder = FaceEmbedder(model_name)
+    # Load the models outside of the timings
+    warmup = _random_faces(1)
+    embedder.embed(warmup)
+    _per_face(warmup, model_name)
+
+    rows = []
+    for count in face_counts:
+        faces = _random_faces(count)
+        timings = {}
+        for path, run in (
+            ("per_face", lambda: _per_face(faces, model_name)),
+            ("batched", lambda: embedder.embed(faces)),
+        ):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                run()
+            timings[path] = (time.perf_counter() - started) / repeat
+
+        rows.append(
+            {
+                "faces": count,
+                "per_face_fps": count / timings["per_face"],
+                "batched_fps": count / timings["batched"],
+                "speedup": timings["per_face"] / timings["batched"],
+            }
+        )
+    embedder.release()
+    return rows
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--model", default="VGG-Face")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'faces':>6} {'per-face/s':>11} {'batched/s':>10} {'speedup':>8}")
+    for row in run_benchmark(args.faces, args.model, args.repeat):
+        print(
+            f"{row['faces']:>6} {row['per_face_fps']:>11.1f} "
+            f"{row['batched_fps']:>10.1f} {row['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import functools
+import logging
+from typing import Any, Callable, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+from deepface import DeepFace
+
+from eagle_eye.core.inference import BatchScheduler, model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class FaceEmbedder:
+    """
+    Computes face embeddings in batches, with one forward pass per batch.
+
+    `DeepFace.represent` detects and preprocesses the face again for every
+    crop. Crops from `DeepFace.extract_faces` are faces already, so here they
+    are only resized the way DeepFace does it, stacked and fed to the
+    recognition model at once. The model is built once and shared through
+    the model registry.
+    """
+
+    def __init__(self, model_name: str = "VGG-Face", max_batch_size: int = 32):
+        """
+        Args:
+            model_name: DeepFace recognition model.
+            max_batch_size: Faces per forward pass at most.
+        """
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self._model = model_registry.acquire(
+            f"deepface:{model_name}",
+            loader=lambda: DeepFace.build_model(
+                model_name=model_name, task="facial_recognition"
+            ),
+        )
+
+    @property
+    def model(self) -> Any:
+        """Shared DeepFace model client, built on first use."""
+        return self._model.get()
+
+    @property
+    def input_size(self) -> Tuple[int, int]:
+        """(height, width) of the model input."""
+        return _input_size(self.model)
+
+    def preprocess(self, face: np.ndarray) -> np.ndarray:
+        """
+        Prepare one face crop like `DeepFace.represent` does.
+
+        Args:
+            face: RGB float [0, 1] crop, as returned by `extract_faces`.
+
+        Returns:
+            BGR float32 [0, 1] image of the model input size, letterboxed.
+        """
+        return preprocess_face(face, self.input_size)
+
+    def embed(self, faces: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Compute the embeddings of `faces`.
+
+        Args:
+            faces: RGB float [0, 1] crops of any size.
+
+        Returns:
+            float32 matrix with one embedding per face.
+        """
+        return embed_faces(self.model, faces, self.max_batch_size)
+
+    def scheduler(
+        self,
+        predict_batch: Callable[[Callable, List[Any]], List[Any]],
+        **options: Any,
+    ) -> BatchScheduler:
+        """
+        Batch scheduler shared by every use case embedding with this model.
+
+        Args:
+            predict_batch: Maps (embed, items) to one result per item, where
+                `embed(faces)` embeds with the shared model.
+            options: Keyword arguments of `BatchScheduler`.
+        """
+        max_batch_size = self.max_batch_size
+        return self._model.scheduler(
+            lambda model, items: predict_batch(
+                functools.partial(embed_faces, model, max_batch_size=max_batch_size),
+                items,
+            ),
+            **options,
+        )
+
+    def release(self) -> None:
+        self._model.release()
+
+
+def _input_size(model: Any) -> Tuple[int, int]:
+    # DeepFace stores it as (width, height)
+    width, height = model.input_shape
+    return height, width
+
+
+def preprocess_face(face: np.ndarray, input_size: Tuple[int, int]) -> np.ndarray:
+    """Letterbox an RGB face crop into a BGR image of `input_size` (height, width)."""
+    height, width = input_size
+    image = face[:, :, ::-1].astype(np.float32)  # RGB to BGR
+    if image.max() > 1:
+        image /= 255.0
+
+    factor = min(height / image.shape[0], width / image.shape[1])
+    size = (
+        max(1, int(image.shape[1] * factor)),
+        max(1, int(image.shape[0] * factor)),
+    )
+    image = cv2.resize(image, size)
+
+    pad_h = height - image.shape[0]
+    pad_w = width - image.shape[1]
+    image = np.pad(
+        image,
+        (
+            (pad_h // 2, pad_h - pad_h // 2),
+            (pad_w // 2, pad_w - pad_w // 2),
+            (0, 0),
+        ),
+        "constant",
+    )
+    if image.shape[:2] != (height, width):
+        image = cv2.resize(image, (width, height))
+    return image
+
+
+def embed_faces(
+    model: Any, faces: Sequence[np.ndarray], max_batch_size: int = 32
+) -> np.ndarray:
+    """Embeddings of face crops, `max_batch_size` faces per forward pass."""
+    if not len(faces):
+        return np.empty((0, 0), dtype="float32")
+
+    input_size = _input_size(model)
+    embeddings = []
+    for start in range(0, len(faces), max_batch_size):
+        chunk = faces[start : start + max_batch_size]
+        batch = np.stack([preprocess_face(face, input_size) for face in chunk])
+        output = np.asarray(model.forward(batch), dtype="float32")
+        embeddings.append(output.reshape(len(chunk), -1))
+    return np.concatenate(embeddings)
@@ -0,0 +1,164 @@
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+
+
+def box_iou(a: Box, b: Box) -> float:
+    """Intersection over union of two (x, y, w, h) boxes."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    inter_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _center_distance(a: Box, b: Box) -> float:
+    """Distance between box centers, relative to the size of `a`."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    dx = (ax + aw / 2) - (bx + bw / 2)
+    dy = (ay + ah / 2) - (by + bh / 2)
+    return (dx * dx + dy * dy) ** 0.5 / max(aw, ah, 1)
+
+
+@dataclass
+class FaceTrack:
+    """A face followed across frames, with the identity last recognized for it."""
+
+    track_id: int
+    box: Box
+    last_seen: float
+    name: str = "Unknown"
+    similarity: float = 0.0
+    recognized_at: Optional[float] = None
+    recognized_box: Optional[Box] = None
+
+    def remember(self, name: str, similarity: float, now: float) -> None:
+        """Cache the identity recognized for the current box."""
+        self.name = name
+        self.similarity = similarity
+        self.recognized_at = now
+        self.recognized_box = self.box
+
+
+class FaceTracker:
+    """
+    IoU/centroid tracker for the faces of one stream.
+
+    Detections are matched to the tracks of the previous frames by box
+    overlap, or by center distance for fast motion. A track keeps the
+    identity recognized for it, so the face is only embedded again when
+    the track is new, its box changed a lot since the last recognition,
+    or the cached identity is older than `identity_ttl_sec`.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_center_shift: float = 0.5,
+        reembed_iou: float = 0.5,
+        identity_ttl_sec: float = 5.0,
+        track_ttl_sec: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            iou_threshold: Least overlap for a detection to continue a track.
+            max_center_shift: Otherwise, largest center move (in face sizes).
+            reembed_iou: Re-embed once the box overlaps the recognized one less.
+            identity_ttl_sec: Age after which the cached identity is refreshed.
+            track_ttl_sec: Tracks unseen for longer are dropped.
+        """
+        self.iou_threshold = iou_threshold
+        self.max_center_shift = max_center_shift
+        self.reembed_iou = reembed_iou
+        self.identity_ttl_sec = identity_ttl_sec
+        self.track_ttl_sec = track_ttl_sec
+
+        self._tracks: Dict[int, FaceTrack] = {}
+        self._ids = itertools.count(1)
+        self.last_update: Optional[float] = None
+
+        self.hits = 0  # faces served from the identity cache
+        self.misses = 0  # faces that needed an embedding
+
+    def update(self, boxes: Sequence[Box], now: float) -> List[Tuple[FaceTrack, bool]]:
+        """
+        Match the detections of a frame to tracks.
+
+        Args:
+            boxes: Face boxes detected in the frame.
+            now: Frame time (monotonic seconds).
+
+        Returns:
+            Per box, its track and whether the face must be recognized again.
+        """
+        self.last_update = now
+        # Forget faces that left the scene
+        self._tracks = {
+            track_id: track
+            for track_id, track in self._tracks.items()
+            if now - track.last_seen <= self.track_ttl_sec
+        }
+
+        matched = self._match(boxes)
+        results = []
+        for index, box in enumerate(boxes):
+            track = matched.get(index)
+            if track is None:
+                track = FaceTrack(track_id=next(self._ids), box=box, last_seen=now)
+                self._tracks[track.track_id] = track
+            else:
+                track.box = box
+                track.last_seen = now
+
+            stale = self._needs_recognition(track, now)
+            if stale:
+                self.misses += 1
+            else:
+                self.hits += 1
+            results.append((track, stale))
+        return results
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def idle(self, now: float) -> bool:
+        """True once the stream sent no frame for longer than a track lives."""
+        return (
+            self.last_update is not None and now - self.last_update > self.track_ttl_sec
+        )
+
+    def _match(self, boxes: Sequence[Box]) -> Dict[int, FaceTrack]:
+        """Greedy matching, best overlap first, then nearest center."""
+        tracks = list(self._tracks.values())
+        pairs = []
+        for index, box in enumerate(boxes):
+            for track in tracks:
+                iou = box_iou(box, track.box)
+                if iou >= self.iou_threshold:
+                    pairs.append((0, -iou, index, track))
+                else:
+                    shift = _center_distance(track.box, box)
+                    if shift <= self.max_center_shift:
+                        pairs.append((1, shift, index, track))
+        pairs.sort(key=lambda pair: pair[:2])
+
+        matched: Dict[int, FaceTrack] = {}
+        used = set()
+        for _, _, index, track in pairs:
+            if index in matched or track.track_id in used:
+                continue
+            matched[index] = track
+            used.add(track.track_id)
+        return matched
+
+    def _needs_recognition(self, track: FaceTrack, now: float) -> bool:
+        if track.recognized_at is None:
+            return True
+        if now - track.recognized_at > self.identity_ttl_sec:
+            return True
+        return box_iou(track.box, track.recognized_box) < self.reembed_iou
@@ -1,18 +1,24 @@
 import logging
+import time
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
 from deepface import DeepFace
 
-from eagle_eye.core.alert.buffer.registry import VideoBufferRegistry
+from eagle_eye.config.settings import settings
+from eagle_eye.core.alert.buffer.registry import video_buffers
 from eagle_eye.core.alert.manager import AlertManager
 from eagle_eye.core.alert.notifier.providers.email import EmailNotificationProvider
 from eagle_eye.core.alert.rules import ConfidenceRule, DetectionMatchRule
 from eagle_eye.core.alert.severity import AlertSeverity
+from eagle_eye.core.inference import BatchScheduler
 from eagle_eye.database.vector import face_db
-from eagle_eye.usecases.base import UResult, UseCase
+from eagle_eye.usecases.base import UResult, UseCase, current_stream_id
+
+from .embedder import FaceEmbedder
+from .tracker import FaceTracker
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +27,34 @@ logger = logging.getLogger(__name__)
 class FaceRecognition(UseCase):
     """Face recognition use case using DeepFace and FAISS."""
 
-    def __init__(self):
-        super().__init__(name="face-recognition")
+    def __init__(
+        self,
+        target_fps: Optional[float] = 5.0,
+        adaptive_rate: bool = True,
+        batching: Optional[bool] = None,
+        tracking: Optional[bool] = None,
+    ):
+        # Identities change slowly, a few recognitions per second are enough
+        super().__init__(
+            name="face-recognition",
+            target_fps=target_fps,
+            adaptive_rate=adaptive_rate,
+        )
+        # Faces are embedded in one forward pass per batch, not one per face
+        self.embedder = FaceEmbedder(face_db.model_name)
+        # Per-stream trackers; identified faces are not embedded every frame
+        self.tracking = settings.FACE_TRACKING if tracking is None else tracking
+        self._trackers: Dict[str, FaceTracker] = {}
+        self.scheduler: Optional[BatchScheduler] = None
+        if settings.BATCH_INFERENCE if batching is None else batching:
+            # Faces found in frames of all streams (detected on the caller's
+            # thread) are embedded in one pass and searched in one FAISS query
+            self.scheduler = self.embedder.scheduler(
+                _match_faces,
+                max_batch_size=settings.BATCH_MAX_SIZE,
+                max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+                name="batch-face-recognition",
+            )
         self._setup_alert_manager()
 
     def _setup_alert_manager(self):
@@ -39,13 +71,96 @@ class FaceRecognition(UseCase):
             name=self.name,
             rules=[r1, r2],
             notifier=EmailNotificationProvider(),
-            buffers=VideoBufferRegistry(seconds=20, fps=10),
+            buffers=video_buffers,
             clip_seconds=15,
             cooldown_sec=15,
             severity=AlertSeverity.CRITICAL,
         )
 
     def _predict(self, input_data: Any) -> Any:
+        return self._predict_batch([input_data], [current_stream_id.get()])[0]
+
+    def _predict_batch(
+        self, frames: List[Any], stream_ids: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        """
+        Recognize the faces of a batch of frames.
+
+        Faces are detected per frame, then all of them are embedded in
+        one forward pass and matched against the gallery with a single search.
+        With batching, that pass also takes the faces of other streams.
+        With tracking, faces whose track already has a fresh identity skip
+        the embedding and search.
+
+        Args:
+            frames: Frames, possibly from different streams.
+            stream_ids: Stream of each frame (tracks are kept per stream).
+
+        Returns:
+            The list of recognized faces of each frame, in the same order.
+        """
+        results = [self._detect_faces(frame) for frame in frames]
+        stream_ids = stream_ids or ["default"] * len(frames)
+
+        faces = []
+        tracks = []
+        now = time.monotonic()
+        for frame_faces, stream_id in zip(results, stream_ids):
+            if not self.tracking:
+                faces.extend(frame_faces)
+                tracks.extend([None] * len(frame_faces))
+                continue
+
+            tracker = self._trackers.get(stream_id)
+            if tracker is None:
+                self._prune_trackers(now)
+                tracker = self._trackers.setdefault(
+                    stream_id,
+                    FaceTracker(
+                        reembed_iou=settings.FACE_TRACK_REEMBED_IOU,
+                        identity_ttl_sec=settings.FACE_TRACK_IDENTITY_TTL_SEC,
+                    ),
+                )
+            boxes = [_box(face_obj) for face_obj in frame_faces]
+            for face_obj, (track, stale) in zip(
+                frame_faces, tracker.update(boxes, now)
+            ):
+                face_obj["track_id"] = track.track_id
+                if stale:
+                    faces.append(face_obj)
+                    tracks.append(track)
+                else:
+                    face_obj["name"] = track.name
+                    face_obj["similarity"] = track.similarity
+
+        # Embeddings of all remaining faces of all frames, computed and searched at once
+        if faces:
+            item = ([face_obj["face"] for face_obj in faces], self.confidence_threshold)
+            try:
+                if self.scheduler is not None:
+                    matches = self.scheduler.predict(stream_ids[0], item)
+                else:
+                    matches = _match_faces(self.embedder.embed, [item])[0]
+            except Exception as e:
+                logger.warning(f"Recognition failed for {len(faces)} face(s): {e}")
+                # Nothing cached: the faces are tried again on the next frame
+                return results
+
+            for face_obj, track, face_matches in zip(faces, tracks, matches):
+                if face_matches:
+                    face_obj["name"], face_obj["similarity"] = face_matches[0]
+                if track is not None:
+                    track.remember(face_obj["name"], face_obj["similarity"], now)
+
+        return results
+
+    def _prune_trackers(self, now: float) -> None:
+        """Drop the trackers of streams that stopped; their tracks all expired."""
+        for stream_id, tracker in list(self._trackers.items()):
+            if tracker.idle(now):
+                self._trackers.pop(stream_id, None)
+
+    def _detect_faces(self, input_data: Any) -> List[dict]:
         try:
             # Detect faces
             # extract_faces returns a list of dicts with 'face', 'facial_area', 'confidence'
@@ -55,57 +170,26 @@ class FaceRecognition(UseCase):
                 enforce_detection=False,
                 align=False,
             )
-
-            # Flitter the faces with confidence >= threshold
-            faces = [
-                face
-                for face in faces
-                if face["confidence"] >= self.confidence_threshold
-            ]
-
-            results = []
-            for face_obj in faces:
-                name = "Unknown"
-                similarity = face_obj["confidence"]
-
-                try:
-                    # Prepare face image for representation
-                    face_img = face_obj["face"]
-                    # extract_faces returns RGB float [0,1]. Convert to BGR uint8 [0,255]
-                    face_uint8 = (face_img * 255).astype(np.uint8)
-                    face_bgr = cv2.cvtColor(face_uint8, cv2.COLOR_RGB2BGR)
-
-                    # Get embedding for the cropped face
-                    emb_objs = DeepFace.represent(
-                        img_path=face_bgr,
-                        model_name=face_db.model_name,
-                        enforce_detection=False,
-                    )
-
-                    if emb_objs:
-                        embedding = emb_objs[0]["embedding"]
-                        vector = np.array([embedding], dtype="float32")
-
-                        # Search in DB
-                        result = face_db.search(
-                            vector, threshold=self.confidence_threshold
-                        )
-                        if result:
-                            name, similarity = result
-
-                except Exception as e:
-                    logger.warning(f"Recognition failed for a face: {e}")
-
-                face_obj["name"] = name
-                face_obj["similarity"] = similarity
-
-                results.append(face_obj)
-
-            return results
         except Exception as e:
             logger.error(f"Face recognition error: {e}")
             return []
 
+        # Flitter the faces with confidence >= threshold
+        faces = [
+            face for face in faces if face["confidence"] >= self.confidence_threshold
+        ]
+        for face_obj in faces:
+            face_obj["name"] = "Unknown"
+            face_obj["similarity"] = face_obj["confidence"]
+        return faces
+
+    def close(self) -> None:
+        # The shared scheduler is closed with the last reference to the model
+        self.scheduler = None
+        self.embedder.release()
+        self._trackers.clear()
+        super().close()
+
     def _draw(self, input_data: Any, prediction: Any) -> Any:
         frame = input_data.copy()
         for face_obj in prediction:
@@ -154,3 +238,38 @@ class FaceRecognition(UseCase):
             "detection_count": len(prediction),
         }
         return UResult(**data)
+
+
+def _box(face_obj: dict) -> Tuple[int, int, int, int]:
+    area = face_obj["facial_area"]
+    return area["x"], area["y"], area["w"], area["h"]
+
+
+def _match_faces(
+    embed: Callable[[Sequence[np.ndarray]], np.ndarray],
+    items: List[Tuple[List[np.ndarray], float]],
+) -> List[List[List[Tuple[str, float]]]]:
+    """
+    Match the faces of (face crops, threshold) items against the gallery.
+
+    The faces of all items are embedded and searched at once.
+
+    Returns:
+        Per item, the matches of each of its faces.
+    """
+    faces = [face for crops, _ in items for face in crops]
+    matches = face_db.search_batch(
+        embed(faces), k=1, threshold=min(threshold for _, threshold in items)
+    )
+
+    results = []
+    start = 0
+    for crops, threshold in items:
+        results.append(
+            [
+                [match for match in face_matches if match[1] > threshold]
+                for face_matches in matches[start : start + len(crops)]
+            ]
+        )
+        start += len(crops)
+    return results
@@ -1,15 +1,17 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, List, Optional, Tuple
 
+import cv2
 from fight_detection import fight_pipeline
 from fight_detection.backends import BaseFightBackend
 from fight_detection.backends.torch import TorchFightBackend
 
-from eagle_eye.core.alert.buffer.registry import VideoBufferRegistry
+from eagle_eye.core.alert.buffer.registry import video_buffers
 from eagle_eye.core.alert.manager import AlertManager
 from eagle_eye.core.alert.notifier.providers.email import EmailNotificationProvider
 from eagle_eye.core.alert.rules import ConfidenceRule, DetectionMatchRule
 from eagle_eye.core.alert.severity import AlertSeverity
+from eagle_eye.core.inference import model_registry
 from eagle_eye.core.weight_utils import get_weight_path
 from eagle_eye.usecases.base import UResult, UseCase
 
@@ -20,16 +22,34 @@ class FightDetection(UseCase):
     Fight detection use case using the fight_detection package.
     """
 
-    def __init__(self):
-        super().__init__(name="fight-detection")
-        # Initialize the backend once
-        self.backend: BaseFightBackend = TorchFightBackend(
-            yolo_model_path=get_weight_path("yolo", "yolo11n-pose.pt"),
-            action_model_path=get_weight_path("torch", "action.pth"),
-            confidence_threshold=self.confidence_threshold,
+    def __init__(self, target_fps: Optional[float] = 10.0, adaptive_rate: bool = True):
+        super().__init__(
+            name="fight-detection",
+            target_fps=target_fps,
+            adaptive_rate=adaptive_rate,
+        )
+        yolo_model_path = get_weight_path("yolo", "yolo11n-pose.pt")
+        action_model_path = get_weight_path("torch", "action.pth")
+        # The backend is shared by every FightDetection with the same weights
+        self._backend = model_registry.acquire(
+            f"{yolo_model_path}|{action_model_path}|{self.confidence_threshold}",
+            loader=lambda: TorchFightBackend(
+                yolo_model_path=yolo_model_path,
+                action_model_path=action_model_path,
+                confidence_threshold=self.confidence_threshold,
+            ),
         )
         self._setup_alert_manager()
 
+    @property
+    def backend(self) -> BaseFightBackend:
+        """Shared fight backend, loaded on first use."""
+        return self._backend.get()
+
+    def close(self) -> None:
+        self._backend.release()
+        super().close()
+
     def _setup_alert_manager(self):
         r1 = ConfidenceRule(
             min_confidence=self.confidence_threshold,
@@ -43,7 +63,7 @@ class FightDetection(UseCase):
             name=self.name,
             rules=[r1, r2],
             notifier=EmailNotificationProvider(),
-            buffers=VideoBufferRegistry(seconds=20, fps=10),
+            buffers=video_buffers,
             clip_seconds=15,
             cooldown_sec=15,
             severity=AlertSeverity.CRITICAL,
@@ -63,10 +83,22 @@ class FightDetection(UseCase):
             return None
 
     def _draw(self, input_data: Any, prediction: Any) -> Any:
-        try:
-            return prediction.plot()
-        except Exception:
-            return input_data
+        # Drawn on the current frame: a reused prediction may come from an
+        # earlier one, and earlier use cases may have drawn on this one
+        frame = input_data.copy()
+        if prediction is None:
+            return frame
+        detections, _ = _detections(prediction)
+        for detection in detections:
+            x1, y1, x2, y2 = (int(val) for val in detection.box)
+            color = (0, 0, 255) if detection.label == "fight" else (0, 255, 0)
+            text = f"{detection.label}: {detection.conf:.2f}"
+
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(
+                frame, text, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2
+            )
+        return frame
 
     def _transform_prediction(self, prediction: Any) -> Any:
         """
@@ -80,14 +112,7 @@ class FightDetection(UseCase):
         """
         if prediction is None:
             return None
-        data: list = []
-        data_type: str = "interactions"
-
-        if len(prediction.interactions) == 0 and hasattr(prediction, "actions"):
-            data = prediction.actions
-            data_type = "actions"
-        else:
-            data = prediction.interactions
+        data, data_type = _detections(prediction)
 
         data = {
             "detections": [
@@ -102,3 +127,10 @@ class FightDetection(UseCase):
             "data_type": data_type,
         }
         return UResult(**data)
+
+
+def _detections(prediction: Any) -> Tuple[List[Any], str]:
+    """Interactions of a prediction, or its actions when there are none."""
+    if len(prediction.interactions) == 0 and hasattr(prediction, "actions"):
+        return prediction.actions, "actions"
+    return prediction.interactions, "interactions"
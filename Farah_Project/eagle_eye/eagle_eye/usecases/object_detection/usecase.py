@@ -1,16 +1,18 @@
 import logging
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ultralytics import YOLO
 
-from eagle_eye.core.alert.buffer.registry import VideoBufferRegistry
+from eagle_eye.config.settings import settings
+from eagle_eye.core.alert.buffer.registry import video_buffers
 from eagle_eye.core.alert.manager import AlertManager
 from eagle_eye.core.alert.notifier.providers.email import EmailNotificationProvider
 from eagle_eye.core.alert.rules import ConfidenceRule
 from eagle_eye.core.alert.severity import AlertSeverity
+from eagle_eye.core.inference import BatchScheduler, model_registry
 from eagle_eye.core.weight_utils import get_weight_path
-from eagle_eye.usecases.base import UResult, UseCase
+from eagle_eye.usecases.base import UResult, UseCase, current_stream_id
 
 logger = logging.getLogger(__name__)
 
@@ -19,19 +21,37 @@ logger = logging.getLogger(__name__)
 class ObjectDetection(UseCase):
     """Object detection use case using YOLO and Ultralytics colors."""
 
-    model: Optional[YOLO] = None
-
     def __init__(
-        self, model_name: str, severity: Optional[AlertSeverity] = AlertSeverity.MEDIUM
+        self,
+        model_name: str,
+        severity: Optional[AlertSeverity] = AlertSeverity.MEDIUM,
+        batching: Optional[bool] = None,
+        adaptive_rate: bool = True,
     ):
-        super().__init__(name="object-detection")
+        super().__init__(name="object-detection", adaptive_rate=adaptive_rate)
         self.model_name = model_name
         self.severity = severity
+        # YOLO weights are shared with every other use case using the same file
+        model_path = get_weight_path("yolo", self.model_name)
+        self._model = model_registry.acquire(
+            model_path, loader=lambda: YOLO(model_path)
+        )
+        self.scheduler: Optional[BatchScheduler] = None
+        if settings.BATCH_INFERENCE if batching is None else batching:
+            # Frames from all streams and pipelines using these weights are
+            # stacked into one YOLO call
+            self.scheduler = self._model.scheduler(
+                _predict_frames,
+                max_batch_size=settings.BATCH_MAX_SIZE,
+                max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+                name=f"batch-{self.model_name}",
+            )
         self._setup_alert_manager()
 
-    def __load_model(self):
-        model_path = get_weight_path("yolo", self.model_name)
-        self.model = YOLO(model_path)
+    @property
+    def model(self) -> YOLO:
+        """Shared YOLO model, loaded on first use."""
+        return self._model.get()
 
     def _setup_alert_manager(self):
         r1 = ConfidenceRule(
@@ -42,19 +62,37 @@ class ObjectDetection(UseCase):
             name=f"{self.name}_{self.model_name.replace('.pt', '')}",
             rules=[r1],
             notifier=EmailNotificationProvider(),
-            buffers=VideoBufferRegistry(seconds=20, fps=10),
+            buffers=video_buffers,
             clip_seconds=15,
             cooldown_sec=15,
         )
 
     def _predict(self, input_data: Any) -> Any:
-        if self.model is None:
-            self.__load_model()
-        # YOLO prediction
-        results = self.model.predict(
-            input_data, verbose=False, conf=self.confidence_threshold
+        if self.scheduler is not None:
+            return self.scheduler.predict(
+                current_stream_id.get(), (input_data, self.confidence_threshold)
+            )
+        return self._predict_batch([input_data])[0]
+
+    def _predict_batch(self, frames: List[Any]) -> List[Any]:
+        """
+        Run one YOLO prediction over a batch of frames.
+
+        Args:
+            frames: Frames, possibly from different streams.
+
+        Returns:
+            One result per frame, in the same order.
+        """
+        return _predict_frames(
+            self.model, [(frame, self.confidence_threshold) for frame in frames]
         )
-        return results[0]
+
+    def close(self) -> None:
+        # The shared scheduler is closed with the last reference to the model
+        self.scheduler = None
+        self._model.release()
+        super().close()
 
     def _draw(self, input_data: Any, prediction: Any) -> Any:
         # Plot results on the frame
@@ -82,3 +120,23 @@ class ObjectDetection(UseCase):
             "detection_count": len(prediction.boxes),
         }
         return UResult(**data)
+
+
+def _predict_frames(model: YOLO, items: List[Tuple[Any, float]]) -> List[Any]:
+    """
+    YOLO predictions of (frame, confidence threshold) items.
+
+    Frames sharing a threshold run in one call, in the order of `items`.
+    """
+    groups: Dict[float, List[int]] = {}
+    for index, (_, conf) in enumerate(items):
+        groups.setdefault(conf, []).append(index)
+
+    results: List[Any] = [None] * len(items)
+    for conf, indices in groups.items():
+        predictions = model.predict(
+            [items[index][0] for index in indices], verbose=False, conf=conf
+        )
+        for index, prediction in zip(indices, predictions):
+            results[index] = prediction
+    return results
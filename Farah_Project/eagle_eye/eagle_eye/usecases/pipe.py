@@ -1,28 +1,61 @@
+import contextvars
 import logging
-from functools import lru_cache
-from typing import Any, List, Tuple
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
+from eagle_eye.config.settings import settings
 from eagle_eye.core.alert.manager import AlertManagerGroup
 from eagle_eye.usecases import USE_CASES
 from eagle_eye.usecases.base import UResult, UseCase
 
 logger = logging.getLogger(__name__)
 
+#: Pipelines kept by `build_pipeline`; the least recently used one is closed
+PIPELINE_CACHE_SIZE = 32
+
 
 class Pipeline(UseCase):
     """
     Pipeline UseCase that runs multiple UseCases.
+
+    In parallel mode every use case is pinned to one single-threaded worker,
+    so a model is always called from the same thread while different models
+    run concurrently on the same frame. Batched use cases run on the calling
+    thread instead: a pinned worker would hand their scheduler the frames of
+    one stream at a time, so there would be nothing to batch.
     """
 
     def __init__(
         self,
         use_cases: List[UseCase],
         name: str = "pipeline",
+        parallel: Optional[bool] = None,
+        max_workers: Optional[int] = None,
     ) -> None:
+        """
+        Args:
+            use_cases: Use cases to run on every frame.
+            name: Name of the pipeline.
+            parallel: Run predictions concurrently (default: settings.PIPELINE_PARALLEL).
+            max_workers: Number of pinned workers. Use cases are assigned
+                round-robin when there are fewer workers than use cases
+                (default: settings.PIPELINE_WORKERS, or one per use case).
+        """
         super().__init__(name=name)
         self.use_cases = use_cases
+        self.parallel = settings.PIPELINE_PARALLEL if parallel is None else parallel
+        self.max_workers = max_workers or settings.PIPELINE_WORKERS or len(use_cases)
+        #: Wall-clock seconds of the last frame, per use case and in total
+        self.stage_timings: Dict[str, float] = {}
+        self._workers: List[ThreadPoolExecutor] = []
+        #: Pinned worker of each unbatched use case, by position
+        self._pinned: Dict[int, ThreadPoolExecutor] = {}
+        self._setup_workers()
         self._setup_alert_manager()
 
     def _setup_alert_manager(self):
@@ -30,20 +63,78 @@ class Pipeline(UseCase):
             managers=[uc.alert_manager for uc in self.use_cases if uc.alert_manager]
         )
 
-    def _predict(self, input_data: np.ndarray) -> List[Tuple[UseCase, Any]]:
+    def _setup_workers(self):
+        # Nothing to overlap with a single use case
+        if not self.parallel or len(self.use_cases) < 2:
+            return
+
+        pinned = [index for index, uc in enumerate(self.use_cases) if not uc.batched]
+        if not pinned:
+            return
+        worker_count = max(1, min(self.max_workers, len(pinned)))
+        self._workers = [
+            ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"{self.name}-worker-{index}",
+            )
+            for index in range(worker_count)
+        ]
+        self._pinned = {
+            index: self._workers[position % worker_count]
+            for position, index in enumerate(pinned)
+        }
+
+    @staticmethod
+    def _timed_predict(use_case: UseCase, input_data: Any) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        prediction = use_case._infer(input_data)
+        return prediction, time.perf_counter() - start
+
+    def _predict(self, input_data: np.ndarray) -> List[Any]:
         """
         Run predictions for all use cases.
 
         Returns:
-            List of (UseCase, raw_prediction)
+            List of raw predictions, in the same order as `use_cases`.
         """
+        start = time.perf_counter()
+
+        if self._pinned:
+            # Each worker runs in a copy of the caller's context (stream ID)
+            futures = {
+                index: worker.submit(
+                    contextvars.copy_context().run,
+                    self._timed_predict,
+                    self.use_cases[index],
+                    input_data,
+                )
+                for index, worker in self._pinned.items()
+            }
+            # Batched use cases meanwhile, on this thread
+            inline = {
+                index: self._timed_predict(uc, input_data)
+                for index, uc in enumerate(self.use_cases)
+                if index not in futures
+            }
+            outputs = [
+                futures[index].result() if index in futures else inline[index]
+                for index in range(len(self.use_cases))
+            ]
+        else:
+            outputs = [self._timed_predict(uc, input_data) for uc in self.use_cases]
+
+        timings = {
+            uc.name: elapsed for uc, (_, elapsed) in zip(self.use_cases, outputs)
+        }
+        timings["total"] = time.perf_counter() - start
+        self.stage_timings = timings
 
-        return [uc._predict(input_data) for uc in self.use_cases]
+        return [prediction for prediction, _ in outputs]
 
     def _draw(
         self,
         input_data: np.ndarray,
-        predictions: List[Tuple[UseCase, Any]],
+        predictions: List[Any],
     ) -> np.ndarray:
         """
         Draw predictions sequentially and aggregate UResult.
@@ -81,13 +172,34 @@ class Pipeline(UseCase):
 
         return result
 
+    def close(self) -> None:
+        """Shut down the pinned workers and close every use case."""
+        for worker in self._workers:
+            worker.shutdown(wait=False)
+        self._workers = []
+        self._pinned = {}
+
+        for use_case in self.use_cases:
+            use_case.close()
+        super().close()
+
+
+_pipelines: "OrderedDict[Tuple[str, ...], Pipeline]" = OrderedDict()
+#: Holders of each cached pipeline (handlers and running sessions)
+_pipeline_users: Dict[Tuple[str, ...], int] = {}
+_pipelines_lock = threading.Lock()
+
 
-@lru_cache(maxsize=32)
 def build_pipeline(
     use_case_names: Tuple[str, ...],
 ) -> Pipeline:
     """
-    Build (and cache) a Pipeline instance.
+    Build (and cache) a Pipeline instance, taking a reference to it.
+
+    Callers that stop using the pipeline hand it back with
+    `release_pipeline`. Past `PIPELINE_CACHE_SIZE` entries, the least
+    recently used pipelines nobody holds are closed, which stops their
+    workers and releases their models; pipelines in use are never closed.
 
     Args:
         use_case_names: Tuple of use case names (hashable).
@@ -95,6 +207,47 @@ def build_pipeline(
     Returns:
         Cached Pipeline instance.
     """
+    with _pipelines_lock:
+        pipeline = _pipelines.get(use_case_names)
+        if pipeline is None:
+            pipeline = _pipelines[use_case_names] = _create_pipeline(use_case_names)
+        _pipelines.move_to_end(use_case_names)
+        _pipeline_users[use_case_names] = _pipeline_users.get(use_case_names, 0) + 1
+        evicted = _evict_unused()
+
+    _close_evicted(evicted)
+    return pipeline
+
+
+def release_pipeline(use_case_names: Tuple[str, ...]) -> None:
+    """Drop a reference taken by `build_pipeline`."""
+    with _pipelines_lock:
+        users = _pipeline_users.get(use_case_names, 0)
+        _pipeline_users[use_case_names] = max(0, users - 1)
+        evicted = _evict_unused()
+
+    _close_evicted(evicted)
+
+
+def _evict_unused() -> List[Pipeline]:
+    """Remove the oldest unused pipelines beyond the cache size (lock held)."""
+    evicted = []
+    for key in list(_pipelines):
+        if len(_pipelines) <= PIPELINE_CACHE_SIZE:
+            break
+        if not _pipeline_users.get(key):
+            evicted.append(_pipelines.pop(key))
+            _pipeline_users.pop(key, None)
+    return evicted
+
+
+def _close_evicted(pipelines: List[Pipeline]) -> None:
+    for pipeline in pipelines:
+        logger.info(f"Closing evicted pipeline {pipeline.name}")
+        pipeline.close()
+
+
+def _create_pipeline(use_case_names: Tuple[str, ...]) -> Pipeline:
     use_cases: List[UseCase] = []
 
     for name in use_case_names:
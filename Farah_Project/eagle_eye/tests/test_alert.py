@@ -1,14 +1,34 @@
-import asyncio
+import io
+import os
+import socket
 import time
+from email import message_from_bytes
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
+import av
+import numpy as np
 import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
 
 from eagle_eye.core.alert.buffer.registry import VideoBufferRegistry
+from eagle_eye.core.alert.buffer.ring_buffer import VideoRingBuffer
+from eagle_eye.core.alert.delivery import DeliveryQueue
 from eagle_eye.core.alert.event import AlertEvent
-from eagle_eye.core.alert.manager import AlertManager
-from eagle_eye.core.alert.notifier import LocalFileProvider, NotificationProvider
+from eagle_eye.core.alert.manager import AlertManager, AlertManagerGroup, prune_clips
+from eagle_eye.core.alert.notifier import (
+    EmailNotificationProvider,
+    LocalFileProvider,
+    NotificationProvider,
+)
+from eagle_eye.core.alert.notifier.providers.email.outbox import (
+    EmailOutboxSender,
+    encode_event,
+)
 from eagle_eye.core.alert.rules import (
     AlertRule,
     ConfidenceRule,
@@ -16,6 +36,9 @@ from eagle_eye.core.alert.rules import (
 )
 from eagle_eye.core.alert.severity import AlertSeverity
 from eagle_eye.core.alert.snapshot import AlertSnapshot
+from eagle_eye.core.alert.video.encoder import SegmentedVideoEncoder, VideoEncoder
+from eagle_eye.core.alert.video.profile import ClipProfile
+from eagle_eye.database.sql.outbox_store import OutboxStore
 
 
 # Mock Rules for Testing
@@ -80,7 +103,7 @@ async def test_alert_manager_all_rules_must_pass(buffer_registry, mock_notifier)
     )
 
     manager.process("stream1", b"frame", {})
-    await asyncio.sleep(0.01)
+    assert manager.flush(timeout=5)
 
     assert len(mock_notifier.sent_events) == 0, "Should not alert when one rule fails"
 
@@ -99,7 +122,7 @@ async def test_alert_manager_all_true_fires_alert(buffer_registry, mock_notifier
     )
 
     manager.process("stream1", b"frame", {})
-    await asyncio.sleep(0.01)
+    assert manager.flush(timeout=5)
 
     assert len(mock_notifier.sent_events) == 1, "Should alert when all rules pass"
     event, video = mock_notifier.sent_events[0]
@@ -119,12 +142,12 @@ async def test_alert_manager_cooldown(buffer_registry, mock_notifier):
 
     # First alert should fire
     manager.process("stream1", b"frame1", {})
-    await asyncio.sleep(0.01)
+    assert manager.flush(timeout=5)
     assert len(mock_notifier.sent_events) == 1
 
     # Second alert should be blocked by cooldown
     manager.process("stream1", b"frame2", {})
-    await asyncio.sleep(0.01)
+    assert manager.flush(timeout=5)
     assert len(mock_notifier.sent_events) == 1, "Cooldown should prevent second alert"
 
     # Wait for cooldown to expire
@@ -132,10 +155,256 @@ async def test_alert_manager_cooldown(buffer_registry, mock_notifier):
 
     # Third alert should fire
     manager.process("stream1", b"frame3", {})
-    await asyncio.sleep(0.01)
+    assert manager.flush(timeout=5)
     assert len(mock_notifier.sent_events) == 2, "Alert should fire after cooldown"
 
 
+class FlakyNotifier(MockNotifier):
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+        self.attempts = 0
+
+    def send(self, event: AlertEvent, video: bytes) -> None:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("SMTP unavailable")
+        super().send(event, video)
+
+
+class SlowNotifier(MockNotifier):
+    def send(self, event: AlertEvent, video: bytes) -> None:
+        time.sleep(0.3)
+        super().send(event, video)
+
+
+def test_alert_manager_does_not_block_on_slow_notifier(buffer_registry):
+    notifier = SlowNotifier()
+    manager = AlertManager(
+        rules=[AlwaysTrueRule()],
+        notifier=notifier,
+        buffers=buffer_registry,
+        cooldown_sec=0,
+        delivery=DeliveryQueue(),
+    )
+
+    start = time.perf_counter()
+    for index in range(5):
+        manager.process(f"stream{index}", b"frame", {})
+    assert time.perf_counter() - start < 0.2
+
+    assert manager.flush(timeout=5)
+    assert len(notifier.sent_events) == 5
+
+
+def test_delivery_queue_retries_failed_sends(buffer_registry):
+    notifier = FlakyNotifier(failures=2)
+    delivery = DeliveryQueue(max_attempts=3, backoff_sec=0.01)
+    manager = AlertManager(
+        rules=[AlwaysTrueRule()],
+        notifier=notifier,
+        buffers=buffer_registry,
+        delivery=delivery,
+    )
+
+    manager.process("stream1", b"frame", {})
+
+    assert manager.flush(timeout=5)
+    assert notifier.attempts == 3
+    assert len(notifier.sent_events) == 1
+    assert delivery.stats["retried"] == 2
+    assert delivery.stats["sent"] == 1
+
+
+def test_delivery_queue_gives_up_after_max_attempts(buffer_registry):
+    notifier = FlakyNotifier(failures=10)
+    delivery = DeliveryQueue(max_attempts=2, backoff_sec=0.01)
+    manager = AlertManager(
+        rules=[AlwaysTrueRule()],
+        notifier=notifier,
+        buffers=buffer_registry,
+        delivery=delivery,
+    )
+
+    manager.process("stream1", b"frame", {})
+
+    assert manager.flush(timeout=5)
+    assert notifier.attempts == 2
+    assert delivery.stats["failed"] == 1
+
+
+def test_alert_manager_cooldown_is_per_stream(buffer_registry, mock_notifier):
+    manager = AlertManager(
+        rules=[AlwaysTrueRule()],
+        notifier=mock_notifier,
+        buffers=buffer_registry,
+        cooldown_sec=60,
+    )
+
+    manager.process("stream1", b"frame", {})
+    manager.process("stream1", b"frame", {})
+    manager.process("stream2", b"frame", {})
+
+    assert manager.flush(timeout=5)
+    assert sorted(event.stream_id for event, _ in mock_notifier.sent_events) == [
+        "stream1",
+        "stream2",
+    ]
+
+
+# ============================================================================
+# Email Outbox Tests
+# ============================================================================
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(message_from_bytes(envelope.content))
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+@pytest.fixture
+def outbox_db():
+    test_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(test_engine)
+    with patch("eagle_eye.database.engine.engine", test_engine):
+        yield test_engine
+    test_engine.dispose()
+
+
+def _email_provider(controller) -> EmailNotificationProvider:
+    return EmailNotificationProvider(
+        smtp_server=controller.hostname,
+        smtp_port=controller.port,
+        username="eagle@example.com",
+        password="secret",
+        to_emails=["ops@example.com"],
+        use_ssl=False,
+    )
+
+
+def _email_event(stream_id: str, timestamp: float) -> AlertEvent:
+    return AlertEvent(
+        name="fight",
+        stream_id=stream_id,
+        severity=AlertSeverity.CRITICAL,
+        triggered_rules=["Confidence"],
+        metadata={"object_count": 1},
+        timestamp=timestamp,
+    )
+
+
+def test_email_outbox_sends_alerts_in_one_digest(smtp_server, outbox_db):
+    controller, handler = smtp_server
+    provider = _email_provider(controller)
+    sender = EmailOutboxSender(provider, digest_window_sec=60, digest_max_alerts=5)
+
+    for index in range(3):
+        OutboxStore.enqueue(
+            channel=provider.channel,
+            recipients=provider.to_emails,
+            event=encode_event(_email_event(f"cam{index}", 1000.0 + index)),
+            video=b"clip",
+            thumbnail=b"jpeg",
+        )
+
+    # Window still open: wait for more alerts
+    assert sender.send_due(now=time.time()) == 0
+    assert sender.send_due(now=time.time() + 61) == 3
+    provider.close()
+
+    (message,) = handler.messages
+    assert message["Subject"] == "Security Alerts: 3 events"
+    attachments = [part.get_filename() for part in message.walk()]
+    assert attachments.count("alert_1000.0.mp4") == 1
+    assert "alert_1002.0.mp4" in attachments
+    assert OutboxStore.counts(provider.channel) == {"sent": 3}
+
+
+def test_email_outbox_retries_with_backoff(smtp_server, outbox_db):
+    controller, handler = smtp_server
+    provider = _email_provider(controller)
+    sender = EmailOutboxSender(
+        provider, digest_window_sec=0, max_attempts=3, backoff_sec=10
+    )
+    OutboxStore.enqueue(
+        channel=provider.channel,
+        recipients=provider.to_emails,
+        event=encode_event(_email_event("cam1", 1000.0)),
+        video=b"clip",
+    )
+
+    now = time.time()
+    with patch.object(provider, "_connection", side_effect=ConnectionRefusedError):
+        assert sender.send_due(now=now) == 0
+    # Not due again before the backoff expires
+    assert OutboxStore.due(provider.channel, now + 5, limit=5) == []
+
+    assert sender.send_due(now=now + 10) == 1
+    provider.close()
+    assert len(handler.messages) == 1
+
+
+def test_email_outbox_purges_old_terminal_entries(smtp_server, outbox_db):
+    controller, _ = smtp_server
+    provider = _email_provider(controller)
+    sender = EmailOutboxSender(provider, retention_sec=100, max_attempts=1)
+
+    ids = [
+        OutboxStore.enqueue(
+            channel=provider.channel,
+            recipients=provider.to_emails,
+            event=encode_event(_email_event(f"cam{index}", 1000.0)),
+            video=b"clip",
+        )
+        for index in range(3)
+    ]
+    now = time.time()
+    OutboxStore.mark_sent(ids[:1], now)
+    OutboxStore.mark_failed(ids[1:2], "boom", now, max_attempts=1, backoff_sec=1)
+
+    # Nothing old enough yet
+    assert sender.purge(now=now + 50) == 0
+    # Only once per purge interval
+    assert sender.purge(now=now + 200) == 0
+
+    sender._purged_at = 0.0
+    assert sender.purge(now=now + 200) == 2
+    # Pending entries are kept however old they are
+    assert OutboxStore.counts(provider.channel) == {"pending": 1}
+
+
+def test_email_provider_send_goes_through_outbox(smtp_server, outbox_db):
+    controller, handler = smtp_server
+    provider = _email_provider(controller)
+
+    with patch.object(EmailNotificationProvider, "sender") as sender:
+        provider.send(_email_event("cam1", 1000.0), AlertSnapshot(b"clip"))
+
+    sender.wake.assert_called_once()
+    assert handler.messages == []
+    assert OutboxStore.counts(provider.channel) == {"pending": 1}
+
+
 # ============================================================================
 # Rule Tests
 # ============================================================================
@@ -203,6 +472,328 @@ async def test_local_file_provider_multiple_alerts(temp_dir):
     assert len(folders) == 3, "Should create three separate folders"
 
 
+# ============================================================================
+# VideoRingBuffer Tests
+# ============================================================================
+
+
+def _numbered_frame(value: int) -> np.ndarray:
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_ring_buffer_raw_keeps_last_frames_in_order():
+    buffer = VideoRingBuffer(seconds=1, fps=4)  # capacity 4
+
+    for value in range(1, 7):
+        buffer.push(_numbered_frame(value))
+
+    frames = buffer.get_last_seconds(1)
+    assert [int(frame[0, 0, 0]) for frame in frames] == [3, 4, 5, 6]
+    assert len(buffer) == 4
+
+
+def test_ring_buffer_raw_clip_is_not_overwritten():
+    buffer = VideoRingBuffer(seconds=1, fps=2)
+    buffer.push(_numbered_frame(1))
+    buffer.push(_numbered_frame(2))
+
+    frames = buffer.get_last_seconds(1)
+    buffer.push(_numbered_frame(3))
+
+    assert [int(frame[0, 0, 0]) for frame in frames] == [1, 2]
+
+
+def test_ring_buffer_raw_reallocates_on_resolution_change():
+    buffer = VideoRingBuffer(seconds=1, fps=4)
+    buffer.push(_numbered_frame(1))
+    buffer.push(np.zeros((8, 8, 3), dtype=np.uint8))
+
+    frames = buffer.get_last_seconds(1)
+    assert len(frames) == 1
+    assert frames[0].shape == (8, 8, 3)
+
+
+def test_ring_buffer_encoded_stores_jpeg():
+    buffer = VideoRingBuffer(seconds=1, fps=4, storage="encoded")
+    buffer.push(_numbered_frame(10))
+
+    (frame,) = buffer.get_last_seconds(1)
+    assert bytes(frame[:2]) == b"\xff\xd8"  # JPEG magic
+
+
+def test_ring_buffer_encoded_wraps_in_order():
+    buffer = VideoRingBuffer(seconds=1, fps=3, storage="encoded")
+
+    for value in range(5):
+        buffer.push(bytes([value]), timestamp=float(value))
+
+    frames, timestamps = buffer.get_last(10, with_timestamps=True)
+    assert [bytes(f) for f in frames] == [b"\x02", b"\x03", b"\x04"]
+    assert timestamps.tolist() == [2.0, 3.0, 4.0]
+
+
+def test_ring_buffer_get_range_selects_by_timestamp():
+    buffer = VideoRingBuffer(seconds=1, fps=8)
+
+    for value in range(8):
+        buffer.push(_numbered_frame(value), timestamp=100.0 + value * 0.5)
+
+    frames = buffer.get_range(101.0, 102.0)
+    assert [int(f[0, 0, 0]) for f in frames] == [2, 3, 4]
+    assert len(buffer.get_range(103.0)) == 2
+    assert len(buffer.get_range(200.0)) == 0
+
+
+def test_ring_buffer_record_limits_to_buffer_fps():
+    buffer = VideoRingBuffer(seconds=1, fps=10)
+
+    # 30 fps source over one second: only every third frame is kept
+    stored = [buffer.record(_numbered_frame(i), timestamp=i / 30) for i in range(30)]
+
+    assert sum(stored) == 10
+    assert len(buffer) == 10
+
+
+def test_ring_buffer_downscales_wide_frames():
+    buffer = VideoRingBuffer(seconds=1, fps=4, max_width=32)
+    buffer.push(np.zeros((60, 80, 3), dtype=np.uint8))
+
+    (frame,) = buffer.get_last_seconds(1)
+    assert frame.shape == (24, 32, 3)
+
+
+def test_ring_buffer_encoded_respects_memory_budget():
+    rng = np.random.default_rng(0)
+    buffer = VideoRingBuffer(seconds=10, fps=10, storage="encoded", max_bytes=20_000)
+
+    for _ in range(50):
+        buffer.push(rng.integers(0, 255, (64, 64, 3), dtype=np.uint8))
+
+    assert 0 < len(buffer) < 50
+    assert buffer.memory_bytes <= 20_000
+
+
+def test_ring_buffer_raw_respects_memory_budget():
+    frame_bytes = _numbered_frame(0).nbytes
+    buffer = VideoRingBuffer(seconds=10, fps=10, max_bytes=frame_bytes * 4)
+
+    for i in range(10):
+        buffer.push(_numbered_frame(i))
+
+    frames = buffer.get_last_seconds(10)
+    assert [int(f[0, 0, 0]) for f in frames] == [6, 7, 8, 9]
+
+
+def test_alert_manager_group_records_shared_buffers_once(mock_notifier):
+    buffers = VideoBufferRegistry(seconds=1, fps=5)
+    group = AlertManagerGroup(
+        AlertManager(rules=[], notifier=mock_notifier, buffers=buffers)
+        for _ in range(3)
+    )
+
+    group.record("stream1", _numbered_frame(1))
+    buffers.get("stream1")._next_record_at = 0.0  # let the next frame through
+    group.record("stream1", _numbered_frame(2))
+
+    assert len(buffers.get("stream1")) == 2
+
+
+def test_alert_manager_builds_clip_from_raw_frames(mock_notifier):
+    manager = AlertManager(
+        rules=[AlwaysTrueRule()],
+        notifier=mock_notifier,
+        buffers=VideoBufferRegistry(seconds=1, fps=5),
+        cooldown_sec=0,
+    )
+
+    manager.process("stream1", _numbered_frame(50), {})
+    assert manager.flush(timeout=5)
+
+    _, snapshot = mock_notifier.sent_events[0]
+    assert snapshot.thumbnail_bytes[:2] == b"\xff\xd8"
+    assert len(snapshot.video_bytes) > 0
+
+
+def _decoded_frame_count(video: bytes) -> int:
+    with av.open(io.BytesIO(video)) as container:
+        return sum(1 for _ in container.decode(video=0))
+
+
+def _video_frames(count: int) -> list:
+    return [
+        np.full((48, 64, 3), value * 5 % 256, dtype=np.uint8) for value in range(count)
+    ]
+
+
+def test_video_encoder_encodes_in_memory():
+    video = VideoEncoder.encode(_video_frames(12), fps=10)
+
+    assert _decoded_frame_count(video) == 12
+
+
+def test_video_encoder_writes_to_path_and_chunks(temp_dir):
+    frames = _video_frames(8)
+    path = Path(temp_dir) / "clip.mp4"
+
+    assert VideoEncoder.encode_to(frames, path, fps=10) == 8
+    assert _decoded_frame_count(path.read_bytes()) == 8
+    assert _decoded_frame_count(b"".join(VideoEncoder.iter_chunks(frames))) == 8
+
+
+def test_segmented_encoder_joins_finished_segments():
+    segments = SegmentedVideoEncoder(fps=10, segment_seconds=1.0, retain_seconds=3.0)
+
+    for index, frame in enumerate(_video_frames(50)):
+        segments.write(frame, timestamp=index / 10)
+
+    # Segments older than the retention window are gone
+    video = segments.clip(0.0)
+    assert 30 <= _decoded_frame_count(video) < 50
+    assert _decoded_frame_count(segments.clip(4.0, 4.9)) == 10
+
+
+def test_alert_manager_builds_clip_from_segments(mock_notifier):
+    manager = AlertManager(
+        rules=[AlwaysTrueRule()],
+        notifier=mock_notifier,
+        buffers=VideoBufferRegistry(seconds=2, fps=10, segment_seconds=0.5),
+        cooldown_sec=0,
+    )
+    buffer = manager.buffers.get("stream1")
+    now = time.time()
+    for index, frame in enumerate(_video_frames(10)):
+        buffer.push(frame, timestamp=now - 1 + index / 10)
+
+    manager.process("stream1", _video_frames(1)[0], {})
+    assert manager.flush(timeout=5)
+
+    _, snapshot = mock_notifier.sent_events[0]
+    assert _decoded_frame_count(snapshot.video_bytes) >= 10
+
+
+def test_clip_profile_fits_size_cap():
+    profile = ClipProfile(max_width=640, fps=10, bit_rate=500_000, max_bytes=500_000)
+
+    # 10 s at 10 fps: the bit rate alone is enough
+    fitted = profile.fit(frame_count=100, source_fps=10, width=1280)
+    assert fitted.bit_rate == 360_000
+    assert (fitted.max_width, fitted.fps) == (640, 10)
+
+    # 60 s: too few bits left, resolution and frame rate go down as well
+    fitted = profile.fit(frame_count=600, source_fps=10, width=1280)
+    assert fitted.bit_rate == 60_000
+    assert fitted.max_width < 640 and fitted.fps == 10
+
+    fitted = profile.fit(frame_count=1800, source_fps=10, width=1280)
+    assert fitted.fps == 5
+
+
+def test_video_encoder_applies_profile():
+    profile = ClipProfile(max_width=32, fps=5)
+    video = VideoEncoder.encode(_video_frames(20), fps=10, profile=profile)
+
+    with av.open(io.BytesIO(video)) as container:
+        frames = list(container.decode(video=0))
+    assert len(frames) == 10
+    assert frames[0].width == 32
+
+
+def test_alert_manager_stores_clip_over_size_cap(mock_notifier, temp_dir):
+    manager = AlertManager(
+        rules=[AlwaysTrueRule()],
+        notifier=mock_notifier,
+        buffers=VideoBufferRegistry(seconds=2, fps=10),
+        cooldown_sec=0,
+        clip_profile=ClipProfile(max_bytes=100),
+    )
+    buffer = manager.buffers.get("stream1")
+    now = time.time()
+    for index, frame in enumerate(_video_frames(10)):
+        buffer.push(frame, timestamp=now - 1 + index / 10)
+
+    with patch("eagle_eye.core.alert.manager.CLIPS_DIR", Path(temp_dir)):
+        manager.process("stream1", _video_frames(1)[0], {})
+        assert manager.flush(timeout=5)
+
+    event, snapshot = mock_notifier.sent_events[0]
+    assert snapshot.video_bytes == b""
+    assert _decoded_frame_count(Path(snapshot.video_path).read_bytes()) >= 5
+
+    # The email links to the stored clip instead of attaching it
+    provider = EmailNotificationProvider(outbox=False)
+    public = AlertSnapshot(
+        video_bytes=b"",
+        video_path=snapshot.video_path,
+        video_url="https://eagle.example.com/v1/media/clips/clip.mp4",
+    )
+    message = provider.build_message([(event, public)], ["to@example.com"])
+    filenames = [part.get_filename() for part in message.walk()]
+    assert not [name for name in filenames if name and name.endswith(".mp4")]
+    assert f'href="{public.video_url}"' in _html(message)
+
+    # Without a public URL the server-local path is never linked
+    html = _html(provider.build_message([(event, snapshot)], ["to@example.com"]))
+    assert snapshot.video_path not in html
+    assert "View Recording" not in html
+
+
+def _html(message) -> str:
+    return next(
+        part.get_payload(decode=True).decode()
+        for part in message.walk()
+        if part.get_content_type() == "text/html"
+    )
+
+
+def test_prune_clips_by_age_and_total_size(temp_dir):
+    directory = Path(temp_dir)
+    now = time.time()
+    paths = []
+    for index, age in enumerate((500, 300, 200, 100)):
+        path = directory / f"clip-{index}.mp4"
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (now - age, now - age))
+        paths.append(path)
+
+    # Too old first, then the oldest until 20 bytes remain
+    deleted = prune_clips(directory, max_age_sec=400, max_bytes=20, now=now)
+
+    assert deleted == paths[:2]
+    assert sorted(directory.iterdir()) == paths[2:]
+
+    # The clip just stored survives even over the size cap
+    assert prune_clips(directory, max_age_sec=0, max_bytes=5, keep=paths[2]) == [
+        paths[3]
+    ]
+
+
+@pytest.mark.parametrize("stream_id", ["../../escape", "a/b", "..\\x"])
+def test_alert_manager_stores_clip_inside_clips_dir(mock_notifier, temp_dir, stream_id):
+    clips_dir = Path(temp_dir) / "clips"
+    manager = AlertManager(
+        rules=[AlwaysTrueRule()],
+        notifier=mock_notifier,
+        buffers=VideoBufferRegistry(seconds=2, fps=10),
+        cooldown_sec=0,
+        clip_profile=ClipProfile(max_bytes=100),
+    )
+    buffer = manager.buffers.get(stream_id)
+    now = time.time()
+    for index, frame in enumerate(_video_frames(10)):
+        buffer.push(frame, timestamp=now - 1 + index / 10)
+
+    with patch("eagle_eye.core.alert.manager.CLIPS_DIR", clips_dir):
+        manager.process(stream_id, _video_frames(1)[0], {})
+        assert manager.flush(timeout=5)
+
+    _, snapshot = mock_notifier.sent_events[0]
+    assert Path(snapshot.video_path).parent == clips_dir
+    assert [path.name for path in clips_dir.iterdir()] == [
+        Path(snapshot.video_path).name
+    ]
+    assert not (Path(temp_dir).parent / "escape").exists()
+
+
 # ============================================================================
 # AlertEvent Tests
 # ============================================================================
@@ -1,7 +1,10 @@
+import threading
+import time
+
 import numpy as np
 import pytest
 
-from eagle_eye.usecases.base import UResult, UseCase
+from eagle_eye.usecases.base import UResult, UseCase, current_stream_id
 from eagle_eye.usecases.pipe import Pipeline
 
 
@@ -49,6 +52,141 @@ def test_pipeline_process_sequential_with_transform(mock_use_case_with_transform
     assert uresult.detections == ["det_with_transform"]
 
 
+class SlowThreadRecorder(UseCase):
+    """Sleeps in _predict and records the thread it ran on."""
+
+    def _predict(self, input_data):
+        time.sleep(0.1)
+        return threading.current_thread().name
+
+    def _draw(self, input_data, prediction):
+        return input_data
+
+    def _transform_prediction(self, prediction):
+        return UResult(object_count=1, detections=[prediction])
+
+
+def test_pipeline_parallel_runs_use_cases_concurrently():
+    use_cases = [SlowThreadRecorder(name=f"slow-{i}") for i in range(3)]
+    pipeline = Pipeline(use_cases, parallel=True)
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    try:
+        _, uresult = pipeline(frame)
+    finally:
+        pipeline.close()
+
+    assert uresult.object_count == 3
+    # Three 0.1 s predictions overlap instead of adding up
+    assert pipeline.stage_timings["total"] < 0.25
+    assert set(pipeline.stage_timings) == {"slow-0", "slow-1", "slow-2", "total"}
+
+
+def test_pipeline_parallel_pins_use_case_to_worker():
+    use_cases = [SlowThreadRecorder(name=f"slow-{i}") for i in range(2)]
+    pipeline = Pipeline(use_cases, parallel=True)
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    try:
+        _, first = pipeline(frame)
+        _, second = pipeline(frame)
+    finally:
+        pipeline.close()
+
+    assert first.detections == second.detections
+    assert first.detections[0] != first.detections[1]
+
+
+class BatchedRecorder(UseCase):
+    """Predicts through a batch scheduler shared by all streams."""
+
+    def __init__(self, scheduler, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    def _predict(self, input_data):
+        return self.scheduler.predict(current_stream_id.get(), input_data)
+
+    def _draw(self, input_data, prediction):
+        return input_data
+
+    def _transform_prediction(self, prediction):
+        return UResult(object_count=1, detections=[prediction])
+
+
+def test_pipeline_batches_across_streams_next_to_pinned_use_cases():
+    from eagle_eye.core.inference import BatchScheduler
+
+    scheduler = BatchScheduler(
+        lambda items: [len(items)] * len(items), max_batch_size=8, max_wait_ms=200
+    )
+    use_cases = [
+        BatchedRecorder(scheduler, name="batched"),
+        SlowThreadRecorder(name="pinned"),
+    ]
+    pipeline = Pipeline(use_cases, parallel=True)
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    def stream(stream_id):
+        for _ in range(3):
+            pipeline(frame, stream_id=stream_id)
+
+    threads = [threading.Thread(target=stream, args=(f"s{i}",)) for i in range(4)]
+    # Only the unbatched use case has a pinned worker
+    assert list(pipeline._pinned) == [1]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        pipeline.close()
+        scheduler.close()
+
+    assert scheduler.stats["avg_batch_size"] > 1
+
+
+def test_pipeline_serial_mode(mock_use_case_with_transform):
+    pipeline = Pipeline(
+        [mock_use_case_with_transform, MockUseCaseWithTransform(name="other")],
+        parallel=False,
+    )
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+    _, uresult = pipeline(frame)
+
+    assert pipeline._workers == []
+    assert uresult.object_count == 2
+    assert "total" in pipeline.stage_timings
+
+
+def test_build_pipeline_closes_evicted_pipelines_once_unused():
+    from unittest.mock import patch
+
+    from eagle_eye.usecases import pipe
+
+    use_cases = {"a": MockUseCaseNoTransform, "b": MockUseCaseNoTransform}
+    with (
+        patch.dict(pipe.USE_CASES, use_cases, clear=True),
+        patch.object(pipe, "_pipelines", pipe.OrderedDict()),
+        patch.object(pipe, "_pipeline_users", {}),
+        patch.object(pipe, "PIPELINE_CACHE_SIZE", 1),
+        patch.object(pipe.Pipeline, "close", autospec=True) as close,
+    ):
+        first = pipe.build_pipeline(("a",))
+        assert pipe.build_pipeline(("a",)) is first
+
+        # Over the cache size, but "a" is still used
+        second = pipe.build_pipeline(("b",))
+        close.assert_not_called()
+
+        pipe.release_pipeline(("a",))
+        close.assert_not_called()
+        pipe.release_pipeline(("a",))
+        close.assert_called_once_with(first)
+        assert list(pipe._pipelines.values()) == [second]
+
+
 def test_get_weight_path(tmp_path):
     from unittest.mock import patch
 
@@ -68,3 +206,63 @@ def test_get_weight_path(tmp_path):
         expected_path.touch()
         target_existing = get_weight_path("backend", "model.h5")
         assert target_existing == expected_path
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in yielding `count` numbered frames."""
+
+    def __init__(self, count, delay=0.0):
+        self.count = count
+        self.delay = delay
+        self.index = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.index >= self.count:
+            return False, None
+        time.sleep(self.delay)
+        self.index += 1
+        return True, np.full((2, 2, 3), self.index, dtype=np.uint8)
+
+    def get(self, prop):
+        return 0  # behave like a live source
+
+    def release(self):
+        pass
+
+
+def test_frame_grabber_delivers_all_frames_to_fast_consumer():
+    from eagle_eye.core.capture import FrameGrabber
+
+    grabber = FrameGrabber(
+        "fake", max_queue=2, open_video=lambda url: FakeCapture(5, delay=0.01)
+    ).start()
+
+    frames = []
+    while not grabber.finished:
+        frame = grabber.read(timeout=1)
+        if frame is not None:
+            frames.append(int(frame[0, 0, 0]))
+
+    assert frames == [1, 2, 3, 4, 5]
+    assert grabber.stats["delivered"] == 5
+    assert grabber.stats["dropped"] == 0
+
+
+def test_frame_grabber_drops_oldest_for_slow_consumer():
+    from eagle_eye.core.capture import FrameGrabber
+
+    grabber = FrameGrabber(
+        "fake", max_queue=1, open_video=lambda url: FakeCapture(20)
+    ).start()
+
+    # Let the capture thread run to the end before consuming
+    while not grabber._finished:
+        time.sleep(0.01)
+
+    assert int(grabber.read(timeout=1)[0, 0, 0]) == 20
+    assert grabber.read(timeout=0.05) is None
+    assert grabber.stats["dropped"] == 19
+    assert grabber.stats["delivered"] == 1
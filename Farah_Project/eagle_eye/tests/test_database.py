@@ -1,9 +1,35 @@
+import asyncio
 from unittest.mock import MagicMock, patch
 
+import cv2
+import faiss
+import numpy as np
 import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
 
+from eagle_eye.config.settings import settings
 from eagle_eye.database.models import Stream
 from eagle_eye.database.sql.media_store import MediaStore
+from eagle_eye.database.sql.metadata_store import MetadataStore
+from eagle_eye.database.vector.benchmark import (
+    run_benchmark,
+    run_gallery_benchmark,
+    synthetic_embeddings,
+)
+from eagle_eye.database.vector.enrollment import FaceEnroller, import_gallery
+from eagle_eye.database.vector.index import (
+    build_index,
+    choose_index_type,
+    code_size,
+    extract_vectors,
+    index_encoding,
+    index_type,
+    remove_ids,
+)
+from eagle_eye.database.vector.name_cache import PersonNameCache
+from eagle_eye.database.vector.prototypes import PrototypeIndex
 
 
 @pytest.fixture
@@ -82,3 +108,626 @@ def test_stream_model_defaults():
     assert stream.loop is False
     assert stream.created_at is not None
     assert stream.updated_at is None
+
+
+# ============================================================================
+# Face Gallery Index Tests
+# ============================================================================
+
+
+@pytest.fixture
+def face_db(tmp_path):
+    from eagle_eye.database.vector.vector_db import FaceDatabase
+
+    instance = FaceDatabase._instance
+    FaceDatabase._instance = None
+    try:
+        with patch("eagle_eye.database.vector.vector_db.VECTOR_DIR", tmp_path):
+            db = FaceDatabase()
+            db._metadata_db = MagicMock()
+            yield db
+    finally:
+        FaceDatabase._instance = instance
+
+
+def _embeddings(count: int, dimension: int = 32, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((count, dimension)).astype("float32")
+
+
+def test_choose_index_type_by_gallery_size():
+    thresholds = (10, 100, 1000)
+
+    assert choose_index_type(5, thresholds) == "flat"
+    assert choose_index_type(50, thresholds) == "hnsw"
+    assert choose_index_type(500, thresholds) == "ivf"
+    assert choose_index_type(5000, thresholds) == "ivfpq"
+
+
+@pytest.mark.parametrize("kind", ["flat", "hnsw", "ivf"])
+def test_index_types_search_and_remove(kind):
+    vectors = _embeddings(2000)
+    ids = np.arange(2000, dtype="int64")
+    index = build_index(kind, 32, vectors, ids)
+
+    assert index_type(index) == kind
+    _, found = index.search(vectors[:100], 1)
+    assert np.mean(found[:, 0] == ids[:100]) >= 0.9
+
+    index = remove_ids(index, ids[:10])
+    assert index.ntotal == 1990
+    _, found = index.search(vectors[:10], 1)
+    assert not np.isin(found[:, 0], ids[:10]).any()
+
+
+def test_face_database_upgrades_index_in_background(face_db):
+    face_db._index_type = "auto"
+    with (
+        patch.object(settings, "FACE_INDEX_FLAT_MAX", 100),
+        patch.object(settings, "FACE_INDEX_HNSW_MAX", 1000),
+    ):
+        vectors = _embeddings(150)
+        face_db._add_vectors(vectors[:50], np.full(50, 1, dtype="int64"))
+        assert face_db.index_stats["type"] == "flat"
+
+        face_db._add_vectors(vectors[50:], np.full(100, 2, dtype="int64"))
+        assert face_db.wait_for_rebuild(timeout=30)
+
+    assert face_db.index_stats == {
+        "type": "hnsw",
+        "metric": "l2",
+        "encoding": "float32",
+        "vectors": 150,
+        "dimension": 32,
+        "configured": "auto",
+        "rebuilding": False,
+    }
+    _, found = face_db._index.search(vectors[120:121], 1)
+    assert found[0][0] == 2
+    # The rebuilt index is snapshotted and the log trimmed
+    assert face_db._store.stats["snapshot_seq"] == 2
+    assert face_db._store.stats["log_segments"] == 0
+
+
+def _reopen(face_db):
+    """A FaceDatabase loading what `face_db` stored, as after a restart."""
+    from eagle_eye.database.vector.vector_db import FaceDatabase
+
+    FaceDatabase._instance = None
+    db = FaceDatabase()
+    db._metadata_db = MagicMock()
+    db._names = MagicMock()
+    db._ensure_db_loaded()
+    return db
+
+
+def test_face_database_logs_changes_instead_of_rewriting_index(face_db, tmp_path):
+    face_db._index_type = "flat"
+    vectors = _embeddings(5)
+    face_db._add_vectors(vectors[:3], np.array([1, 1, 2], dtype="int64"))
+    face_db._add_vectors(vectors[3:], np.array([3, 3], dtype="int64"))
+    face_db._remove_ids(np.array([2], dtype="int64"))
+
+    assert not list(tmp_path.glob("*.index"))
+    assert len(list((tmp_path / "log").glob("*.npy"))) == 3
+
+    # A crash while a segment was being written leaves only a temporary file
+    (tmp_path / "log" / "0000000004.add.npy.tmp").write_bytes(b"partial")
+    reopened = _reopen(face_db)
+
+    assert reopened._index.ntotal == 4
+    _, found = reopened._index.search(vectors, 1)
+    assert found[:, 0].tolist() == [1, 1, 1, 3, 3]
+    assert not list((tmp_path / "log").glob("*.tmp"))
+
+
+def test_hnsw_removal_hides_faces_until_background_rebuild(face_db, tmp_path):
+    face_db._index_type = "hnsw"
+    face_db._names = MagicMock()
+    face_db._names.get_names.side_effect = lambda ids: {i: f"p{i}" for i in ids}
+    vectors = _embeddings(60)
+    ids = np.repeat(np.array([1, 2, 3], dtype="int64"), 20)
+    face_db._add_vectors(vectors, ids)
+    face_db.compact()
+
+    with patch.object(face_db, "_schedule_rebuild"):
+        # No graph rebuild while the lock is held
+        with patch(
+            "eagle_eye.database.vector.index.build_index",
+            side_effect=AssertionError("rebuilt synchronously"),
+        ):
+            face_db._remove_ids(np.array([1], dtype="int64"))
+        # The search is widened past the 20 hidden vectors of each query
+        matches = face_db.search_batch(vectors[:20], k=25, threshold=-np.inf)
+        assert all({name for name, _ in row} == {"p2", "p3"} for row in matches)
+        # A snapshot would bring the removed faces back
+        face_db.compact()
+        assert face_db._store.stats["log_segments"] == 1
+
+        # Replayed at startup without a rebuild either
+        reopened = _reopen(face_db)
+        assert reopened._tombstones == {1}
+        assert reopened._index.ntotal == 60
+        assert 1 not in reopened._counts
+
+    # The background rebuild drops the vectors and compacts the log
+    reopened._schedule_rebuild()
+    assert reopened.wait_for_rebuild(timeout=30)
+    assert reopened._tombstones == set()
+    assert reopened._index.ntotal == 40
+    assert reopened._store.stats["log_segments"] == 0
+
+
+def test_face_database_compacts_log_into_snapshot(face_db, tmp_path):
+    face_db._index_type = "flat"
+    face_db._store.max_log_segments = 2
+    vectors = _embeddings(3)
+    face_db._add_vectors(vectors[:1], np.array([1], dtype="int64"))
+    face_db._add_vectors(vectors[1:2], np.array([2], dtype="int64"))
+    face_db._compact_thread.join(timeout=30)
+
+    assert (tmp_path / "snapshot-0000000002.index").exists()
+    assert not list((tmp_path / "log").glob("*.npy"))
+
+    face_db._add_vectors(vectors[2:], np.array([3], dtype="int64"))
+    reopened = _reopen(face_db)
+
+    assert reopened._store.stats == {
+        "seq": 3,
+        "snapshot_seq": 2,
+        "log_segments": 1,
+        "log_bytes": reopened._store.stats["log_bytes"],
+    }
+    _, found = reopened._index.search(vectors, 1)
+    assert found[:, 0].tolist() == [1, 2, 3]
+
+
+def test_face_database_migrates_single_file_index(face_db, tmp_path):
+    vectors = _embeddings(2)
+    legacy = build_index("flat", 32, vectors, np.array([7, 8], dtype="int64"))
+    faiss.write_index(legacy, str(tmp_path / "faiss_index.bin"))
+
+    face_db._ensure_db_loaded()
+    assert face_db._index.ntotal == 2
+
+    face_db.compact()
+    assert not (tmp_path / "faiss_index.bin").exists()
+    assert _reopen(face_db)._index.ntotal == 2
+
+
+def _fake_represent(img_path, **kwargs):
+    """One face whose embedding is the mean pixel value, none for black images."""
+    if not img_path.any():
+        raise ValueError("Face could not be detected")
+    return [{"embedding": np.full(32, img_path.mean(), dtype="float32").tolist()}]
+
+
+def test_face_database_enrolls_streamed_images_in_one_update(face_db):
+    face_db._enroller = FaceEnroller(workers=0, max_pending=2)
+    face_db._names = MagicMock()
+    face_db._names.get_or_create_id.return_value = 5
+    images = [
+        ("a.png", cv2.imencode(".png", np.full((8, 8, 3), 10, np.uint8))[1].tobytes()),
+        ("broken.png", b"not an image"),
+        ("black.png", np.zeros((8, 8, 3), np.uint8)),
+        ("b.png", np.full((8, 8, 3), 20, np.uint8)),
+    ]
+
+    async def uploads():
+        for image in images:
+            yield image
+
+    progress = []
+    with (
+        patch(
+            "eagle_eye.database.vector.enrollment.DeepFace.represent",
+            side_effect=_fake_represent,
+        ),
+        patch.object(face_db, "_add_vectors", wraps=face_db._add_vectors) as add,
+    ):
+        result = asyncio.run(
+            face_db.enroll(
+                "alice",
+                uploads(),
+                total=4,
+                on_progress=lambda image, done, total: progress.append((done, total)),
+            )
+        )
+
+    assert [image.to_dict()["status"] for image in result.images] == [
+        "ok",
+        "failed",
+        "failed",
+        "ok",
+    ]
+    assert result.images[1].error == "Invalid image file"
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    add.assert_called_once()
+    assert face_db._index.ntotal == 2
+    assert face_db.get_face_count_by_id(5) == 2
+    face_db.close()
+
+
+def test_import_gallery_adds_all_persons_at_once(face_db, tmp_path):
+    gallery = tmp_path / "gallery"
+    for name, value in (("alice", 10), ("bob", 20)):
+        (gallery / name).mkdir(parents=True)
+        for idx in range(2):
+            cv2.imwrite(
+                str(gallery / name / f"{idx}.png"),
+                np.full((8, 8, 3), value + idx, np.uint8),
+            )
+    (gallery / "notes.txt").write_text("not a person")
+
+    face_db._names = MagicMock()
+    face_db._names.get_or_create_id.side_effect = {"alice": 1, "bob": 2}.get
+    enroller = FaceEnroller(workers=0)
+    with patch(
+        "eagle_eye.database.vector.enrollment.DeepFace.represent",
+        side_effect=_fake_represent,
+    ):
+        added, images = asyncio.run(import_gallery(face_db, gallery, enroller))
+    enroller.close()
+
+    assert added == 4
+    assert [image.label for image in images] == [
+        "alice/0.png",
+        "alice/1.png",
+        "bob/0.png",
+        "bob/1.png",
+    ]
+    _, found = face_db._index.search(np.full((1, 32), 21, dtype="float32"), 1)
+    assert found[0][0] == 2
+
+
+def test_face_database_maintains_counts_per_person(face_db):
+    face_db._index_type = "flat"
+    vectors = _embeddings(6)
+    face_db._add_vectors(vectors[:3], np.array([1, 2, 1], dtype="int64"))
+    face_db._add_vectors(vectors[3:], np.array([3, 1, 3], dtype="int64"))
+    face_db._remove_ids(np.array([3], dtype="int64"))
+    face_db._names = MagicMock()
+    face_db._names.all.return_value = [
+        {"id": 1, "name": "alice"},
+        {"id": 2, "name": "bob"},
+        {"id": 3, "name": "carol"},
+    ]
+
+    assert [face["count"] for face in face_db.get_all_faces()] == [3, 1, 0]
+    # Counted once from the index after a restart
+    assert _reopen(face_db)._counts == {1: 3, 2: 1}
+
+
+def test_prototype_search_matches_exact_search(face_db):
+    face_db._index_type = "flat"
+    face_db._prototypes = PrototypeIndex(per_person=2, candidates=3)
+    # 20 persons with 10 noisy images each, one person with a single image
+    rng = np.random.default_rng(1)
+    centers = rng.standard_normal((20, 32)).astype("float32")
+    vectors = np.repeat(centers, 10, axis=0) + 0.3 * rng.standard_normal(
+        (200, 32)
+    ).astype("float32")
+    ids = np.repeat(np.arange(1, 21, dtype="int64"), 10)
+    face_db._add_vectors(vectors, ids)
+    face_db._add_vectors(centers[:1] * 2, np.array([21], dtype="int64"))
+
+    assert face_db._prototypes.ntotal == 20 * 2 + 1
+    queries = np.concatenate([vectors[::25], centers[:1] * 2])
+    distances, found = face_db._prototypes.search(queries, 1, face_db._index)
+    exact_distances, exact = face_db._index.search(queries, 1)
+    assert found[:, 0].tolist() == exact[:, 0].tolist()
+    # Re-ranked on the main index: the distances are exact too
+    np.testing.assert_allclose(distances[:, 0], exact_distances[:, 0], rtol=1e-4)
+
+    face_db._remove_ids(np.array([1], dtype="int64"))
+    _, found = face_db._prototypes.search(vectors[:1], 3, face_db._index)
+    assert 1 not in found[0].tolist()
+
+
+def test_prototypes_merge_new_vectors_without_keeping_them(face_db):
+    face_db._index_type = "ivf"
+    face_db._prototypes = PrototypeIndex(per_person=2, candidates=3)
+    rng = np.random.default_rng(2)
+    centers = rng.standard_normal((100, 32)).astype("float32")
+    vectors = np.repeat(centers, 10, axis=0) + 0.3 * rng.standard_normal(
+        (1000, 32)
+    ).astype("float32")
+    ids = np.repeat(np.arange(1, 101, dtype="int64"), 10)
+    # Every person enrolled in two rounds
+    first = np.tile(np.arange(10) < 5, 100)
+    face_db._add_vectors(vectors[first], ids[first])
+    face_db._add_vectors(vectors[~first], ids[~first])
+    assert face_db.wait_for_rebuild(timeout=30)
+    assert face_db.index_stats["type"] == "ivf"
+    inner = faiss.downcast_index(face_db._index.index)
+    inner.nprobe = inner.nlist
+
+    # Two centroids per person standing for all of its vectors, nothing more
+    for centroids, weights in face_db._prototypes._centroids.values():
+        assert len(centroids) == 2
+        assert weights.sum() == 10
+    distances, found = face_db._prototypes.search(vectors[::7], 1, face_db._index)
+    exact_distances, exact = face_db._index.search(vectors[::7], 1)
+    assert found[:, 0].tolist() == exact[:, 0].tolist()
+    np.testing.assert_allclose(distances[:, 0], exact_distances[:, 0], rtol=1e-4)
+
+
+@pytest.mark.parametrize("kind", ["flat", "hnsw"])
+def test_cosine_metric_scores_are_calibrated(face_db, kind):
+    face_db._metric = "cosine"
+    face_db._index_type = kind
+    vectors = _embeddings(3)
+    face_db._add_vectors(vectors * 40, np.array([1, 2, 3], dtype="int64"))
+    face_db._names = MagicMock()
+    face_db._names.get_names.side_effect = lambda ids: {i: f"p{i}" for i in ids}
+
+    assert face_db.index_stats["metric"] == "cosine"
+    # Scale no longer matters: the same direction is a perfect match
+    name, similarity = face_db.search(vectors[1] * 0.01, threshold=0.5)
+    assert name == "p2"
+    assert similarity == pytest.approx(1.0, abs=1e-5)
+    cosine = vectors[0] @ vectors[1] / np.linalg.norm(vectors[:2], axis=1).prod()
+    matches = face_db.search_batch(vectors[1], k=3, threshold=-1.0)[0]
+    assert dict(matches)["p1"] == pytest.approx(cosine, abs=1e-5)
+
+
+def test_face_database_migrates_l2_index_to_cosine(face_db, tmp_path):
+    vectors = _embeddings(4) * 25
+    legacy = build_index("flat", 32, vectors, np.arange(4, dtype="int64"))
+    faiss.write_index(legacy, str(tmp_path / "faiss_index.bin"))
+    face_db._metric = "cosine"
+
+    face_db._ensure_db_loaded()
+
+    assert face_db.index_stats["metric"] == "cosine"
+    stored, ids = extract_vectors(face_db._index)
+    np.testing.assert_allclose(np.linalg.norm(stored, axis=1), 1.0, rtol=1e-5)
+    assert ids.tolist() == [0, 1, 2, 3]
+    # The migrated index is the new snapshot
+    assert not (tmp_path / "faiss_index.bin").exists()
+    with patch.object(settings, "FACE_METRIC", "cosine"):
+        reopened = _reopen(face_db)
+    assert reopened.index_stats["metric"] == "cosine"
+    assert reopened._store.stats["log_segments"] == 0
+
+
+@pytest.mark.parametrize(
+    "kind, encoding, code_bytes",
+    [
+        ("flat", "fp16", 128),
+        ("flat", "sq8", 64),
+        ("hnsw", "sq8", 64),
+        ("ivf", "sq8", 64),
+    ],
+)
+def test_compressed_encodings_shrink_vectors(kind, encoding, code_bytes):
+    vectors = _embeddings(2000, dimension=64)
+    ids = np.arange(2000, dtype="int64")
+    index = build_index(kind, 64, vectors, ids, encoding=encoding)
+
+    assert index_encoding(index) == encoding
+    # 256 bytes per 64-d vector as float32
+    assert code_size(index) == code_bytes
+    _, found = index.search(vectors[:100], 1)
+    assert np.mean(found[:, 0] == ids[:100]) >= 0.9
+
+    index = remove_ids(index, ids[:10])
+    assert index_encoding(index) == encoding
+    assert index.ntotal == 1990
+
+
+def test_face_database_switches_to_sq8_once_trainable(face_db):
+    face_db._index_type = "flat"
+    face_db._encoding = "sq8"
+    with patch("eagle_eye.database.vector.index.SQ8_MIN_TRAIN", 100):
+        face_db._add_vectors(_embeddings(50), np.full(50, 1, dtype="int64"))
+        # Too few vectors to learn the value ranges yet
+        assert face_db.index_stats["encoding"] == "fp16"
+
+        face_db._add_vectors(_embeddings(100, seed=1), np.full(100, 2, dtype="int64"))
+        assert face_db.wait_for_rebuild(timeout=30)
+
+    assert face_db.index_stats["encoding"] == "sq8"
+    assert face_db.index_stats["vectors"] == 150
+
+
+def test_removal_below_sq8_minimum_falls_back_to_fp16(face_db, tmp_path):
+    face_db._index_type = "hnsw"
+    face_db._encoding = "sq8"
+    vectors = _embeddings(120)
+    ids = np.repeat(np.array([1, 2], dtype="int64"), [100, 20])
+    with patch("eagle_eye.database.vector.index.SQ8_MIN_TRAIN", 100):
+        face_db._add_vectors(vectors, ids)
+        assert face_db.wait_for_rebuild(timeout=30)
+        assert face_db.index_stats["encoding"] == "sq8"
+
+        # The rebuilt HNSW graph is too small to train sq8 again
+        face_db._remove_ids(np.array([1], dtype="int64"))
+        assert face_db.wait_for_rebuild(timeout=30)
+        assert face_db.index_stats["encoding"] == "fp16"
+        assert face_db.index_stats["vectors"] == 20
+
+        reopened = _reopen(face_db)
+
+    assert reopened._index.ntotal == 20
+    _, found = reopened._index.search(vectors[100:], 1)
+    assert (found[:, 0] == 2).all()
+
+
+def test_rebuilds_encode_the_enrolled_vectors_again(face_db):
+    face_db._index_type = "flat"
+    face_db._encoding = "sq8"
+    vectors = _embeddings(150)
+    ids = np.repeat(np.array([1, 2, 3], dtype="int64"), 50)
+    with patch("eagle_eye.database.vector.index.SQ8_MIN_TRAIN", 100):
+        face_db._add_vectors(vectors, ids)
+        assert face_db.wait_for_rebuild(timeout=30)
+        assert face_db.index_stats["encoding"] == "sq8"
+        first, _ = extract_vectors(face_db._index)
+
+        # Not trained on the decoded sq8 values: nothing drifts
+        assert face_db.rebuild_index()
+        assert face_db.rebuild_index()
+        np.testing.assert_array_equal(extract_vectors(face_db._index)[0], first)
+
+        # The enrolled float32 vectors survive snapshots and restarts
+        face_db._remove_ids(np.array([2], dtype="int64"))
+        face_db.compact()
+        reopened = _reopen(face_db)
+
+    stored, stored_ids = reopened.get_vectors()
+    keep = ids != 2
+    np.testing.assert_array_equal(stored, vectors[keep])
+    assert stored_ids.tolist() == ids[keep].tolist()
+
+
+def test_hnsw_id_reuse_rebuilds_from_enrolled_vectors(face_db):
+    face_db._index_type = "hnsw"
+    face_db._encoding = "fp16"
+    vectors = _embeddings(30)
+    face_db._add_vectors(vectors[:20], np.repeat(np.array([1, 2], "int64"), 10))
+    face_db._remove_ids(np.array([1], dtype="int64"))
+    assert face_db._tombstones == {1}
+
+    # A removed person's ID given out again drops its old vectors for real
+    face_db._add_vectors(vectors[20:], np.full(10, 1, dtype="int64"))
+
+    assert face_db._tombstones == set()
+    assert face_db._index.ntotal == 20
+    distances, _ = face_db._index.search(vectors[:10], 1)
+    assert (distances[:, 0] > 1.0).all()
+    distances, found = face_db._index.search(vectors[20:], 1)
+    assert (found[:, 0] == 1).all()
+    np.testing.assert_allclose(distances[:, 0], 0.0, atol=1e-2)
+
+
+def test_upgrade_to_ivfpq_trains_on_enrolled_vectors(face_db):
+    face_db._index_type = "auto"
+    face_db._encoding = "sq8"
+    vectors = _embeddings(10000, dimension=8)
+    ids = np.arange(10000, dtype="int64")
+    with (
+        patch("eagle_eye.database.vector.index.SQ8_MIN_TRAIN", 100),
+        patch.object(settings, "FACE_INDEX_FLAT_MAX", 1000),
+        patch.object(settings, "FACE_INDEX_HNSW_MAX", 2000),
+        patch.object(settings, "FACE_INDEX_IVF_MAX", 5000),
+    ):
+        face_db._add_vectors(vectors[:1000], ids[:1000])
+        assert face_db.wait_for_rebuild(timeout=30)
+        assert face_db.index_stats["encoding"] == "sq8"
+
+        face_db._add_vectors(vectors[1000:], ids[1000:])
+        assert face_db.wait_for_rebuild(timeout=60)
+
+    assert face_db.index_stats["type"] == "ivfpq"
+    # Same codes as an index trained on the original vectors, not on the
+    # values decoded from the sq8 index it replaced
+    expected = build_index("ivfpq", 8, vectors, ids)
+    np.testing.assert_array_equal(
+        extract_vectors(face_db._index)[0], extract_vectors(expected)[0]
+    )
+
+
+def test_failed_change_is_not_logged(face_db, tmp_path):
+    face_db._index_type = "flat"
+    vectors = _embeddings(3)
+    face_db._add_vectors(vectors[:2], np.array([1, 2], dtype="int64"))
+
+    with (
+        patch(
+            "eagle_eye.database.vector.index.remove_ids",
+            side_effect=RuntimeError("boom"),
+        ),
+        pytest.raises(RuntimeError),
+    ):
+        face_db._remove_ids(np.array([1], dtype="int64"))
+    assert len(list((tmp_path / "log").glob("*.npy"))) == 1
+
+    # The next change reuses the sequence number of the discarded one
+    face_db._add_vectors(vectors[2:], np.array([3], dtype="int64"))
+    reopened = _reopen(face_db)
+    assert reopened._store.stats["seq"] == 2
+    _, found = reopened._index.search(vectors, 1)
+    assert found[:, 0].tolist() == [1, 2, 3]
+
+
+def test_gallery_benchmark_measures_encoding_recall():
+    vectors, ids, _ = synthetic_embeddings(1200, 32, 0)
+    rows = run_gallery_benchmark(vectors, ids, queries=50, encodings=["fp16", "sq8"])
+
+    assert [(row["encoding"], row["bytes_per_vector"]) for row in rows] == [
+        ("float32", 128),
+        ("fp16", 64),
+        ("sq8", 32),
+    ]
+    assert all(row["size"] == 1150 for row in rows)
+    assert rows[1]["recall@1"] >= 0.95
+    assert rows[2]["identity_match"] >= 0.9
+
+
+def test_index_benchmark_reports_recall_against_flat():
+    rows = run_benchmark(1000, dimension=16, queries=10, index_types=["flat", "hnsw"])
+
+    assert [row["type"] for row in rows] == ["flat", "hnsw"]
+    assert rows[0]["recall@1"] == 1.0
+    assert all(row["latency_ms"] > 0 for row in rows)
+
+
+def test_face_database_search_batch_resolves_names_at_once(face_db):
+    vectors = _embeddings(4)
+    face_db._add_vectors(vectors[:2], np.array([1, 1], dtype="int64"))
+    face_db._add_vectors(vectors[2:3], np.array([2], dtype="int64"))
+    face_db._metadata_db.get_version.return_value = 1
+    face_db._metadata_db.get_all_persons.return_value = [
+        {"id": 1, "name": "alice"},
+        {"id": 2, "name": "bob"},
+    ]
+
+    queries = np.stack([vectors[0], vectors[2], vectors[3] * 10])
+    matches = face_db.search_batch(queries, k=3, threshold=0.5)
+
+    assert [[name for name, _ in row] for row in matches] == [["alice"], ["bob"], []]
+    assert matches[0][0][1] == pytest.approx(1.0)
+    assert face_db.search(vectors[2:3]) == ("bob", pytest.approx(1.0))
+    # Names come from the cache, loaded once
+    face_db._metadata_db.get_all_persons.assert_called_once()
+
+
+@pytest.fixture
+def sql_db():
+    test_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(test_engine)
+    with patch("eagle_eye.database.engine.engine", test_engine):
+        yield test_engine
+    test_engine.dispose()
+
+
+def test_person_name_cache_writes_through_without_reloading(sql_db):
+    store = MetadataStore()
+    cache = PersonNameCache(store, check_interval_sec=60)
+
+    alice = cache.get_or_create_id("alice")
+    bob = cache.get_or_create_id("bob")
+    assert cache.get_names([alice, bob, 99]) == {alice: "alice", bob: "bob"}
+
+    cache.delete("alice")
+    assert cache.get_id("alice") is None
+    assert store.get_all_persons() == [{"name": "bob", "id": bob}]
+    assert cache.reloads == 1
+
+
+def test_person_name_cache_sees_changes_of_other_processes(sql_db):
+    cache = PersonNameCache(MetadataStore(), check_interval_sec=0)
+    assert cache.get_id("carol") is None
+
+    # Another process enrolls a person: only the version counter tells us
+    other = MetadataStore()
+    carol = other.get_or_create_person_id("carol")
+    assert cache.get_name(carol) == "carol"
+
+    other.delete_person("carol")
+    assert cache.get_name(carol) is None
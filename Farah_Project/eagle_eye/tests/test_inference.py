@@ -0,0 +1,235 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import pytest
+
+from eagle_eye.core.inference import BatchScheduler, InferencePool, ModelRegistry
+from eagle_eye.core.inference.batch_scheduler import _BatchRequest
+
+
+class RecordingBatch:
+    """predict_batch stand-in that records every batch it receives."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return [f"result-{item}" for item in items]
+
+
+@pytest.fixture
+def recorder():
+    return RecordingBatch()
+
+
+# ============================================================================
+# BatchScheduler Tests
+# ============================================================================
+
+
+def test_batch_scheduler_returns_result_per_item(recorder):
+    scheduler = BatchScheduler(recorder, max_batch_size=4, max_wait_ms=5)
+
+    try:
+        assert scheduler.predict("stream1", "a", timeout=1) == "result-a"
+    finally:
+        scheduler.close()
+
+
+def test_batch_scheduler_single_stream_does_not_wait(recorder):
+    scheduler = BatchScheduler(recorder, max_batch_size=8, max_wait_ms=500)
+
+    try:
+        start = time.monotonic()
+        scheduler.predict("stream1", "a", timeout=1)
+        assert time.monotonic() - start < 0.25
+    finally:
+        scheduler.close()
+
+
+def test_batch_scheduler_combines_streams(recorder):
+    scheduler = BatchScheduler(recorder, max_batch_size=8, max_wait_ms=200)
+    results = {}
+
+    def worker(stream_id):
+        results[stream_id] = scheduler.predict(stream_id, stream_id, timeout=2)
+
+    try:
+        # Register three active streams first
+        for stream_id in ("s1", "s2", "s3"):
+            scheduler.predict(stream_id, stream_id, timeout=1)
+        recorder.batches.clear()
+
+        threads = [
+            threading.Thread(target=worker, args=(s,)) for s in ("s1", "s2", "s3")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        scheduler.close()
+
+    assert results == {"s1": "result-s1", "s2": "result-s2", "s3": "result-s3"}
+    assert max(len(batch) for batch in recorder.batches) > 1
+
+
+def test_batch_scheduler_round_robin_across_streams(recorder):
+    scheduler = BatchScheduler(recorder, max_batch_size=2, max_wait_ms=1000)
+
+    # Fill the queues directly so the dispatcher thread never starts
+    for stream_id, item in (("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1")):
+        scheduler._queues.setdefault(stream_id, deque()).append(
+            _BatchRequest(stream_id=stream_id, item=item)
+        )
+        scheduler._pending += 1
+
+    first = scheduler._take_batch()
+    second = scheduler._take_batch()
+
+    # A busy stream cannot fill a batch while another stream is waiting
+    assert [request.item for request in first] == ["a1", "b1"]
+    assert [request.item for request in second] == ["a2", "a3"]
+    assert scheduler._pending == 0
+
+
+def test_batch_scheduler_propagates_errors():
+    def failing(items):
+        raise ValueError("boom")
+
+    scheduler = BatchScheduler(failing, max_batch_size=2, max_wait_ms=5)
+
+    try:
+        with pytest.raises(ValueError):
+            scheduler.predict("stream1", "a", timeout=1)
+    finally:
+        scheduler.close()
+
+
+# ============================================================================
+# ModelRegistry Tests
+# ============================================================================
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return object()
+
+
+def test_model_registry_shares_model_per_path_and_device():
+    registry = ModelRegistry(idle_timeout_sec=0)
+    loader = CountingLoader()
+
+    first = registry.acquire("weights/a.pt", loader)
+    second = registry.acquire("weights/a.pt", loader)
+    other_device = registry.acquire("weights/a.pt", loader, device="cuda:0")
+
+    assert first.get() is second.get()
+    assert other_device.get() is not first.get()
+    assert loader.calls == 2
+    assert {entry["refs"] for entry in registry.stats()} == {2, 1}
+
+
+def test_model_registry_evicts_idle_models_and_reloads():
+    registry = ModelRegistry(idle_timeout_sec=10)
+    loader = CountingLoader()
+
+    handle = registry.acquire("weights/a.pt", loader)
+    handle.get()
+
+    assert registry.evict_idle(now=time.monotonic() + 60) == [("weights/a.pt", "auto")]
+    assert registry.stats()[0]["loaded"] is False
+
+    # Still referenced: the next use loads the weights again
+    handle.get()
+    assert loader.calls == 2
+
+
+def test_model_registry_drops_released_entries():
+    registry = ModelRegistry(idle_timeout_sec=10)
+
+    handle = registry.acquire("weights/a.pt", CountingLoader())
+    handle.get()
+    handle.release()
+    handle.release()  # second release is a no-op
+
+    assert registry.stats()[0]["refs"] == 0
+    registry.evict_idle(now=time.monotonic() + 60)
+    assert registry.stats() == []
+
+
+def test_model_registry_shares_one_scheduler_per_model():
+    registry = ModelRegistry(idle_timeout_sec=0)
+    model = object()
+    seen = []
+
+    def predict_batch(loaded, items):
+        seen.append(loaded)
+        return [f"result-{item}" for item in items]
+
+    first = registry.acquire("weights/a.pt", lambda: model)
+    second = registry.acquire("weights/a.pt", lambda: model)
+    scheduler = first.scheduler(predict_batch, max_wait_ms=5)
+
+    assert second.scheduler(predict_batch) is scheduler
+    assert scheduler.predict("stream1", "a", timeout=1) == "result-a"
+    assert seen == [model]
+
+    # Closed with the last reference only
+    first.release()
+    assert scheduler.predict("stream1", "b", timeout=1) == "result-b"
+    second.release()
+    with pytest.raises(RuntimeError):
+        scheduler.submit("stream1", "c")
+
+
+# ============================================================================
+# InferencePool Tests
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_inference_pool_keeps_event_loop_free():
+    pool = InferencePool(max_workers=2, max_pending=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    await asyncio.gather(pool.run(time.sleep, 0.1), ticker())
+
+    # The loop kept running while the blocking call was in progress
+    assert ticks == 5
+
+
+@pytest.mark.asyncio
+async def test_inference_pool_applies_backpressure():
+    pool = InferencePool(max_workers=1, max_pending=1)
+    peak = 0
+    lock = threading.Lock()
+    running = 0
+
+    def work():
+        nonlocal peak, running
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    await asyncio.gather(*(pool.run(work) for _ in range(4)))
+
+    assert peak == 1
+    assert pool.stats["admitted"] == 0
+    assert pool.stats["waiting"] == 0
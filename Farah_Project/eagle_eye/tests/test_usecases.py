@@ -1,8 +1,13 @@
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pytest
+from pydantic import ValidationError
 
+from eagle_eye.config.settings import Settings
+from eagle_eye.core.alert.dispatch import AlertQueue
 from eagle_eye.usecases.base import UResult, UseCase
 
 # -------------------------
@@ -144,28 +149,22 @@ def test_alert_triggered_when_enabled(
 ):
     result_use_case.alert_manager = alert_manager
 
-    # Force executor to run immediately
-    def immediate_submit(fn, *args, **kwargs):
-        fn(*args, **kwargs)
-
     with (
         patch("eagle_eye.usecases.base.settings.GMAIL_USER", "TEST_USER"),
         patch("eagle_eye.usecases.base.settings.GMAIL_PASSWORD", "TEST_PASSWORD"),
-        patch.object(
-            result_use_case._alert_executor,
-            "submit",
-            side_effect=immediate_submit,
-        ),
     ):
         frame, result = result_use_case.invoke(dummy_frame, stream_id="stream-1")
 
+    assert result_use_case.alert_queue.join(timeout=5)
+
     alert_manager.process.assert_called_once()
 
     args, kwargs = alert_manager.process.call_args
-    stream_id, frame_bytes, metadata = args
+    stream_id, frame, metadata = args
 
     assert stream_id == "stream-1"
-    assert isinstance(frame_bytes, bytes)
+    # Raw frame is passed through, encoding is deferred to clip time
+    assert frame is dummy_frame
     assert metadata["object_count"] == 1
 
 
@@ -191,21 +190,22 @@ def test_alert_not_triggered_without_result(
 # -------------------------
 
 
-def test_dispatch_alert_handles_encoding_failure(
+def test_dispatch_alert_does_not_encode_frame(
     result_use_case,
     dummy_frame,
     alert_manager,
 ):
     result_use_case.alert_manager = alert_manager
 
-    with patch("cv2.imencode", return_value=(False, None)):
+    with patch("cv2.imencode") as imencode:
         result_use_case._dispatch_alert(
             stream_id="s1",
             frame=dummy_frame,
             result=UResult(object_count=1),
         )
 
-    alert_manager.process.assert_not_called()
+    imencode.assert_not_called()
+    alert_manager.process.assert_called_once()
 
 
 def test_dispatch_alert_exception_is_caught(
@@ -222,3 +222,334 @@ def test_dispatch_alert_exception_is_caught(
         frame=dummy_frame,
         result=UResult(object_count=1),
     )
+
+
+def test_alert_queue_coalesces_per_stream():
+    gate = threading.Event()
+    handled = []
+
+    def handler(stream_id, frame, result):
+        gate.wait(5)
+        handled.append((stream_id, result))
+
+    queue = AlertQueue(handler, max_size=4, overflow="coalesce")
+    queue.put("busy", None, 0)  # occupies the worker until the gate opens
+    time.sleep(0.05)
+    for value in range(5):
+        queue.put("s1", None, value)
+    queue.put("s2", None, 0)
+
+    assert len(queue) == 2
+    gate.set()
+    assert queue.join(timeout=5)
+    assert handled[1:] == [("s1", 4), ("s2", 0)]
+    assert queue.stats["coalesced"] == 4
+
+
+@pytest.mark.parametrize(
+    "overflow, expected",
+    [("drop_oldest", [2, 3]), ("drop_newest", [0, 1])],
+)
+def test_alert_queue_drop_policies(overflow, expected):
+    gate = threading.Event()
+    handled = []
+
+    def handler(stream_id, frame, result):
+        gate.wait(5)
+        handled.append(result)
+
+    queue = AlertQueue(handler, max_size=2, overflow=overflow)
+    queue.put("s1", None, "busy")
+    time.sleep(0.05)
+    for value in range(4):
+        queue.put("s1", None, value)
+
+    gate.set()
+    assert queue.join(timeout=5)
+    assert handled[1:] == expected
+    stats = queue.stats
+    assert stats["dropped"] == 2
+    assert stats["processed"] == 3
+    assert stats["max_latency_ms"] > 0
+
+
+def test_unknown_overflow_policy_fails_on_creation():
+    # Not only once the first alert builds the queue
+    with pytest.raises(ValueError):
+        ConcreteUseCase(name="test", alert_overflow="drop-oldest")
+    with pytest.raises(ValidationError):
+        Settings(ALERT_OVERFLOW_POLICY="drop-oldest")
+
+
+# -------------------------
+# Tests: inference rate control
+# -------------------------
+
+
+class CountingUseCase(ConcreteUseCase):
+    """Counts real _predict() calls and returns the call number."""
+
+    calls = 0
+
+    def _predict(self, input_data):
+        self.calls += 1
+        return self.calls
+
+
+def test_stride_reuses_last_prediction(dummy_frame):
+    use_case = CountingUseCase(name="strided", inference_stride=3)
+
+    for _ in range(6):
+        use_case._run(dummy_frame, stream_id="s1")
+
+    assert use_case.calls == 2
+    assert use_case._rate_state["s1"].prediction == 2
+
+
+def test_stride_is_tracked_per_stream(dummy_frame):
+    use_case = CountingUseCase(name="strided", inference_stride=5)
+
+    use_case._run(dummy_frame, stream_id="s1")
+    use_case._run(dummy_frame, stream_id="s2")
+
+    # First frame of every stream is always inferred
+    assert use_case.calls == 2
+
+
+def test_target_fps_limits_inference_rate(dummy_frame):
+    use_case = CountingUseCase(name="limited", target_fps=1.0)
+
+    for _ in range(5):
+        use_case._run(dummy_frame, stream_id="s1")
+
+    assert use_case.calls == 1
+
+
+def test_adaptive_rate_raises_stride_when_over_budget(dummy_frame):
+    use_case = CountingUseCase(name="adaptive", adaptive_rate=True, frame_budget_ms=1)
+
+    with patch("eagle_eye.usecases.base.time.perf_counter", side_effect=[0.0, 0.01]):
+        use_case._run(dummy_frame, stream_id="s1")
+
+    # 10 ms of inference on a 1 ms budget
+    assert use_case.current_stride("s1") == 10
+
+
+# -------------------------
+# Tests: ainvoke()
+# -------------------------
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_matches_invoke(result_use_case, dummy_frame):
+    frame, result = await result_use_case.ainvoke(dummy_frame, stream_id="s1")
+
+    assert np.array_equal(frame, dummy_frame)
+    assert result.object_count == 1
+    assert result.detections == ["prediction"]
+
+
+# -------------------------
+# Tests: Face recognition
+# -------------------------
+
+
+class FakeFaceModel:
+    input_shape = (24, 32)  # (width, height), as in DeepFace
+
+    def __init__(self):
+        self.batches = []
+
+    def forward(self, batch):
+        self.batches.append(batch.shape)
+        return batch.reshape(len(batch), -1)[:, :4]
+
+
+def _face(x: int, size: int = 8) -> dict:
+    return {
+        "face": np.full((size, size, 3), 0.5, dtype=np.float32),
+        "facial_area": {"x": x, "y": 0, "w": size, "h": size},
+        "confidence": 0.9,
+    }
+
+
+def test_face_embedder_runs_one_forward_pass_per_batch():
+    from eagle_eye.usecases.face_recognition import embedder as face_embedder
+
+    model = FakeFaceModel()
+    with patch.object(face_embedder.DeepFace, "build_model", return_value=model):
+        embedder = face_embedder.FaceEmbedder("Fake", max_batch_size=4)
+        faces = [_face(0, size)["face"] for size in (8, 20, 40, 64, 100)]
+        vectors = embedder.embed(faces)
+        embedder.release()
+
+    assert model.batches == [(4, 32, 24, 3), (1, 32, 24, 3)]
+    assert vectors.shape == (5, 4) and vectors.dtype == np.float32
+    # Letterboxed, input untouched
+    assert embedder.preprocess(faces[0])[0, 0].tolist() == [0.0, 0.0, 0.0]
+    assert faces[0].max() == pytest.approx(0.5)
+
+
+def test_face_recognition_searches_all_faces_at_once(dummy_frame):
+    from eagle_eye.usecases.face_recognition import usecase as face_usecase
+
+    with (
+        patch.object(face_usecase, "DeepFace") as deepface,
+        patch.object(face_usecase, "face_db") as face_db,
+        patch.object(face_usecase, "FaceEmbedder") as embedder,
+    ):
+        deepface.extract_faces.side_effect = [[_face(0), _face(10)], [_face(20)]]
+        embedder.return_value.embed.return_value = np.zeros((3, 4), np.float32)
+        face_db.search_batch.return_value = [[("alice", 0.8)], [], [("bob", 0.7)]]
+
+        use_case = face_usecase.FaceRecognition(batching=False)
+        results = use_case._predict_batch([dummy_frame, dummy_frame])
+
+    embedder.return_value.embed.assert_called_once()
+    assert len(embedder.return_value.embed.call_args.args[0]) == 3
+    face_db.search_batch.assert_called_once()
+    assert [[face["name"] for face in faces] for faces in results] == [
+        ["alice", "Unknown"],
+        ["bob"],
+    ]
+
+
+def test_face_recognition_batches_faces_of_concurrent_streams(dummy_frame):
+    from eagle_eye.config.settings import settings
+    from eagle_eye.usecases.face_recognition import embedder as face_embedder
+    from eagle_eye.usecases.face_recognition import usecase as face_usecase
+
+    model = FakeFaceModel()
+    detected_on = set()
+
+    def extract_faces(**kwargs):
+        detected_on.add(threading.current_thread().name)
+        return [_face(0, size=40)]
+
+    with (
+        patch.object(face_usecase, "DeepFace") as deepface,
+        patch.object(face_usecase, "face_db") as face_db,
+        patch.object(face_embedder.DeepFace, "build_model", return_value=model),
+        patch.object(settings, "BATCH_MAX_WAIT_MS", 200),
+    ):
+        deepface.extract_faces.side_effect = extract_faces
+        face_db.model_name = "Fake-batching"
+        face_db.search_batch.side_effect = lambda vectors, k, threshold: (
+            [[("alice", 0.9)]] * len(vectors)
+        )
+        use_case = face_usecase.FaceRecognition(batching=True, tracking=False)
+        results = []
+
+        def stream(stream_id):
+            for _ in range(3):
+                results.append(use_case._predict_batch([dummy_frame], [stream_id]))
+
+        threads = [
+            threading.Thread(target=stream, args=(f"s{i}",), name=f"stream-{i}")
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = use_case.scheduler.stats
+        use_case.close()
+
+    # Detection runs on the callers' threads, embedding batches their faces
+    assert detected_on == {f"stream-{i}" for i in range(4)}
+    assert stats["avg_batch_size"] > 1
+    assert len(model.batches) == stats["batches"]
+    assert all(faces[0]["name"] == "alice" for [faces] in results)
+
+
+def test_face_tracker_reuses_identity_until_box_or_ttl_changes():
+    from eagle_eye.usecases.face_recognition.tracker import FaceTracker
+
+    tracker = FaceTracker(identity_ttl_sec=5.0, reembed_iou=0.5, track_ttl_sec=10.0)
+
+    [(track, stale)] = tracker.update([(0, 0, 40, 40)], now=0.0)
+    assert stale
+    track.remember("alice", 0.9, now=0.0)
+
+    # Small moves keep the track and its identity
+    [(same, stale)] = tracker.update([(4, 2, 40, 40)], now=0.2)
+    assert same is track and not stale and same.name == "alice"
+
+    # A second face gets its own track
+    results = tracker.update([(6, 2, 40, 40), (200, 0, 40, 40)], now=0.4)
+    assert results[0][0] is track and not results[0][1]
+    assert results[1][0].track_id != track.track_id and results[1][1]
+
+    # Large moves and expired identities are recognized again
+    [(moved, stale)] = tracker.update([(20, 6, 40, 40)], now=0.6)
+    assert moved is track and stale
+    track.remember("alice", 0.9, now=0.6)
+    [(same, stale)] = tracker.update([(20, 6, 40, 40)], now=6.0)
+    assert same is track and stale
+
+
+def test_face_recognition_skips_tracked_faces(dummy_frame):
+    from eagle_eye.usecases.face_recognition import usecase as face_usecase
+
+    with (
+        patch.object(face_usecase, "DeepFace") as deepface,
+        patch.object(face_usecase, "face_db") as face_db,
+        patch.object(face_usecase, "FaceEmbedder") as embedder,
+    ):
+        deepface.extract_faces.side_effect = lambda **kwargs: [_face(0, size=40)]
+        embedder.return_value.embed.return_value = np.zeros((1, 4), np.float32)
+        face_db.search_batch.return_value = [[("alice", 0.8)]]
+
+        use_case = face_usecase.FaceRecognition(batching=False, tracking=True)
+        results = [
+            use_case._predict_batch([dummy_frame], ["cam-1"])[0] for _ in range(10)
+        ]
+        # Tracks are per stream
+        use_case._predict_batch([dummy_frame], ["cam-2"])
+
+    assert embedder.return_value.embed.call_count == 2
+    assert all(faces[0]["name"] == "alice" for faces in results)
+
+
+def test_face_recognition_drops_trackers_of_stopped_streams(dummy_frame):
+    from eagle_eye.usecases.face_recognition import usecase as face_usecase
+
+    with (
+        patch.object(face_usecase, "DeepFace") as deepface,
+        patch.object(face_usecase, "face_db"),
+        patch.object(face_usecase, "FaceEmbedder"),
+        patch.object(face_usecase.time, "monotonic") as monotonic,
+    ):
+        deepface.extract_faces.return_value = []
+        use_case = face_usecase.FaceRecognition(batching=False, tracking=True)
+
+        monotonic.return_value = 0.0
+        for index in range(100):
+            use_case._predict_batch([dummy_frame], [f"webrtc-{index}"])
+        assert len(use_case._trackers) == 100
+
+        # Long after those streams stopped, a new one prunes them
+        monotonic.return_value = 60.0
+        use_case._predict_batch([dummy_frame], ["webrtc-new"])
+
+    assert list(use_case._trackers) == ["webrtc-new"]
+
+
+def test_fight_detection_draws_cached_prediction_on_current_frame(dummy_frame):
+    from types import SimpleNamespace
+
+    from eagle_eye.usecases.fight_detection.usecase import FightDetection
+
+    use_case = FightDetection()
+    fight = SimpleNamespace(label="fight", conf=0.9, box=(10.0, 10.0, 50.0, 50.0))
+    prediction = SimpleNamespace(interactions=[fight], actions=[])
+    # A later frame, with what an earlier use case drew on it
+    frame = np.full_like(dummy_frame, 255)
+
+    drawn = use_case._draw(frame, prediction)
+    use_case.close()
+
+    assert drawn is not frame and (frame == 255).all()
+    assert drawn[10, 30].tolist() == [0, 0, 255]
+    assert drawn[200, 200].tolist() == [255, 255, 255]
+    assert use_case._draw(frame, None).tolist() == frame.tolist()
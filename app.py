@@ -672,6 +672,9 @@ def serve_test_buttons():
         return redirect(url_for('serve_index'))
     return send_from_directory('FrontEnd', 'test-buttons.html')
 
+# Target smoke inference rate for the live feed (frames in between reuse the last boxes)
+SMOKE_INFERENCE_FPS = 6
+
 # Global camera object for streaming
 camera_cap = None
 camera_lock = threading.Lock()
@@ -700,6 +703,8 @@ def video_feed():
         detection_cooldown = 0
         last_alert_time = {}  # Track last alert time by type to prevent rapid duplicates
         MIN_ALERT_INTERVAL = 30  # Minimum seconds between alerts of same type
+        next_inference_at = 0.0  # Time when the next smoke inference is due
+        last_boxes = []  # Latest smoke detections as (x1, y1, x2, y2, confidence)
         
         while True:
             try:
@@ -715,64 +720,73 @@ def video_feed():
                 frame_count += 1
                 detection_cooldown = max(0, detection_cooldown - 1)
                 
-                # Run smoke detection every 5 frames to save CPU
-                if frame_count % 5 == 0 and ai_system.ai_detector and ai_system.ai_detector.has_smoke_model:
+                # Run smoke detection at a limited rate; the interval grows
+                # with inference time so slow detections never stall the feed
+                now = time.time()
+                if now >= next_inference_at and ai_system.ai_detector and ai_system.ai_detector.has_smoke_model:
                     try:
                         # Run inference
+                        inference_start = time.time()
                         results = ai_system.ai_detector.smoke_model(frame, conf=0.5)
+                        inference_time = time.time() - inference_start
+                        next_inference_at = now + max(1.0 / SMOKE_INFERENCE_FPS, inference_time * 2)
                         
-                        # Draw bounding boxes for detections
+                        # Collect detections, reused for drawing until the next inference
+                        last_boxes = []
                         for result in results:
                             boxes = result.boxes
                             if boxes is not None:
                                 for box in boxes:
                                     confidence = float(box.conf[0])
-                                    # LOWERED threshold from 0.92 to 0.90 for live camera
-                                    # Allows 90%+ confidence to trigger alerts
-                                    current_time = time.time()
-                                    time_since_last_alert = current_time - last_alert_time.get('smoke', 0)
-                                    
-                                    if (confidence >= 0.90 and 
-                                        detection_cooldown == 0 and 
-                                        time_since_last_alert >= MIN_ALERT_INTERVAL):
-                                        # Save the detection frame
-                                        try:
-                                            annotated_dir = os.path.join('clips', 'annotated')
-                                            os.makedirs(annotated_dir, exist_ok=True)
-                                            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                                            frame_filename = f"live_smoke_{timestamp}_{random.randint(1000, 9999)}.jpg"
-                                            frame_path = os.path.join(annotated_dir, frame_filename)
-                                            cv2.imwrite(frame_path, frame)
-                                            clip_url = '/' + frame_path.replace('\\', '/').lstrip('/')
-                                        except Exception as e:
-                                            print(f"Error saving frame: {e}")
-                                            clip_url = ''
-                                        
-                                        # Create alert with frame image as clipUrl
-                                        alert_data = {
-                                            'type': 'smoke',
-                                            'title': 'Smoke Detected (Live)',
-                                            'message': f'Smoke detected in real-time camera feed (Confidence: {confidence:.0%})',
-                                            'time': datetime.datetime.now().isoformat(),
-                                            'clipUrl': clip_url,
-                                            'confidence': confidence
-                                        }
-                                        alert_system.save_alert(alert_data)
-                                        print(f"🔔 Live Alert: {alert_data['title']} ({confidence:.0%}) - Frame: {clip_url}")
-                                        detection_cooldown = 150  # Wait 150 frames (~25 seconds) before next alert
-                                        last_alert_time['smoke'] = current_time  # Update last alert timestamp
-                                    
-                                    # Draw box on frame
                                     x1, y1, x2, y2 = box.xyxy[0]
-                                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                                    color = (0, 165, 255) if confidence >= 0.70 else (0, 255, 255)
-                                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                                    label = f'Smoke {confidence:.0%}'
-                                    cv2.putText(frame, label, (x1, y1 - 10),
-                                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+                                    last_boxes.append((int(x1), int(y1), int(x2), int(y2), confidence))
+                        
+                        for x1, y1, x2, y2, confidence in last_boxes:
+                            # LOWERED threshold from 0.92 to 0.90 for live camera
+                            # Allows 90%+ confidence to trigger alerts
+                            current_time = time.time()
+                            time_since_last_alert = current_time - last_alert_time.get('smoke', 0)
+                            
+                            if (confidence >= 0.90 and 
+                                detection_cooldown == 0 and 
+                                time_since_last_alert >= MIN_ALERT_INTERVAL):
+                                # Save the detection frame
+                                try:
+                                    annotated_dir = os.path.join('clips', 'annotated')
+                                    os.makedirs(annotated_dir, exist_ok=True)
+                                    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                                    frame_filename = f"live_smoke_{timestamp}_{random.randint(1000, 9999)}.jpg"
+                                    frame_path = os.path.join(annotated_dir, frame_filename)
+                                    cv2.imwrite(frame_path, frame)
+                                    clip_url = '/' + frame_path.replace('\\', '/').lstrip('/')
+                                except Exception as e:
+                                    print(f"Error saving frame: {e}")
+                                    clip_url = ''
+                                
+                                # Create alert with frame image as clipUrl
+                                alert_data = {
+                                    'type': 'smoke',
+                                    'title': 'Smoke Detected (Live)',
+                                    'message': f'Smoke detected in real-time camera feed (Confidence: {confidence:.0%})',
+                                    'time': datetime.datetime.now().isoformat(),
+                                    'clipUrl': clip_url,
+                                    'confidence': confidence
+                                }
+                                alert_system.save_alert(alert_data)
+                                print(f"🔔 Live Alert: {alert_data['title']} ({confidence:.0%}) - Frame: {clip_url}")
+                                detection_cooldown = 150  # Wait 150 frames (~25 seconds) before next alert
+                                last_alert_time['smoke'] = current_time  # Update last alert timestamp
                     except Exception as e:
                         print(f"Error during detection: {e}")
                 
+                # Draw the latest detections on every frame (also skipped ones)
+                for x1, y1, x2, y2, confidence in last_boxes:
+                    color = (0, 165, 255) if confidence >= 0.70 else (0, 255, 255)
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+                    label = f'Smoke {confidence:.0%}'
+                    cv2.putText(frame, label, (x1, y1 - 10),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+                
                 # Add FPS counter
                 cv2.putText(frame, f'Frame: {frame_count}', (10, 30),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 0), 2)